@@ -0,0 +1,18 @@
+"""Benchmarks of pathman against the local filesystem, memory and an in-process S3
+
+S3 benchmarks run against a moto server started on a free local port, so no
+AWS account or network access is needed. Install the extra dependencies
+with ``pip install pathman2[benchmarks]`` and run::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --suite listing --backend s3 --sizes 1000 100000
+    python -m benchmarks --output new.json --compare results.json
+
+Results are written as JSON (see `benchmarks.harness.Result`); comparing
+against a previous run reports every benchmark whose rate dropped by more
+than a threshold, and exits with status 1 if any did.
+
+Note that moto is much slower than S3 per request and has no network
+latency: S3 numbers are meant to compare pathman versions with each other,
+not to predict throughput against AWS.
+"""
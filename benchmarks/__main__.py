@@ -0,0 +1,78 @@
+""" Command-line entry point: python -m benchmarks --help """
+import sys
+import json
+import argparse
+from contextlib import ExitStack
+
+from benchmarks.harness import compare, log, s3_server, scratch_directory, write_report
+from benchmarks.suites import SUITES, Context
+
+KB = 1024
+MB = 1024 ** 2
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "--suite", nargs="+", choices=sorted(SUITES), default=list(SUITES), help="suites to run"
+    )
+    parser.add_argument(
+        "--backend", nargs="+", choices=["local", "memory", "s3"], default=["local", "memory", "s3"]
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[1000, 10000],
+        help="entries of the trees listed, e.g. 1000 10000 100000 1000000",
+    )
+    parser.add_argument(
+        "--object-sizes", nargs="+", type=int, default=[KB, 64 * KB, MB, 16 * MB]
+    )
+    parser.add_argument("--parallelism", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--copy-files", type=int, default=200)
+    parser.add_argument("--copy-file-size", type=int, default=256 * KB)
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark")
+    parser.add_argument("--output", help="file to write the JSON report to (default: stdout)")
+    parser.add_argument("--compare", help="report of a previous run to check for regressions")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="tolerated relative slowdown (default 0.1)"
+    )
+    args = parser.parse_args(argv)
+
+    results = []
+    with ExitStack() as stack:
+        scratch = stack.enter_context(scratch_directory())
+        if "s3" in args.backend:
+            stack.enter_context(s3_server())
+        context = Context(
+            backends=args.backend,
+            sizes=args.sizes,
+            object_sizes=args.object_sizes,
+            parallelism=args.parallelism,
+            copy_files=args.copy_files,
+            copy_file_size=args.copy_file_size,
+            repeat=args.repeat,
+            scratch=scratch,
+        )
+        for suite in args.suite:
+            for result in SUITES[suite](context):
+                log("{:<60} {:>14.1f} {}/s".format(result.key, result.rate, result.unit))
+                results.append(result)
+
+    report = write_report(results, vars(args), args.output)
+    if args.compare is None:
+        return 0
+    with open(args.compare) as f:
+        regressions = compare(json.load(f), report, args.threshold)
+    for regression in regressions:
+        log(
+            "REGRESSION {}: {:.1f} -> {:.1f} ({:+.0%})".format(
+                regression.key, regression.baseline_rate, regression.rate, regression.change
+            )
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+""" Measurement, fixtures and reporting shared by the benchmark suites """
+import os
+import sys
+import json
+import time
+import logging
+import shutil
+import socket
+import platform
+import statistics
+import subprocess
+import tempfile
+from concurrent import futures
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+BUCKET = "pathman-benchmarks"
+
+
+class Result(NamedTuple):
+    """ Timings of one benchmark """
+
+    name: str  # e.g. "listing.walk"
+    backend: str  # "local", "s3" or a "src->dest" pair
+    params: dict  # parameters that distinguish runs of the same benchmark
+    unit: str  # what `count` counts, e.g. "entries" or "bytes"
+    count: int  # amount of work done by each sample
+    samples: List[float]  # seconds taken by each sample
+
+    @property
+    def key(self) -> str:
+        """ Identifier of the benchmark, stable across runs """
+        params = ",".join("{}={}".format(k, v) for k, v in sorted(self.params.items()))
+        return "{}[{}]({})".format(self.name, self.backend, params)
+
+    @property
+    def rate(self) -> float:
+        """ Units per second, from the median sample """
+        median = statistics.median(self.samples)
+        return self.count / median if median else float("inf")
+
+    def to_json(self) -> dict:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "backend": self.backend,
+            "params": self.params,
+            "unit": self.unit,
+            "count": self.count,
+            "samples": self.samples,
+            "min": min(self.samples),
+            "median": statistics.median(self.samples),
+            "mean": statistics.mean(self.samples),
+            "stdev": statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0,
+            "rate": self.rate,
+        }
+
+
+def measure(
+    func: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None
+) -> List[float]:
+    """Time repeated calls of a function
+
+    Parameters
+    ----------
+    func: callable
+        Work to time
+    repeat: int
+        Number of samples
+    setup: callable, optional
+        Called, untimed, before each sample, e.g. to drop caches
+
+    Returns
+    -------
+    list of float: seconds taken by each call
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def drop_caches() -> None:
+    """ Drop pathman's cached sessions and metadata, so remote reads are cold """
+    from pathman import close_sessions
+
+    close_sessions()
+
+
+@contextmanager
+def s3_server() -> Iterator[str]:
+    """Run an in-process S3 emulator with an empty benchmark bucket
+
+    Credentials and the endpoint are set through the environment for the
+    duration of the block, so every boto3 client and s3fs filesystem
+    created meanwhile talks to the emulator.
+
+    Returns
+    -------
+    str: endpoint URL of the emulator
+    """
+    try:
+        from moto.server import ThreadedMotoServer  # type: ignore
+    except ImportError:
+        raise ImportError("moto[server] is required for the s3 benchmarks")
+
+    port = _free_port()
+    endpoint = "http://127.0.0.1:{}".format(port)
+    environ = {
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ENDPOINT_URL": endpoint,
+    }
+    saved = {k: os.environ.get(k) for k in environ}
+    os.environ.update(environ)
+    # werkzeug logs every request to stderr otherwise, slowing the benchmarks down
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    try:
+        s3_client().create_bucket(Bucket=BUCKET)
+        yield endpoint
+    finally:
+        drop_caches()
+        server.stop()
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def s3_client():
+    """ boto3 client of the emulator, for fixtures set up outside pathman """
+    from pathman._impl.session import get_client
+
+    return get_client()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def scratch_directory() -> Iterator[str]:
+    """ Temporary local directory, removed afterwards """
+    directory = tempfile.mkdtemp(prefix="pathman-benchmarks-")
+    try:
+        yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def tree_keys(size: int, fanout: int = 10) -> List[str]:
+    """Relative paths of a synthetic tree of `size` files
+
+    Files are spread evenly over `fanout` top-level directories, each split
+    again into `fanout` sub-directories
+    """
+    return [
+        "{}/{}/{:07d}.dat".format(i % fanout, (i // fanout) % fanout, i) for i in range(size)
+    ]
+
+
+def make_local_tree(root: str, keys: List[str], contents: bytes = b"") -> None:
+    """ Write a file at each relative path below root """
+    directories = {os.path.dirname(key) for key in keys}
+    for directory in directories:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+    for key in keys:
+        with open(os.path.join(root, key), "wb") as f:
+            f.write(contents)
+
+
+def make_s3_tree(prefix: str, keys: List[str], contents: bytes = b"", parallelism: int = 32):
+    """ Put an object at each relative key below prefix in the benchmark bucket """
+    client = s3_client()
+
+    def _put(key: str) -> None:
+        client.put_object(Bucket=BUCKET, Key=prefix + key, Body=contents)
+
+    with futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
+        for _ in executor.map(_put, keys):
+            pass
+
+
+def environment() -> dict:
+    """ Description of the machine and code being benchmarked """
+    import pathman
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pathman": pathman.__version__,
+        "revision": _git_revision(),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(results: List[Result], arguments: dict, filename: Optional[str]) -> dict:
+    """ Write results as JSON to a file, or to stdout if filename is None """
+    report = {
+        "environment": environment(),
+        "arguments": arguments,
+        "results": [result.to_json() for result in results],
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if filename is None:
+        print(text)
+    else:
+        with open(filename, "w") as f:
+            f.write(text + "\n")
+    return report
+
+
+class Regression(NamedTuple):
+    """ Benchmark that got slower than its baseline """
+
+    key: str
+    baseline_rate: float
+    rate: float
+
+    @property
+    def change(self) -> float:
+        """ Relative change of the rate, e.g. -0.25 for 25% slower """
+        return self.rate / self.baseline_rate - 1
+
+
+def compare(baseline: dict, report: dict, threshold: float = 0.1) -> List[Regression]:
+    """Find benchmarks whose rate dropped by more than threshold
+
+    Parameters
+    ----------
+    baseline: dict
+        Report of a previous run, as written by `write_report`
+    report: dict
+        Report of the current run
+    threshold: float, optional
+        Tolerated relative slowdown. Benchmarks missing from either report
+        are ignored
+    """
+    baseline_rates: Dict[str, float] = {r["key"]: r["rate"] for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        previous = baseline_rates.get(result["key"])
+        if previous and result["rate"] < previous * (1 - threshold):
+            regressions.append(Regression(result["key"], previous, result["rate"]))
+    return regressions
+
+
+def log(message: str) -> None:
+    """ Progress output, kept off stdout so the report can be piped """
+    print(message, file=sys.stderr, flush=True)
@@ -0,0 +1,179 @@
+"""Benchmark suites
+
+Each suite is a function taking a `Context` and yielding `Result`s for every
+selected backend. Remote data is read cold: pathman's sessions and cached
+metadata are dropped before each sample. Every tree a suite creates is
+deleted once measured, so that earlier benchmarks neither hold memory nor
+fill up the disk or bucket under later ones.
+"""
+import os
+import uuid
+from typing import Callable, Dict, Iterator, List, NamedTuple
+
+from pathman import Path
+
+from benchmarks.harness import (
+    BUCKET,
+    Result,
+    drop_caches,
+    log,
+    make_local_tree,
+    make_s3_tree,
+    measure,
+    tree_keys,
+)
+
+
+class Context(NamedTuple):
+    """ Parameters shared by the suites """
+
+    backends: List[str]  # "local", "memory" and/or "s3"
+    sizes: List[int]  # entries of the synthetic trees listed
+    object_sizes: List[int]  # bytes of the objects read and written
+    parallelism: List[int]  # values of `parallelism` copies run with
+    copy_files: int  # files in the tree copied
+    copy_file_size: int  # bytes of each copied file
+    repeat: int  # samples per benchmark
+    scratch: str  # local directory for fixtures
+
+    def root(self, backend: str) -> str:
+        """ Fresh, empty directory of a backend """
+        name = uuid.uuid4().hex[:12]
+        if backend == "s3":
+            return "s3://{}/{}".format(BUCKET, name)
+        if backend == "memory":
+            return "memory://" + name
+        return os.path.join(self.scratch, name)
+
+
+def _make_tree(backend: str, root: str, keys: List[str], contents: bytes = b"") -> None:
+    if backend == "s3":
+        make_s3_tree(root.split("/", 3)[3] + "/", keys, contents)
+    elif backend == "memory":
+        for key in keys:
+            Path(root).join(key).write_bytes(contents)
+    else:
+        make_local_tree(root, keys, contents)
+
+
+def _remove_tree(root: str) -> None:
+    """ Delete a directory created by a benchmark, if it exists """
+    path = Path(root)
+    if path.is_dir():
+        path.rmdir(recursive=True)
+
+
+def path_construction(context: Context) -> Iterator[Result]:
+    """ Rate of building `Path` objects from strings and by joining """
+    count = 100000
+    for backend in context.backends:
+        root = context.root(backend)
+        strings = ["{}/{}/{}.dat".format(root, i % 100, i) for i in range(count)]
+        parent = Path(root)
+        names = [str(i) for i in range(count)]
+
+        def _construct() -> None:
+            for s in strings:
+                Path(s)
+
+        def _join() -> None:
+            for name in names:
+                parent / name
+
+        yield Result(
+            "path.construct", backend, {}, "paths", count, measure(_construct, context.repeat)
+        )
+        yield Result("path.join", backend, {}, "paths", count, measure(_join, context.repeat))
+
+
+def listing(context: Context) -> Iterator[Result]:
+    """ Throughput of walk, ls and glob over synthetic trees """
+    for backend in context.backends:
+        for size in context.sizes:
+            root = context.root(backend)
+            log("building {} tree of {} entries".format(backend, size))
+            _make_tree(backend, root, tree_keys(size))
+            path = Path(root)
+            # one of the 100 leaf directories
+            leaf = path / "3" / "3"
+            operations: Dict[str, Callable[[], int]] = {
+                "walk": lambda: sum(1 for _ in path.walk()),
+                "ls": lambda: len(leaf.ls()),
+                "glob": lambda: len(path.glob("*/*/*.dat")),
+                "glob_narrow": lambda: len(path.glob("3/*/*.dat")),
+            }
+            for operation, func in operations.items():
+                found = func()
+                samples = measure(func, context.repeat, setup=drop_caches)
+                yield Result(
+                    "listing." + operation, backend, {"size": size}, "entries", found, samples
+                )
+            _remove_tree(root)
+
+
+def io(context: Context) -> Iterator[Result]:
+    """ Latency of write_bytes and read_bytes across object sizes """
+    for backend in context.backends:
+        root = Path(context.root(backend))
+        if backend == "local":
+            root.mkdir()
+        for size in context.object_sizes:
+            data = os.urandom(size)
+            path = root / "object-{}".format(size)
+            samples = measure(lambda: path.write_bytes(data), context.repeat)
+            yield Result("io.write_bytes", backend, {"size": size}, "bytes", size, samples)
+            samples = measure(path.read_bytes, context.repeat, setup=drop_caches)
+            yield Result("io.read_bytes", backend, {"size": size}, "bytes", size, samples)
+        _remove_tree(str(root))
+
+
+def copy(context: Context) -> Iterator[Result]:
+    """ Throughput of `pathman.copy.copy` between backends at several parallelisms """
+    from pathman.copy import copy as copy_path
+
+    keys = tree_keys(context.copy_files)
+    contents = os.urandom(context.copy_file_size)
+    total = len(keys) * len(contents)
+    sources = {}
+    for backend in context.backends:
+        sources[backend] = context.root(backend)
+        log("building {} tree of {} files to copy".format(backend, len(keys)))
+        _make_tree(backend, sources[backend], keys, contents)
+    pairs = [(s, d) for s in context.backends for d in context.backends]
+    try:
+        for src_backend, dest_backend in pairs:
+            for parallelism in context.parallelism:
+                src = Path(sources[src_backend])
+                # every sample copies into the same, emptied destination
+                dest = context.root(dest_backend)
+
+                def _setup() -> None:
+                    _remove_tree(dest)
+                    drop_caches()
+
+                def _copy() -> None:
+                    copy_path(src, Path(dest), parallelism=parallelism)
+
+                try:
+                    samples = measure(_copy, context.repeat, setup=_setup)
+                finally:
+                    _remove_tree(dest)
+                yield Result(
+                    "copy",
+                    "{}->{}".format(src_backend, dest_backend),
+                    {"parallelism": parallelism, "files": len(keys)},
+                    "bytes",
+                    total,
+                    samples,
+                )
+    finally:
+        for root in sources.values():
+            _remove_tree(root)
+
+
+SUITES: Dict[str, Callable[[Context], Iterator[Result]]] = {
+    "path": path_construction,
+    "listing": listing,
+    "io": io,
+    "copy": copy,
+}
@@ -1,3 +1,5 @@
 from .path import Path
+from .backends import register_backend
+from ._impl.session import close_sessions
 
 __version__ = "0.1.0"
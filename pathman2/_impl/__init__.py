@@ -1,3 +1,12 @@
 """Backend-specific implementation of the pathman.Path interface"""
-from .s3 import S3Path
-from .local import LocalPath
+import importlib
+
+# backends are imported on first access, so that using one does not pay for
+# importing the dependencies of the others
+_backends = {"S3Path": ".s3", "LocalPath": ".local", "MemoryPath": ".memory"}
+
+
+def __getattr__(name):
+    if name in _backends:
+        return getattr(importlib.import_module(_backends[name], __name__), name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,81 @@
+""" In-memory caches shared by remote backends """
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+DEFAULT_MAXSIZE = 100000
+DEFAULT_TTL = 60.0
+
+_MISSING = object()
+
+
+class StatCache(object):
+    """Bounded, thread-safe LRU cache whose entries expire after a TTL
+
+    Parameters
+    ----------
+    maxsize: int, optional
+        Maximum number of entries kept. The least recently used entry is
+        dropped once the cache is full
+    ttl: float, optional
+        Number of seconds an entry stays valid. A ttl of 0 disables caching
+
+    Notes
+    -----
+        `None` is a valid cached value and is used by the backends to
+        remember that a path does not exist.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Return the cached value for key, or default if absent or expired """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """ Store value under key, evicting the least recently used entry if full """
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """ Forget a single entry """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """ Forget every entry whose (string) key starts with prefix """
+        with self._lock:
+            stale = [k for k in self._entries if isinstance(k, str) and k.startswith(prefix)]
+            for k in stale:
+                del self._entries[k]
+
+    def clear(self) -> None:
+        """ Forget every entry """
+        with self._lock:
+            self._entries.clear()
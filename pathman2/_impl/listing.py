@@ -0,0 +1,194 @@
+"""Parallel, prefix-sharded listing of large S3 prefixes
+
+A single `list_objects_v2` pagination chain returns at most 1000 keys per
+round trip, one request after another. To list faster, the key space below
+a prefix is split into disjoint shards that are paginated concurrently:
+
+1. The first page of the prefix is listed with `Delimiter="/"`. If it holds
+   the whole level and the level has several common prefixes
+   ("sub-directories"), each one becomes a shard. A prefix with a single
+   sub-directory is descended into first.
+2. Otherwise (e.g. a flat key space), keys are split lexicographically on
+   the character following the prefix, using `StartAfter` to jump to the
+   start of each range.
+
+Shards cover contiguous, ordered ranges of keys, so results can be merged
+back into key order cheaply.
+"""
+import os
+import heapq
+import queue
+import threading
+from concurrent import futures
+from typing import Iterator, List, Optional, Tuple
+
+# boundaries of the lexicographic shards of a flat key space
+SPLIT_CHARACTERS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+# sorts after any realistic key continuation (highest code point in UTF-8)
+_MAX_SUFFIX = "\U0010ffff" * 4
+_DONE = object()
+
+Shard = Tuple[str, Optional[str], Optional[str]]  # prefix, lower bound, upper bound
+
+
+def parallel_list_objects(
+    client,
+    bucket: str,
+    prefix: str,
+    parallelism: Optional[int] = None,
+    ordered: bool = False,
+    buffer_size: int = 10000,
+) -> Iterator[dict]:
+    """Yield every object below prefix, listing shards of the key space concurrently
+
+    Parameters
+    ----------
+    client: botocore.client.S3
+        Client used for the listings
+    bucket: str
+        Bucket to list
+    prefix: str
+        Key prefix to list
+    parallelism: int, optional
+        Maximum number of shards listed at once
+    ordered: bool, optional
+        If True, yield objects in key order (as a single listing would).
+        Otherwise yield them as soon as any shard returns them
+    buffer_size: int, optional
+        Maximum number of listed objects buffered per shard (ordered) or in
+        total (unordered) before shard listings pause
+
+    Returns
+    -------
+    iterator of dict: "Contents" entries of list_objects_v2
+    """
+    max_workers = parallelism or min(32, (os.cpu_count() or 1) + 4)
+    if max_workers == 1:
+        return _list_shard(client, bucket, (prefix, None, None))
+    shards, direct = _discover(client, bucket, prefix)
+    if len(shards) <= 1:
+        merged = (obj for shard in shards for obj in _list_shard(client, bucket, shard))
+    elif ordered:
+        merged = _ordered(client, bucket, shards, max_workers, buffer_size)
+    else:
+        merged = _unordered(client, bucket, shards, max_workers, buffer_size)
+    if ordered:
+        return heapq.merge(direct, merged, key=lambda obj: obj["Key"])
+    return _chain(direct, merged)
+
+
+def _chain(first: List[dict], rest: Iterator[dict]) -> Iterator[dict]:
+    yield from first
+    yield from rest
+
+
+def _discover(client, bucket: str, prefix: str) -> Tuple[List[Shard], List[dict]]:
+    """Split the keys below prefix into shards
+
+    Returns
+    -------
+    tuple: (shards, objects directly below prefix that belong to no shard)
+    """
+    while True:
+        page = client.list_objects_v2(Bucket=bucket, Prefix=prefix, Delimiter="/")
+        common = [c["Prefix"] for c in page.get("CommonPrefixes", [])]
+        direct = page.get("Contents", [])
+        if page.get("IsTruncated"):
+            # too many entries at this level to enumerate first: split the
+            # whole key space below prefix instead
+            return _split(prefix), []
+        if len(common) == 1 and not direct:
+            prefix = common[0]
+            continue
+        if len(common) == 1:
+            return _split(common[0]), direct
+        return [(c, None, None) for c in common], direct
+
+
+def _split(prefix: str) -> List[Shard]:
+    """ Split a flat key space lexicographically on the character after prefix """
+    bounds: List[Optional[str]] = [None] + list(SPLIT_CHARACTERS) + [None]
+    return [(prefix, bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def _list_shard(client, bucket: str, shard: Shard) -> Iterator[dict]:
+    prefix, lower, upper = shard
+    kwargs = {"Bucket": bucket, "Prefix": prefix}
+    if lower is not None:
+        # StartAfter is exclusive: start right after every key that sorts
+        # before prefix + lower
+        kwargs["StartAfter"] = prefix + chr(ord(lower) - 1) + _MAX_SUFFIX
+    stop = None if upper is None else prefix + upper
+    for page in client.get_paginator("list_objects_v2").paginate(**kwargs):
+        for obj in page.get("Contents", []):
+            if stop is not None and obj["Key"] >= stop:
+                return
+            yield obj
+
+
+def _fill(client, bucket: str, shard: Shard, results: "queue.Queue", stop: threading.Event):
+    """ List a shard into a queue, ending with a _DONE marker (and any error) """
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for obj in _list_shard(client, bucket, shard):
+            if not _put((obj, None)):
+                return
+    except BaseException as e:
+        _put((_DONE, e))
+    else:
+        _put((_DONE, None))
+
+
+def _drain(results: "queue.Queue") -> Iterator[dict]:
+    """ Yield objects from a shard's queue until its _DONE marker """
+    while True:
+        obj, error = results.get()
+        if obj is _DONE:
+            if error is not None:
+                raise error
+            return
+        yield obj
+
+
+def _unordered(
+    client, bucket: str, shards: List[Shard], max_workers: int, buffer_size: int
+) -> Iterator[dict]:
+    results: "queue.Queue" = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    for shard in shards:
+        executor.submit(_fill, client, bucket, shard, results, stop)
+    try:
+        # every shard ends with its own _DONE marker
+        for _ in shards:
+            yield from _drain(results)
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def _ordered(
+    client, bucket: str, shards: List[Shard], max_workers: int, buffer_size: int
+) -> Iterator[dict]:
+    # shards start in order, so the shard being drained has always started;
+    # later shards pause once their own buffer is full
+    buffers = [queue.Queue(maxsize=buffer_size) for _ in shards]
+    stop = threading.Event()
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    for shard, results in zip(shards, buffers):
+        executor.submit(_fill, client, bucket, shard, results, stop)
+    try:
+        for results in buffers:
+            yield from _drain(results)
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
@@ -1,17 +1,50 @@
 import os
+import mmap
+import stat
 import shutil
+import functools
+import itertools
 from pathlib import Path as PathLibPath
-from typing import List, Generator
+from typing import AsyncIterator, Callable, Iterator, List, Generator, Optional
 
-from pathman.base import AbstractPath
+from pathman.base import AbstractAsyncPath, AbstractPath, StatResult
+from pathman.utils import Patterns, matches_patterns
+
+WALK_BATCH_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 1024 ** 2
 
 
 class LocalPath(AbstractPath):
     """ Wrapper around `pathlib.Path` """
 
+    __slots__ = ("_pathstr", "_pathlib", "_entry")
+
     def __init__(self, path: str, **kwargs) -> None:
-        self._path = PathLibPath(path)
         self._pathstr = path
+        self._pathlib = None
+        self._entry = None
+
+    @classmethod
+    def _from_entry(cls, entry: os.DirEntry) -> "LocalPath":
+        """Build a path from an `os.scandir` entry
+
+        The entry's type and stat information (fetched at most once) are
+        reused by `is_file`, `is_dir` and `stat` until the path is modified
+        through this object
+        """
+        path = cls.__new__(cls)
+        path._pathstr = entry.path
+        path._pathlib = None
+        path._entry = entry
+        return path
+
+    @property
+    def _path(self) -> PathLibPath:
+        # built on first use: most paths yielded by walk/ls are never asked
+        # for anything pathlib-specific
+        if self._pathlib is None:
+            self._pathlib = PathLibPath(self._pathstr)
+        return self._pathlib
 
     def __str__(self) -> str:
         return self._pathstr
@@ -29,22 +62,42 @@ class LocalPath(AbstractPath):
     def extension(self) -> str:
         return self._path.suffix
 
-    def exists(self) -> bool:
-        return self._path.exists()
+    def exists(self, refresh=False) -> bool:
+        return os.path.exists(self._pathstr)
+
+    def stat(self, refresh=False) -> StatResult:
+        """ Stat the path, reusing the directory entry of a walk unless refresh is True """
+        if self._entry is not None and not refresh:
+            st = self._entry.stat()
+        else:
+            st = os.stat(self._pathstr)
+        return StatResult(
+            size=st.st_size,
+            mtime=st.st_mtime,
+            etag=None,
+            type="directory" if stat.S_ISDIR(st.st_mode) else "file",
+        )
 
     def touch(self) -> None:
+        self._entry = None
         return self._path.touch()
 
-    def is_dir(self) -> bool:
-        return self._path.is_dir()
+    def is_dir(self, refresh=False) -> bool:
+        if self._entry is not None and not refresh:
+            return self._entry.is_dir()
+        return os.path.isdir(self._pathstr)
 
-    def is_file(self) -> bool:
-        return self._path.is_file()
+    def is_file(self, refresh=False) -> bool:
+        if self._entry is not None and not refresh:
+            return self._entry.is_file()
+        return os.path.isfile(self._pathstr)
 
     def mkdir(self, **kwargs) -> None:
+        self._entry = None
         return self._path.mkdir(**kwargs)
 
     def rmdir(self, recursive=False) -> None:
+        self._entry = None
         if recursive:
             return shutil.rmtree(self._pathstr)
         return self._path.rmdir()
@@ -53,15 +106,20 @@ class LocalPath(AbstractPath):
         return LocalPath(str(self._path.joinpath(*pathsegments)))
 
     def open(self, mode="r", **kwargs):
+        if "r" not in mode or "+" in mode:
+            self._entry = None
         return self._path.open(mode=mode, **kwargs)
 
     def write_bytes(self, contents, **kwargs):
+        self._entry = None
         return self._path.write_bytes(contents, **kwargs)
 
     def write_text(self, contents, **kwargs):
+        self._entry = None
         return self._path.write_text(contents, **kwargs)
 
     def remove(self) -> None:
+        self._entry = None
         self._path.unlink()
 
     def read_text(self, **kwargs):
@@ -70,22 +128,120 @@ class LocalPath(AbstractPath):
     def read_bytes(self, **kwargs):
         return self._path.read_bytes(**kwargs)
 
+    def read_range(self, offset: int, length: Optional[int] = None) -> bytes:
+        with open(self._pathstr, "rb") as f:
+            if offset < 0:
+                offset = max(f.seek(0, os.SEEK_END) + offset, 0)
+            f.seek(offset)
+            return f.read(-1 if length is None else length)
+
+    def iter_bytes(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._pathstr, "rb") as f:
+            for chunk in iter(functools.partial(f.read, chunk_size), b""):
+                yield chunk
+
+    def readinto(self, buffer, offset: int = 0) -> int:
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        with open(self._pathstr, "rb", buffering=0) as f:
+            f.seek(offset)
+            while filled < view.nbytes:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+        return filled
+
+    def mmap(self) -> mmap.mmap:
+        with open(self._pathstr, "rb") as f:
+            # the mapping stays valid after the descriptor is closed
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def memoryview(self) -> memoryview:
+        if os.path.getsize(self._pathstr) == 0:
+            # zero-length files cannot be mapped
+            return memoryview(b"")
+        return memoryview(self.mmap())
+
     def expanduser(self) -> "LocalPath":
         return LocalPath(str(self._path.expanduser()))
 
     def abspath(self) -> "LocalPath":
         return LocalPath(str(self._path.resolve()))
 
-    def walk(self, **kwargs) -> Generator["LocalPath", None, None]:
-        for root, directories, files in os.walk(self._pathstr, **kwargs):
-            for f in files:
-                yield LocalPath(os.path.join(root, f))
+    def walk(
+        self,
+        include: Patterns = None,
+        exclude: Patterns = None,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[["LocalPath"], bool]] = None,
+        followlinks: bool = False,
+        onerror: Optional[Callable[[OSError], None]] = None,
+    ) -> Generator["LocalPath", None, None]:
+        """Lazily yield every file below the current path, using `os.scandir`
+
+        Yielded paths keep their directory entry, so `is_file`, `is_dir` and
+        `stat` on them do not need another system call.
+
+        Parameters
+        ----------
+        include: str or list of str, optional
+            Only yield files whose path relative to this one matches a pattern
+        exclude: str or list of str, optional
+            Skip files, and do not descend into directories, whose relative
+            path matches a pattern
+        max_depth: int, optional
+            Maximum depth of yielded files; 1 only yields direct children
+        prune: callable, optional
+            Called with each directory; if it returns True the directory is
+            not descended into
+        followlinks: bool, optional
+            Descend into symbolic links to directories
+        onerror: callable, optional
+            Called with the OSError raised by a directory that cannot be read.
+            By default such directories are skipped
+        """
+        stack = [(self._pathstr, "", 1)]
+        while stack:
+            directory, relative_dir, depth = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError as e:
+                if onerror is not None:
+                    onerror(e)
+                continue
+            subdirectories = []
+            with entries:
+                for entry in entries:
+                    relative = relative_dir + entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        if matches_patterns(relative, include, exclude):
+                            yield LocalPath._from_entry(entry)
+                        continue
+                    if max_depth is not None and depth >= max_depth:
+                        continue
+                    if not followlinks and entry.is_symlink():
+                        continue
+                    if exclude and not matches_patterns(relative, exclude=exclude):
+                        continue
+                    if prune is not None and prune(LocalPath._from_entry(entry)):
+                        continue
+                    subdirectories.append((entry.path, relative + "/", depth + 1))
+            # visit subdirectories in listing order
+            stack.extend(reversed(subdirectories))
 
     def ls(self) -> List["LocalPath"]:
         return [LocalPath(str(p)) for p in self._path.iterdir()]
 
     def glob(self, path) -> List["LocalPath"]:
-        return [LocalPath(str(p)) for p in self._path.glob(path)]
+        return list(self.iglob(path))
+
+    def iglob(self, path) -> Generator["LocalPath", None, None]:
+        return (LocalPath(str(p)) for p in self._path.glob(path))
 
     def with_suffix(self, suffix) -> "LocalPath":
         return LocalPath(str(self._path.with_suffix(suffix)))
@@ -97,3 +253,75 @@ class LocalPath(AbstractPath):
     @property
     def parts(self) -> List[str]:
         return list(self._path.parts)
+
+
+class AsyncLocalPath(AbstractAsyncPath):
+    """asyncio counterpart of `LocalPath`
+
+    Blocking filesystem calls are offloaded to the event loop's default
+    executor.
+    """
+
+    __slots__ = ("_sync",)
+
+    def __init__(self, path: str, **kwargs) -> None:
+        self._sync = LocalPath(path)
+
+    @property
+    def _pathstr(self) -> str:
+        return self._sync._pathstr
+
+    def __str__(self) -> str:
+        return self._pathstr
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __eq__(self, other) -> bool:
+        return self._pathstr == other._pathstr
+
+    async def _run(self, func, *args, **kwargs):
+        import asyncio  # only once a coroutine runs: importing asyncio is slow
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def stat(self, refresh=False) -> StatResult:
+        return await self._run(self._sync.stat, refresh)
+
+    async def exists(self, refresh=False) -> bool:
+        return await self._run(self._sync.exists, refresh)
+
+    async def is_dir(self, refresh=False) -> bool:
+        return await self._run(self._sync.is_dir, refresh)
+
+    async def is_file(self, refresh=False) -> bool:
+        return await self._run(self._sync.is_file, refresh)
+
+    async def read_bytes(self) -> bytes:
+        return await self._run(self._sync.read_bytes)
+
+    async def write_bytes(self, contents) -> int:
+        return await self._run(self._sync.write_bytes, contents)
+
+    async def remove(self) -> None:
+        return await self._run(self._sync.remove)
+
+    async def ls(self) -> List["AsyncLocalPath"]:
+        return [AsyncLocalPath(p._pathstr) for p in await self._run(self._sync.ls)]
+
+    async def walk(self, **kwargs) -> AsyncIterator["AsyncLocalPath"]:
+        prune = kwargs.get("prune")
+        if prune is not None:
+            kwargs["prune"] = lambda p: prune(AsyncLocalPath(p._pathstr))
+        # advance the blocking generator in the executor, a batch at a time
+        files = self._sync.walk(**kwargs)
+        while True:
+            batch = await self._run(list, itertools.islice(files, WALK_BATCH_SIZE))
+            if not batch:
+                return
+            for p in batch:
+                yield AsyncLocalPath(p._pathstr)
+
+    def join(self, *pathsegments: str) -> "AsyncLocalPath":
+        return AsyncLocalPath(self._sync.join(*pathsegments)._pathstr)
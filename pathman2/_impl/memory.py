@@ -0,0 +1,552 @@
+"""In-memory backend, for paths of the form memory://dir/file
+
+Files and directories live in a process-local `MemoryStore`, a tree shared
+by every path built from it. Contents are stored as immutable `bytes`, so
+reads never copy more than asked for and observe either the contents
+before or after a concurrent write, never a mix: files opened for writing
+are published when closed, as on object stores.
+
+Writing a file creates its missing parent directories, so e.g.
+`pathman.copy.copy` can target a memory path without preparing it.
+"""
+import io
+import time
+import errno
+import threading
+from pathlib import PurePosixPath
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Generator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pathman.base import AbstractAsyncPath, AbstractPath, StatResult
+from pathman.utils import Patterns, matches_patterns
+from pathman._impl.s3glob import has_magic, segments_regex
+
+SCHEME = "memory://"
+DEFAULT_CHUNK_SIZE = 1024 ** 2
+
+Parts = Tuple[str, ...]
+
+
+class _File(object):
+    __slots__ = ("data", "mtime")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.mtime = time.time()
+
+
+class _Directory(object):
+    __slots__ = ("entries", "mtime")
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, Union[_File, "_Directory"]] = {}
+        self.mtime = time.time()
+
+
+_Node = Union[_File, _Directory]
+
+
+class MemoryStore(object):
+    """Thread-safe tree of directories and files held in memory
+
+    Notes
+    -----
+        Paths use the process-wide `default_store` unless built with
+        another one, e.g. `Path("memory://data", store=MemoryStore())` for
+        an isolated namespace.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._root = _Directory()
+
+    def __repr__(self) -> str:
+        return "MemoryStore(0x{:x})".format(id(self))
+
+    def clear(self) -> None:
+        """ Remove every file and directory """
+        with self._lock:
+            self._root = _Directory()
+
+    def size(self) -> int:
+        """ Total size in bytes of the stored files """
+        with self._lock:
+            stack, total = [self._root], 0
+            while stack:
+                for node in stack.pop().entries.values():
+                    if isinstance(node, _File):
+                        total += len(node.data)
+                    else:
+                        stack.append(node)
+            return total
+
+    def _lookup(self, parts: Parts) -> Optional[_Node]:
+        with self._lock:
+            node: _Node = self._root
+            for part in parts:
+                if not isinstance(node, _Directory):
+                    return None
+                child = node.entries.get(part)
+                if child is None:
+                    return None
+                node = child
+            return node
+
+    def _directory(self, parts: Parts, create: bool) -> _Directory:
+        """ Get a directory, creating it and its parents if requested """
+        node: _Node = self._root
+        for i, part in enumerate(parts):
+            child = node.entries.get(part)  # type: ignore
+            path = _format(parts[: i + 1])
+            if child is None:
+                if not create:
+                    raise FileNotFoundError(errno.ENOENT, "No such directory", path)
+                child = node.entries[part] = _Directory()  # type: ignore
+            elif not isinstance(child, _Directory):
+                raise NotADirectoryError(errno.ENOTDIR, "Not a directory", path)
+            node = child
+        return node  # type: ignore
+
+    def _read(self, parts: Parts) -> bytes:
+        node = self._lookup(parts)
+        if node is None:
+            raise FileNotFoundError(errno.ENOENT, "No such file", _format(parts))
+        if isinstance(node, _Directory):
+            raise IsADirectoryError(errno.EISDIR, "Is a directory", _format(parts))
+        return node.data
+
+    def _write(self, parts: Parts, data: bytes, exclusive: bool = False) -> None:
+        if not parts:
+            raise IsADirectoryError(errno.EISDIR, "Is a directory", _format(parts))
+        with self._lock:
+            parent = self._directory(parts[:-1], create=True)
+            existing = parent.entries.get(parts[-1])
+            if isinstance(existing, _Directory):
+                raise IsADirectoryError(errno.EISDIR, "Is a directory", _format(parts))
+            if exclusive and existing is not None:
+                raise FileExistsError(errno.EEXIST, "File exists", _format(parts))
+            parent.entries[parts[-1]] = _File(data)
+            parent.mtime = time.time()
+
+    def _list(self, parts: Parts) -> List[Tuple[str, _Node]]:
+        """ Entries of a directory, sorted by name """
+        with self._lock:
+            node = self._lookup(parts)
+            if node is None:
+                raise FileNotFoundError(errno.ENOENT, "No such directory", _format(parts))
+            if not isinstance(node, _Directory):
+                raise NotADirectoryError(errno.ENOTDIR, "Not a directory", _format(parts))
+            return sorted(node.entries.items())
+
+
+default_store = MemoryStore()
+
+
+def _split(path: str) -> Parts:
+    """ Normalized segments of a path, with or without the scheme """
+    if path.startswith(SCHEME):
+        path = path[len(SCHEME) :]
+    parts: List[str] = []
+    for part in path.split("/"):
+        if part in ("", "."):
+            continue
+        if part == "..":
+            if parts:
+                parts.pop()
+            continue
+        parts.append(part)
+    return tuple(parts)
+
+
+def _format(parts: Parts) -> str:
+    return SCHEME + "/".join(parts)
+
+
+class _MemoryWriter(io.BytesIO):
+    """ Buffer published to the store when closed """
+
+    def __init__(self, initial: bytes, commit: Callable[[bytes], None]) -> None:
+        super().__init__(initial)
+        self._commit = commit
+
+    def close(self) -> None:
+        if not self.closed:
+            commit, self._commit = self._commit, None
+            try:
+                commit(self.getvalue())  # type: ignore
+            finally:
+                super().close()
+
+
+class MemoryPath(AbstractPath):
+    """ Path to a file or directory of a `MemoryStore` """
+
+    __slots__ = ("_pathstr", "_parts", "_store")
+
+    def __init__(self, path: str, store: Optional[MemoryStore] = None, **kwargs) -> None:
+        self._parts = _split(path)
+        self._pathstr = _format(self._parts)
+        self._store = default_store if store is None else store
+
+    def _derive(self, parts: Parts) -> "MemoryPath":
+        derived = MemoryPath.__new__(MemoryPath)
+        derived._parts = parts
+        derived._pathstr = _format(parts)
+        derived._store = self._store
+        return derived
+
+    @property
+    def store(self) -> MemoryStore:
+        """ Store holding the path """
+        return self._store
+
+    def __str__(self) -> str:
+        return self._pathstr
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __eq__(self, other) -> bool:
+        return self._pathstr == other._pathstr
+
+    def __truediv__(self, key) -> "MemoryPath":
+        return self.join(key)
+
+    @property
+    def _pure(self) -> PurePosixPath:
+        return PurePosixPath("/".join(self._parts))
+
+    @property
+    def extension(self) -> str:
+        return self._pure.suffix
+
+    def exists(self, refresh=False) -> bool:
+        return self._store._lookup(self._parts) is not None
+
+    def stat(self, refresh=False) -> StatResult:
+        """ Get the metadata of the path. Nothing is cached, so refresh has no effect """
+        node = self._store._lookup(self._parts)
+        if node is None:
+            raise FileNotFoundError(errno.ENOENT, "No such file or directory", self._pathstr)
+        if isinstance(node, _Directory):
+            return StatResult(size=0, mtime=node.mtime, etag=None, type="directory")
+        return StatResult(size=len(node.data), mtime=node.mtime, etag=None, type="file")
+
+    def touch(self) -> None:
+        with self._store._lock:
+            node = self._store._lookup(self._parts)
+            if node is None:
+                self._store._write(self._parts, b"")
+            else:
+                node.mtime = time.time()
+
+    def is_dir(self, refresh=False) -> bool:
+        return isinstance(self._store._lookup(self._parts), _Directory)
+
+    def is_file(self, refresh=False) -> bool:
+        return isinstance(self._store._lookup(self._parts), _File)
+
+    def mkdir(self, mode: int = 0o777, parents: bool = False, exist_ok: bool = False) -> None:
+        """ Create a directory. `mode` is accepted for compatibility and ignored """
+        store = self._store
+        with store._lock:
+            existing = store._lookup(self._parts)
+            if existing is not None:
+                if exist_ok and isinstance(existing, _Directory):
+                    return
+                raise FileExistsError(errno.EEXIST, "File exists", self._pathstr)
+            parent = store._directory(self._parts[:-1], create=parents)
+            parent.entries[self._parts[-1]] = _Directory()
+            parent.mtime = time.time()
+
+    def rmdir(self, recursive=False) -> None:
+        store = self._store
+        with store._lock:
+            node = store._lookup(self._parts)
+            if node is None:
+                raise FileNotFoundError(errno.ENOENT, "No such directory", self._pathstr)
+            if not isinstance(node, _Directory):
+                raise NotADirectoryError(errno.ENOTDIR, "Not a directory", self._pathstr)
+            if node.entries and not recursive:
+                raise OSError(errno.ENOTEMPTY, "Directory not empty", self._pathstr)
+            if not self._parts:
+                # the root always exists: empty it
+                node.entries = {}
+                return
+            parent = store._directory(self._parts[:-1], create=False)
+            del parent.entries[self._parts[-1]]
+            parent.mtime = time.time()
+
+    def join(self, *pathsegments: str) -> "MemoryPath":
+        return self._derive(_split("/".join((self._pathstr,) + tuple(map(str, pathsegments)))))
+
+    def open(self, mode="r", encoding=None, errors=None, newline=None):
+        """Open the file, like the built-in `open`
+
+        Files opened for writing are only visible to other readers once
+        closed.
+        """
+        store, parts = self._store, self._parts
+        if "r" in mode and "+" not in mode:
+            f = io.BytesIO(store._read(parts))
+        else:
+            if "a" in mode or "r" in mode:
+                try:
+                    initial = store._read(parts)
+                except FileNotFoundError:
+                    if "r" in mode:
+                        raise
+                    initial = b""
+            else:
+                initial = b""
+                if self.is_dir():
+                    raise IsADirectoryError(errno.EISDIR, "Is a directory", self._pathstr)
+                if "x" in mode and self.exists():
+                    raise FileExistsError(errno.EEXIST, "File exists", self._pathstr)
+            exclusive = "x" in mode
+            f = _MemoryWriter(initial, lambda data: store._write(parts, data, exclusive))
+            if "a" in mode:
+                f.seek(0, io.SEEK_END)
+        if "b" in mode:
+            return f
+        return io.TextIOWrapper(f, encoding=encoding, errors=errors, newline=newline)
+
+    def write_bytes(self, contents) -> int:
+        data = bytes(contents)
+        self._store._write(self._parts, data)
+        return len(data)
+
+    def write_text(self, contents, encoding=None, errors=None, newline=None) -> int:
+        with self.open("w", encoding=encoding, errors=errors, newline=newline) as f:
+            return f.write(contents)
+
+    def remove(self) -> None:
+        store = self._store
+        with store._lock:
+            if isinstance(store._lookup(self._parts), _Directory):
+                raise IsADirectoryError(errno.EISDIR, "Is a directory", self._pathstr)
+            store._read(self._parts)
+            parent = store._directory(self._parts[:-1], create=False)
+            del parent.entries[self._parts[-1]]
+            parent.mtime = time.time()
+
+    def read_text(self, encoding=None, errors=None) -> str:
+        with self.open("r", encoding=encoding, errors=errors) as f:
+            return f.read()
+
+    def read_bytes(self) -> bytes:
+        return self._store._read(self._parts)
+
+    def read_range(self, offset: int, length: Optional[int] = None) -> bytes:
+        data = self._store._read(self._parts)
+        start = max(len(data) + offset, 0) if offset < 0 else offset
+        return data[start:] if length is None else data[start : start + length]
+
+    def iter_bytes(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        data = self._store._read(self._parts)
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+    def readinto(self, buffer, offset: int = 0) -> int:
+        view = memoryview(buffer).cast("B")
+        data = memoryview(self._store._read(self._parts))[offset : offset + view.nbytes]
+        view[:data.nbytes] = data
+        return data.nbytes
+
+    def memoryview(self) -> memoryview:
+        """ Read-only view of the contents, without copying them """
+        return memoryview(self._store._read(self._parts))
+
+    def copy_file(self, dest: "MemoryPath") -> None:
+        """ Copy the file to another memory path without duplicating its contents """
+        dest._store._write(dest._parts, self._store._read(self._parts))
+
+    def expanduser(self) -> "MemoryPath":
+        return self
+
+    def abspath(self) -> "MemoryPath":
+        return self
+
+    def walk(
+        self,
+        include: Patterns = None,
+        exclude: Patterns = None,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[["MemoryPath"], bool]] = None,
+    ) -> Generator["MemoryPath", None, None]:
+        """Lazily yield every file below the current path, in name order
+
+        Parameters
+        ----------
+        include: str or list of str, optional
+            Only yield files whose path relative to this one matches a pattern
+        exclude: str or list of str, optional
+            Skip files, and do not descend into directories, whose relative
+            path matches a pattern
+        max_depth: int, optional
+            Maximum depth of yielded files; 1 only yields direct children
+        prune: callable, optional
+            Called with each directory; if it returns True the directory is
+            not descended into
+        """
+        stack = [(self._parts, "", 1)]
+        while stack:
+            parts, relative_dir, depth = stack.pop()
+            try:
+                entries = self._store._list(parts)
+            except (FileNotFoundError, NotADirectoryError):
+                # removed since it was listed
+                continue
+            subdirectories = []
+            for name, node in entries:
+                relative = relative_dir + name
+                if isinstance(node, _File):
+                    if matches_patterns(relative, include, exclude):
+                        yield self._derive(parts + (name,))
+                    continue
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                if exclude and not matches_patterns(relative, exclude=exclude):
+                    continue
+                if prune is not None and prune(self._derive(parts + (name,))):
+                    continue
+                subdirectories.append((parts + (name,), relative + "/", depth + 1))
+            stack.extend(reversed(subdirectories))
+
+    def ls(self) -> List["MemoryPath"]:
+        return [self._derive(self._parts + (name,)) for name, _ in self._store._list(self._parts)]
+
+    def glob(self, pattern) -> List["MemoryPath"]:
+        return list(self.iglob(pattern))
+
+    def iglob(self, pattern) -> Generator["MemoryPath", None, None]:
+        """ Lazily yield the files and directories matching a glob pattern """
+        segments = [s for s in pattern.split("/") if s not in ("", ".")]
+        node = self._store._lookup(self._parts)
+        if node is None or not segments:
+            return
+        for parts in self._iglob(self._parts, node, segments):
+            yield self._derive(parts)
+
+    def _iglob(self, parts: Parts, node: _Node, segments: List[str]) -> Iterator[Parts]:
+        if not segments:
+            yield parts
+            return
+        if not isinstance(node, _Directory):
+            return
+        segment, rest = segments[0], segments[1:]
+        if segment == "**":
+            regex = segments_regex(segments)
+            for relative in self._descendants(parts):
+                if regex.match("/".join(relative)):
+                    yield parts + relative
+            return
+        if not has_magic(segment):
+            child = self._store._lookup(parts + (segment,))
+            if child is not None:
+                yield from self._iglob(parts + (segment,), child, rest)
+            return
+        regex = segments_regex([segment])
+        for name, child in self._store._list(parts):
+            if regex.match(name):
+                yield from self._iglob(parts + (name,), child, rest)
+
+    def _descendants(self, parts: Parts) -> Iterator[Parts]:
+        """ Relative segments of every file and directory below parts """
+        stack: List[Parts] = [()]
+        while stack:
+            relative = stack.pop()
+            try:
+                entries = self._store._list(parts + relative)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            for name, node in reversed(entries):
+                if isinstance(node, _Directory):
+                    stack.append(relative + (name,))
+            for name, _ in entries:
+                yield relative + (name,)
+
+    def with_suffix(self, suffix) -> "MemoryPath":
+        return self._derive(self._parts[:-1] + (self._pure.with_suffix(suffix).name,))
+
+    @property
+    def stem(self) -> str:
+        return self._pure.stem
+
+    @property
+    def parts(self) -> List[str]:
+        return ["memory:"] + list(self._parts)
+
+
+class AsyncMemoryPath(AbstractAsyncPath):
+    """asyncio counterpart of `MemoryPath`
+
+    Operations never block, so they run directly on the event loop.
+    """
+
+    __slots__ = ("_sync",)
+
+    def __init__(self, path: str, **kwargs) -> None:
+        self._sync = MemoryPath(path, **kwargs)
+
+    @classmethod
+    def _wrap(cls, path: MemoryPath) -> "AsyncMemoryPath":
+        wrapped = cls.__new__(cls)
+        wrapped._sync = path
+        return wrapped
+
+    @property
+    def _pathstr(self) -> str:
+        return self._sync._pathstr
+
+    def __str__(self) -> str:
+        return self._pathstr
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __eq__(self, other) -> bool:
+        return self._pathstr == other._pathstr
+
+    async def stat(self, refresh=False) -> StatResult:
+        return self._sync.stat()
+
+    async def exists(self, refresh=False) -> bool:
+        return self._sync.exists()
+
+    async def is_dir(self, refresh=False) -> bool:
+        return self._sync.is_dir()
+
+    async def is_file(self, refresh=False) -> bool:
+        return self._sync.is_file()
+
+    async def read_bytes(self) -> bytes:
+        return self._sync.read_bytes()
+
+    async def write_bytes(self, contents) -> int:
+        return self._sync.write_bytes(contents)
+
+    async def remove(self) -> None:
+        return self._sync.remove()
+
+    async def ls(self) -> List["AsyncMemoryPath"]:
+        return [self._wrap(p) for p in self._sync.ls()]
+
+    async def walk(self, **kwargs) -> AsyncIterator["AsyncMemoryPath"]:
+        prune = kwargs.get("prune")
+        if prune is not None:
+            kwargs["prune"] = lambda p: prune(self._wrap(p))
+        for p in self._sync.walk(**kwargs):
+            yield self._wrap(p)
+
+    def join(self, *pathsegments: str) -> "AsyncMemoryPath":
+        return self._wrap(self._sync.join(*pathsegments))
@@ -1,29 +1,77 @@
 import os
-import importlib
-from typing import List, Generator
+from typing import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Generator,
+    Optional,
+    Tuple,
+)
 from pathlib import PurePath
 
-from pathman.base import AbstractPath, RemotePath
-from pathman.utils import is_file
+from pathman.base import AbstractAsyncPath, AbstractPath, RemotePath, StatResult
+from pathman.diskcache import DiskCache, get_disk_cache
+from pathman.utils import Patterns, matches_patterns
+from pathman._impl.cache import StatCache
+from pathman._impl.s3glob import iglob_keys
+from pathman._impl.s3upload import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PART_SIZE, MultipartWriter
+from pathman._impl.listing import parallel_list_objects
+from pathman._impl.session import (
+    STAT_CACHE_OPTIONS,
+    get_client,
+    get_async_filesystem,
+    get_filesystem,
+    get_stat_cache,
+    client_kwargs_from_filesystem_kwargs,
+)
+
+_MISSING = object()
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 ** 2
+
+# maximum number of objects AsyncS3Path.copy copies at once
+ASYNC_COPY_CONCURRENCY = 32
 
 
 class S3Path(AbstractPath, RemotePath):
-    """ Wrapper around `s3fs.S3FileSystem`  """
+    """Wrapper around `s3fs.S3FileSystem`
 
-    def __init__(self, path: str, **kwargs) -> None:
-        try:
-            importlib.import_module("s3fs")
-        except ImportError:
-            raise ImportError("s3fs is required for S3Path")
+    Notes
+    -----
+        Paths built with equivalent keyword arguments share a single
+        `s3fs.S3FileSystem` (see `pathman._impl.session`), so creating many
+        paths does not create many clients or connection pools.
+
+        Metadata is cached for 60 seconds in a cache of up to 100000 entries
+        shared by those paths. The `stat_ttl` and `stat_maxsize` keyword
+        arguments change this; `stat_ttl=0` disables caching.
+    """
 
-        from s3fs import S3FileSystem  # type: ignore
+    __slots__ = ("_original_kwargs", "_pathstr", "_anon", "_path", "_stat_cache")
 
+    def __init__(self, path: str, **kwargs) -> None:
         self._original_kwargs = dict({}, **kwargs)
         self._pathstr = path
         if "anon" not in kwargs:
             kwargs["anon"] = False
         self._anon = kwargs["anon"]
-        self._path = S3FileSystem(**kwargs)
+        cache_options = {k: kwargs.pop(k) for k in STAT_CACHE_OPTIONS if k in kwargs}
+        self._path = get_filesystem(**kwargs)
+        self._stat_cache = get_stat_cache(**kwargs, **cache_options)
+
+    def _derive(self, path: str) -> "S3Path":
+        """Build a path with the same configuration, sharing this path's
+        filesystem and metadata cache instead of looking them up again
+        """
+        derived = S3Path.__new__(S3Path)
+        derived._original_kwargs = self._original_kwargs
+        derived._pathstr = path
+        derived._anon = self._anon
+        derived._path = self._path
+        derived._stat_cache = self._stat_cache
+        return derived
 
     def __str__(self) -> str:
         return self._pathstr
@@ -50,33 +98,143 @@ class S3Path(AbstractPath, RemotePath):
         tokens = str(self._pathstr).replace("s3://", "").split("/")
         return "/".join(tokens[1:])
 
-    def exists(self) -> bool:
-        return self._path.exists(self._pathstr)
+    @property
+    def client_kwargs(self) -> dict:
+        """ Keyword arguments of `get_client` for a client with the same credentials """
+        return client_kwargs_from_filesystem_kwargs(self._original_kwargs)
+
+    @property
+    def client(self):
+        """ Shared boto3 s3 client configured with the same credentials """
+        return get_client(**self.client_kwargs)
+
+    def stat(self, refresh=False) -> StatResult:
+        """Get the size, modification time, ETag and type of the path
+
+        Results (including "does not exist") are cached for a short time and
+        shared by every path built with the same configuration. Listings from
+        `ls`, `walk` and `glob` fill the cache as a side effect.
+
+        Parameters
+        ----------
+        refresh: bool, optional
+            If True, skip the cache and ask S3
+
+        Raises
+        ------
+        FileNotFoundError
+            If nothing exists at the path
+        """
+        if not refresh:
+            cached = _cached_stat(self._stat_cache, self._pathstr)
+            if cached is not _MISSING:
+                return cached
+        try:
+            info = self._path.info(self._pathstr, refresh=refresh)
+        except FileNotFoundError:
+            self._stat_cache.set(_cache_key(self._pathstr), None)
+            raise
+        result = _stat_from_info(info)
+        self._stat_cache.set(_cache_key(self._pathstr), result)
+        return result
+
+    def exists(self, refresh=False) -> bool:
+        try:
+            self.stat(refresh)
+        except FileNotFoundError:
+            return False
+        return True
 
     def touch(self) -> None:
+        self._invalidate()
         return self._path.touch(self._pathstr)
 
-    def is_dir(self) -> bool:
-        return self.exists() and not is_file(self._pathstr)
+    def is_dir(self, refresh=False) -> bool:
+        try:
+            return self.stat(refresh).is_dir
+        except FileNotFoundError:
+            return False
 
-    def is_file(self) -> bool:
-        return self.exists() and is_file(self._pathstr)
+    def is_file(self, refresh=False) -> bool:
+        try:
+            return self.stat(refresh).is_file
+        except FileNotFoundError:
+            return False
 
     def mkdir(self, **kwargs) -> None:
+        self._invalidate()
         return self._path.mkdir(self._pathstr, **kwargs)
 
     def rmdir(self, recursive=False, **kwargs) -> None:
+        self._invalidate(recursive=True)
         if recursive:
             return self._path.rm(self._pathstr, recursive=True, **kwargs)
         return self._path.rmdir(self._pathstr, **kwargs)
 
     def join(self, *pathsegments: str) -> "S3Path":
-        joined = os.path.join(self._pathstr, *pathsegments)
-        return S3Path(joined, **self._original_kwargs)
-
-    def open(self, mode="r", **kwargs):
+        return self._derive(os.path.join(self._pathstr, *pathsegments))
+
+    def open(
+        self,
+        mode="r",
+        block_size: Optional[int] = None,
+        cache_type: Optional[str] = None,
+        **kwargs
+    ):
+        """Open the object as a file
+
+        Parameters
+        ----------
+        mode: str, optional
+            Mode to use when opening the file
+        block_size: int, optional
+            Bytes fetched per request (read) or buffered per part (write).
+            Defaults to the filesystem's `default_block_size`
+        cache_type: str, optional
+            Read-ahead strategy when reading: "readahead" (sequential reads),
+            "blockcache" or "bytes" (scattered reads), "first" (repeated
+            header reads), "none" or "all". Defaults to the filesystem's
+            `default_cache_type`
+
+        Notes
+        -----
+            Per-path defaults can be set with the `default_block_size` and
+            `default_cache_type` keyword arguments of `Path`.
+
+            If a disk cache is enabled (see `pathman.diskcache`), objects
+            opened for reading are downloaded into it once per ETag and
+            opened from there. The ETag comes from `stat`, so an object
+            changed by someone else may be served stale for as long as its
+            metadata stays cached.
+        """
+        if "r" not in mode or "+" in mode:
+            self._invalidate()
+        else:
+            cache = get_disk_cache()
+            if cache is not None and not kwargs:
+                filename = self._cached_copy(cache)
+                if filename is not None:
+                    return open(filename, mode)
+        if block_size is not None:
+            kwargs["block_size"] = block_size
+        if cache_type is not None:
+            kwargs["cache_type"] = cache_type
         return self._path.open(self._pathstr, mode=mode, **kwargs)
 
+    def _cached_copy(self, cache: DiskCache) -> Optional[str]:
+        """ Filename of the object's copy in the disk cache, None for directories """
+        for refresh in (False, True):
+            etag = self.stat(refresh=refresh).etag
+            if etag is None:
+                return None
+            try:
+                return fetch_cached(cache, self.client, self.bucket, self.key, etag)
+            except Exception as e:
+                # the cached stat was stale: the object changed since
+                if refresh or _error_code(e) not in ("PreconditionFailed", "412"):
+                    raise
+        return None
+
     def write_bytes(self, contents, **kwargs):
         with self.open("wb") as f:
             written = f.write(contents)
@@ -87,7 +245,55 @@ class S3Path(AbstractPath, RemotePath):
             written = f.write(contents)
         return written
 
+    def open_stream(
+        self,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        **extra_args
+    ) -> MultipartWriter:
+        """Open the object for writing, uploading it in concurrent parts as it is written
+
+        Parameters
+        ----------
+        part_size: int, optional
+            Size in bytes of the first parts (at least 5 MiB)
+        max_in_flight: int, optional
+            Maximum number of parts uploading at once. Memory use is bounded
+            by about (max_in_flight + 1) * part_size
+        extra_args:
+            Passed to `put_object`, e.g. ContentType or Metadata
+
+        Returns
+        -------
+        MultipartWriter: write-only file object. The object is written when
+        it is closed, and the upload aborted if the `with` block it is used
+        in raises (or if `abort` is called)
+        """
+        self._invalidate()
+        return MultipartWriter(
+            self.client,
+            self.bucket,
+            self.key,
+            part_size=part_size,
+            max_in_flight=max_in_flight,
+            extra_args=extra_args,
+            on_close=self._invalidate,
+        )
+
+    def write_stream(self, chunks: Iterable[bytes], **kwargs) -> int:
+        """Write the object from an iterable of byte chunks (see `open_stream`)
+
+        Returns
+        -------
+        int: number of bytes written
+        """
+        with self.open_stream(**kwargs) as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return f.tell()
+
     def remove(self) -> None:
+        self._invalidate()
         return self._path.rm(self._pathstr)
 
     def read_text(self, **kwargs):
@@ -100,33 +306,167 @@ class S3Path(AbstractPath, RemotePath):
             contents = f.read(**kwargs)
         return contents
 
+    def read_range(self, offset: int, length: Optional[int] = None) -> bytes:
+        """Read bytes [offset, offset + length) with a single ranged request
+
+        A negative offset counts from the end of the object, so
+        `read_range(-8)` reads the last 8 bytes
+        """
+        if length == 0:
+            return b""
+        if offset < 0 and length is not None:
+            offset = max(self.stat().size + offset, 0)
+        # a negative offset is now a suffix range, which S3 clamps itself
+        end = None if length is None else offset + length
+        try:
+            return self._path.cat_file(self._pathstr, start=offset, end=end)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # S3 rejects ranges of empty objects, or starting past the end
+            size = self.stat(refresh=True).size
+            if size and offset < size:
+                raise
+            return b""
+
+    def iter_bytes(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """ Stream the object in chunks, one ranged request per chunk """
+        with self.open("rb", block_size=chunk_size, cache_type="none") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                yield chunk
+
+    def readinto(self, buffer, offset: int = 0) -> int:
+        """ Fill buffer with the bytes of the object starting at offset """
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        with self.open("rb", block_size=view.nbytes or None, cache_type="none") as f:
+            f.seek(offset)
+            while filled < view.nbytes:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+        return filled
+
+    def memoryview(self) -> memoryview:
+        """Read the whole object into a single buffer and return a read-only view
+
+        Unlike `read_bytes`, the contents are downloaded straight into a
+        buffer sized from the object's metadata
+        """
+        buffer = bytearray(self.stat().size)
+        filled = self.readinto(buffer)
+        return memoryview(buffer)[:filled].toreadonly()
+
     def expanduser(self) -> "S3Path":
         return self
 
     def abspath(self) -> "S3Path":
         return self
 
-    def walk(self, **kwargs) -> Generator["S3Path", None, None]:
-        for root, directories, files in self._path.walk(self._pathstr, **kwargs):
-            for f in files:
-                yield S3Path(os.path.join(root, f), **self._original_kwargs)
+    def walk(
+        self,
+        include: Patterns = None,
+        exclude: Patterns = None,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[["S3Path"], bool]] = None,
+        parallelism: Optional[int] = None,
+        ordered: bool = False,
+    ) -> Generator["S3Path", None, None]:
+        """Lazily yield every object below the current path
+
+        The listing metadata of each object is kept in the stat cache, so
+        `stat`, `is_file` and `exists` on yielded paths need no request.
+
+        Parameters
+        ----------
+        include: str or list of str, optional
+            Only yield objects whose key relative to this path matches a pattern
+        exclude: str or list of str, optional
+            Skip objects, and do not descend into prefixes, whose relative key
+            matches a pattern
+        max_depth: int, optional
+            Maximum depth of yielded objects; 1 only yields direct children
+        prune: callable, optional
+            Called with each sub-prefix; if it returns True it is not listed
+        parallelism: int, optional
+            If greater than 1, split the prefix into shards that are listed
+            concurrently (see `pathman._impl.listing`)
+        ordered: bool, optional
+            With parallelism, yield objects in key order instead of as soon
+            as they are listed
+
+        Notes
+        -----
+            Without `exclude`, `max_depth` or `prune`, the whole prefix is
+            read with flat (paginated) listings and streamed as pages arrive.
+            Otherwise it is listed one "directory" at a time so that pruned
+            prefixes are never listed.
+        """
+        root = _cache_key(self._pathstr)[len("s3://") :]
+        if exclude is None and max_depth is None and prune is None:
+            bucket, _, key = root.partition("/")
+            objects = parallel_list_objects(
+                self.client,
+                bucket,
+                key + "/" if key else "",
+                parallelism=parallelism or 1,
+                ordered=ordered,
+            )
+            for obj in objects:
+                relative = obj["Key"][len(key) + 1 if key else 0 :]
+                if obj["Key"].endswith("/") or not matches_patterns(relative, include):
+                    continue
+                path = "s3://{}/{}".format(bucket, obj["Key"])
+                self._stat_cache.set(_cache_key(path), _stat_from_object(obj))
+                yield self._derive(path)
+            return
+
+        for directory, subdirectories, files in self._path.walk(
+            self._pathstr, maxdepth=max_depth, detail=True
+        ):
+            for name, info in list(subdirectories.items()):
+                _remember(self._stat_cache, info)
+                relative = info["name"].rstrip("/")[len(root) + 1 :]
+                if (exclude and not matches_patterns(relative, exclude=exclude)) or (
+                    prune is not None and prune(self._derive("s3://" + info["name"]))
+                ):
+                    # walk does not descend into directories removed here
+                    del subdirectories[name]
+            for info in files.values():
+                if matches_patterns(info["name"][len(root) + 1 :], include, exclude):
+                    yield self._from_info(info)
 
     def ls(self, refresh=True) -> List["S3Path"]:
-        all_files = [
-            S3Path("s3://" + c, **self._original_kwargs)
-            for c in self._path.ls(self._pathstr)
+        return [
+            self._from_info(info)
+            for info in self._path.ls(self._pathstr, detail=True, refresh=refresh)
         ]
-        return all_files
 
     def glob(self, pattern) -> List["S3Path"]:
-        globber = self.join(pattern)._pathstr
-        return [
-            S3Path("s3://" + p, **self._original_kwargs)
-            for p in self._path.glob(globber)
-        ]
+        return list(self.iglob(pattern))
+
+    def iglob(self, pattern) -> Generator["S3Path", None, None]:
+        """Lazily yield the keys and prefixes matching a pattern relative to this path
+
+        Only the prefixes that can match are listed: every literal character
+        in front of a wildcard is sent to S3 as part of the listing prefix,
+        and `**` (any number of levels) only flat-lists the prefix it
+        appears under. See `pathman._impl.s3glob`.
+        """
+        bucket, _, key_pattern = _cache_key(self.join(pattern)._pathstr)[
+            len("s3://") :
+        ].partition("/")
+        for match in iglob_keys(self.client, bucket, key_pattern):
+            path = "s3://{}/{}".format(bucket, match.key)
+            if match.is_dir:
+                self._stat_cache.set(_cache_key(path), _DIRECTORY)
+            else:
+                self._stat_cache.set(_cache_key(path), _stat_from_object(match.obj))
+            yield self._derive(path)
 
     def with_suffix(self, suffix) -> "S3Path":
-        return S3Path(self._pathstr + suffix, **self._original_kwargs)
+        return self._derive(self._pathstr + suffix)
 
     @property
     def stem(self) -> str:
@@ -137,3 +477,282 @@ class S3Path(AbstractPath, RemotePath):
         tokens = self._pathstr.split("/")
         tokens = [t for t in tokens if t not in [""]]
         return tokens
+
+    def _remember(self, info: dict) -> StatResult:
+        """ Cache metadata returned by a listing """
+        return _remember(self._stat_cache, info)
+
+    def _from_info(self, info: dict) -> "S3Path":
+        _remember(self._stat_cache, info)
+        return self._derive("s3://" + info["name"])
+
+    def _invalidate(self, recursive=False) -> None:
+        _invalidate(self._stat_cache, self._pathstr, recursive=recursive)
+
+
+class AsyncS3Path(AbstractAsyncPath, RemotePath):
+    """asyncio counterpart of `S3Path`, backed by s3fs's asynchronous API
+
+    Notes
+    -----
+        The underlying filesystem is shared per configuration and event loop
+        (see `pathman._impl.session.get_async_filesystem`). Metadata is cached
+        in the same stat cache as `S3Path`.
+    """
+
+    __slots__ = ("_original_kwargs", "_fs_kwargs", "_pathstr", "_stat_cache")
+
+    def __init__(self, path: str, **kwargs) -> None:
+        self._original_kwargs = dict({}, **kwargs)
+        self._pathstr = path
+        if "anon" not in kwargs:
+            kwargs["anon"] = False
+        cache_options = {k: kwargs.pop(k) for k in STAT_CACHE_OPTIONS if k in kwargs}
+        self._fs_kwargs = kwargs
+        self._stat_cache = get_stat_cache(**kwargs, **cache_options)
+
+    def _derive(self, path: str) -> "AsyncS3Path":
+        derived = AsyncS3Path.__new__(AsyncS3Path)
+        derived._original_kwargs = self._original_kwargs
+        derived._fs_kwargs = self._fs_kwargs
+        derived._pathstr = path
+        derived._stat_cache = self._stat_cache
+        return derived
+
+    def __str__(self) -> str:
+        return self._pathstr
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __eq__(self, other) -> bool:
+        return self._pathstr == other._pathstr
+
+    async def _fs(self):
+        return await get_async_filesystem(**self._fs_kwargs)
+
+    async def stat(self, refresh=False) -> StatResult:
+        if not refresh:
+            cached = _cached_stat(self._stat_cache, self._pathstr)
+            if cached is not _MISSING:
+                return cached
+        fs = await self._fs()
+        try:
+            info = await fs._info(self._pathstr, refresh=refresh)
+        except FileNotFoundError:
+            self._stat_cache.set(_cache_key(self._pathstr), None)
+            raise
+        result = _stat_from_info(info)
+        self._stat_cache.set(_cache_key(self._pathstr), result)
+        return result
+
+    async def exists(self, refresh=False) -> bool:
+        try:
+            await self.stat(refresh)
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def is_dir(self, refresh=False) -> bool:
+        try:
+            return (await self.stat(refresh)).is_dir
+        except FileNotFoundError:
+            return False
+
+    async def is_file(self, refresh=False) -> bool:
+        try:
+            return (await self.stat(refresh)).is_file
+        except FileNotFoundError:
+            return False
+
+    async def read_bytes(self) -> bytes:
+        fs = await self._fs()
+        return await fs._cat_file(self._pathstr)
+
+    async def write_bytes(self, contents) -> int:
+        fs = await self._fs()
+        _invalidate(self._stat_cache, self._pathstr)
+        await fs._pipe_file(self._pathstr, contents)
+        return len(contents)
+
+    async def remove(self) -> None:
+        fs = await self._fs()
+        _invalidate(self._stat_cache, self._pathstr)
+        await fs._rm_file(self._pathstr)
+
+    async def ls(self, refresh=True) -> List["AsyncS3Path"]:
+        fs = await self._fs()
+        return [
+            self._from_info(info)
+            for info in await fs._ls(self._pathstr, detail=True, refresh=refresh)
+        ]
+
+    async def walk(
+        self,
+        include: Patterns = None,
+        exclude: Patterns = None,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[["AsyncS3Path"], bool]] = None,
+    ) -> AsyncIterator["AsyncS3Path"]:
+        """ Lazily yield every object below the current path, as `S3Path.walk` """
+        fs = await self._fs()
+        root = _cache_key(self._pathstr)[len("s3://") :]
+        async for directory, subdirectories, files in fs._walk(
+            self._pathstr, maxdepth=max_depth, detail=True
+        ):
+            for name, info in list(subdirectories.items()):
+                _remember(self._stat_cache, info)
+                relative = info["name"].rstrip("/")[len(root) + 1 :]
+                if (exclude and not matches_patterns(relative, exclude=exclude)) or (
+                    prune is not None and prune(self._derive("s3://" + info["name"]))
+                ):
+                    # _walk does not descend into directories removed here
+                    del subdirectories[name]
+            for info in files.values():
+                if matches_patterns(info["name"][len(root) + 1 :], include, exclude):
+                    yield self._from_info(info)
+
+    def join(self, *pathsegments: str) -> "AsyncS3Path":
+        return self._derive(os.path.join(self._pathstr, *pathsegments))
+
+    async def copy(self, dest: "AsyncS3Path") -> List[Tuple[str, str, int]]:
+        """Server-side copy of an object, or of every object below a prefix
+
+        Keys are laid out as by `pathman.copy.copy_s3_s3`: an object is copied
+        to dest itself, and the objects below a prefix to the same relative
+        keys below dest, whether or not dest already exists
+
+        Returns
+        -------
+        list of (src, dest, size) tuples: one per copied object
+        """
+        import asyncio
+
+        fs = await self._fs()
+        if await self.is_dir():
+            prefix = self._pathstr.rstrip("/") + "/"
+            dest_prefix = dest._pathstr.rstrip("/") + "/"
+            copies = []
+            async for path in self.walk():
+                target = dest_prefix + path._pathstr[len(prefix) :]
+                copies.append((path._pathstr, target, (await path.stat()).size))
+        elif await self.is_file():
+            copies = [(self._pathstr, dest._pathstr, (await self.stat()).size)]
+        else:
+            raise FileNotFoundError(self._pathstr)
+        slots = asyncio.Semaphore(ASYNC_COPY_CONCURRENCY)
+
+        async def _copy(source: str, target: str) -> None:
+            async with slots:
+                await fs._cp_file(source, target)
+
+        try:
+            await asyncio.gather(*(_copy(source, target) for source, target, _ in copies))
+        finally:
+            _invalidate(dest._stat_cache, dest._pathstr, recursive=True)
+        return copies
+
+    def _from_info(self, info: dict) -> "AsyncS3Path":
+        _remember(self._stat_cache, info)
+        return self._derive("s3://" + info["name"])
+
+
+def fetch_cached(cache: DiskCache, client, bucket: str, key: str, etag: str, **kwargs) -> str:
+    """Get the disk cache's copy of an object, downloading it on a miss
+
+    The download is conditional on the ETag, so the cache never holds
+    contents that do not match the ETag they are stored under
+
+    Parameters
+    ----------
+    kwargs:
+        Passed to `get_object`
+
+    Returns
+    -------
+    str: filename of the cached copy
+    """
+    etag = etag.strip('"')
+
+    def _download(filename: str) -> None:
+        response = client.get_object(
+            Bucket=bucket, Key=key, IfMatch='"{}"'.format(etag), **kwargs
+        )
+        with open(filename, "wb") as f:
+            for chunk in response["Body"].iter_chunks(DEFAULT_CHUNK_SIZE):
+                f.write(chunk)
+
+    return cache.fetch(bucket, key, etag, _download)
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """ Error code of a botocore ClientError, if error is one """
+    return getattr(error, "response", {}).get("Error", {}).get("Code")
+
+
+def _cache_key(path: str) -> str:
+    return "s3://" + path.replace("s3://", "", 1).rstrip("/")
+
+
+def _cached_stat(cache: StatCache, path: str):
+    """Look a path up in the stat cache
+
+    Returns the cached StatResult, or _MISSING if nothing is cached
+
+    Raises
+    ------
+    FileNotFoundError
+        If the path is cached as not existing
+    """
+    cached = cache.get(_cache_key(path), _MISSING)
+    if cached is None:
+        raise FileNotFoundError(path)
+    return cached
+
+
+def _remember(cache: StatCache, info: dict) -> StatResult:
+    """ Cache metadata returned by an info call or a listing """
+    result = _stat_from_info(info)
+    cache.set(_cache_key(info["name"]), result)
+    return result
+
+
+def _invalidate(cache: StatCache, path: str, recursive=False) -> None:
+    """Drop cached metadata for a path and its parents
+
+    Parents are included since creating or deleting a key can create or
+    delete the "directories" above it
+    """
+    cache_key = _cache_key(path)
+    if recursive:
+        cache.invalidate_prefix(cache_key + "/")
+    while "/" in cache_key[len("s3://") :]:
+        cache.invalidate(cache_key)
+        cache_key = cache_key.rsplit("/", 1)[0]
+    cache.invalidate(cache_key)
+
+
+_DIRECTORY = StatResult(size=0, mtime=None, etag=None, type="directory")
+
+
+def _stat_from_object(obj: dict) -> StatResult:
+    """ Convert a list_objects_v2 "Contents" entry to a StatResult """
+    return StatResult(
+        size=obj["Size"],
+        mtime=obj["LastModified"].timestamp(),
+        etag=obj["ETag"].strip('"'),
+        type="file",
+    )
+
+
+def _stat_from_info(info: dict) -> StatResult:
+    """ Convert an s3fs info/listing entry to a StatResult """
+    if info.get("type") == "directory":
+        return _DIRECTORY
+    mtime = info.get("LastModified")
+    if mtime is not None and hasattr(mtime, "timestamp"):
+        mtime = mtime.timestamp()
+    etag = info.get("ETag")
+    if etag is not None:
+        etag = etag.strip('"')
+    return StatResult(size=int(info.get("size") or 0), mtime=mtime, etag=etag, type="file")
@@ -0,0 +1,151 @@
+"""Glob matching pushed down to S3 listings
+
+A pattern such as `logs/2026-10-*/part-*.gz` is evaluated one key segment
+at a time. Each wildcard segment is listed with a `Delimiter="/"` request
+whose `Prefix` includes every literal character in front of the first
+wildcard, so S3 only returns the sub-prefixes (or keys) that can still
+match. Only `**` segments fall back to a flat listing, and only of the
+prefix they appear under.
+"""
+import re
+import fnmatch
+from typing import Iterator, List, NamedTuple, Optional, Pattern
+
+MAGIC = re.compile(r"[*?[]")
+
+
+class GlobMatch(NamedTuple):
+    """ A key or common prefix matched by a glob """
+
+    key: str  # without trailing "/" for prefixes
+    is_dir: bool
+    obj: Optional[dict]  # list_objects_v2 "Contents" entry for keys
+
+
+def has_magic(segment: str) -> bool:
+    return MAGIC.search(segment) is not None
+
+
+def literal_prefix(segment: str) -> str:
+    """ Characters of a segment in front of its first wildcard """
+    match = MAGIC.search(segment)
+    return segment if match is None else segment[: match.start()]
+
+
+def segments_regex(segments: List[str]) -> Pattern:
+    """Compile pattern segments into a regex matched against "/"-joined keys
+
+    `**` matches any number (including zero) of whole segments, while `*`
+    and `?` never match "/".
+    """
+    parts = []
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == "**":
+            parts.append(".*" if last else "(?:[^/]*/)*")
+        else:
+            parts.append(_translate(segment) + ("" if last else "/"))
+    return re.compile("(?s:" + "".join(parts) + r")\Z")
+
+
+def _translate(segment: str) -> str:
+    """ Like `fnmatch.translate`, but wildcards never match "/" """
+    out = []
+    i, n = 0, len(segment)
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i
+            if j < n and segment[j] == "!":
+                j += 1
+            if j < n and segment[j] == "]":
+                j += 1
+            while j < n and segment[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+                continue
+            body = segment[i:j].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            elif body.startswith("^"):
+                body = "\\" + body
+            out.append("[" + body + "]")
+            i = j + 1
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+def iglob_keys(client, bucket: str, pattern: str) -> Iterator[GlobMatch]:
+    """Lazily yield the keys and common prefixes of a bucket matching pattern
+
+    Parameters
+    ----------
+    client: botocore.client.S3
+        Client used for the listings
+    bucket: str
+        Bucket to search
+    pattern: str
+        "/"-separated glob relative to the bucket root
+    """
+    segments = [s for s in pattern.split("/") if s]
+    return _iglob(client, bucket, "", segments)
+
+
+def _iglob(client, bucket: str, base: str, segments: List[str]) -> Iterator[GlobMatch]:
+    magic_at = next((i for i, s in enumerate(segments) if has_magic(s)), None)
+    if magic_at is None:
+        yield from _literal(client, bucket, base + "/".join(segments))
+        return
+
+    base = base + "".join(s + "/" for s in segments[:magic_at])
+    segment, rest = segments[magic_at], segments[magic_at + 1 :]
+
+    if segment == "**":
+        regex = segments_regex(segments[magic_at:])
+        for page in _pages(client, bucket, base, delimiter=None):
+            for obj in page.get("Contents", []):
+                if regex.match(obj["Key"][len(base) :]):
+                    yield GlobMatch(obj["Key"], False, obj)
+        return
+
+    for page in _pages(client, bucket, base + literal_prefix(segment), delimiter="/"):
+        for common in page.get("CommonPrefixes", []):
+            prefix = common["Prefix"]
+            if not fnmatch.fnmatchcase(prefix[len(base) : -1], segment):
+                continue
+            if rest:
+                yield from _iglob(client, bucket, prefix, rest)
+            else:
+                yield GlobMatch(prefix[:-1], True, None)
+        if rest:
+            continue
+        for obj in page.get("Contents", []):
+            if fnmatch.fnmatchcase(obj["Key"][len(base) :], segment):
+                yield GlobMatch(obj["Key"], False, obj)
+
+
+def _literal(client, bucket: str, key: str) -> Iterator[GlobMatch]:
+    """ Match a pattern without wildcards: the key itself or a prefix """
+    # a key sorts before every other key it is a prefix of
+    listing = client.list_objects_v2(Bucket=bucket, Prefix=key, MaxKeys=1)
+    for obj in listing.get("Contents", []):
+        if obj["Key"] == key:
+            yield GlobMatch(key, False, obj)
+            return
+    listing = client.list_objects_v2(Bucket=bucket, Prefix=key + "/", MaxKeys=1)
+    if listing.get("KeyCount", 0):
+        yield GlobMatch(key, True, None)
+
+
+def _pages(client, bucket: str, prefix: str, delimiter: Optional[str]) -> Iterator[dict]:
+    kwargs = {"Bucket": bucket, "Prefix": prefix}
+    if delimiter is not None:
+        kwargs["Delimiter"] = delimiter
+    return iter(client.get_paginator("list_objects_v2").paginate(**kwargs))
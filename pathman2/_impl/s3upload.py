@@ -0,0 +1,247 @@
+"""Streaming multipart uploads to S3
+
+`MultipartWriter` is a writable file object that uploads an object in
+parts as its buffer fills, from a pool of background threads, so that
+payloads of any size can be written without being staged in memory or on
+disk. At most `max_in_flight` parts are uploading at once: writes block
+once that many are in flight, which bounds memory use to about
+`(max_in_flight + 1) * part_size`.
+
+Objects smaller than one part are uploaded with a single `put_object`.
+If anything fails, or the writer is used as a context manager and the
+block raises, the multipart upload is aborted so S3 does not keep (and
+bill for) its parts.
+"""
+import io
+import threading
+from concurrent import futures
+from typing import List, Optional
+
+MB = 1024 ** 2
+GB = 1024 ** 3
+
+DEFAULT_PART_SIZE = 8 * MB
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# S3 limits on multipart uploads
+MIN_PART_SIZE = 5 * MB
+MAX_PART_SIZE = 5 * GB
+MAX_PARTS = 10000
+
+# the part size doubles every PART_SIZE_GROWTH parts, so the 10000 parts
+# allowed cover objects of up to 1023 * PART_SIZE_GROWTH * part_size
+PART_SIZE_GROWTH = 1000
+
+
+def part_entry(part: dict) -> dict:
+    """ Fields of an uploaded part needed to complete its upload """
+    return {
+        k: v
+        for k, v in part.items()
+        if k in ("PartNumber", "ETag") or (k.startswith("Checksum") and k != "ChecksumType")
+    }
+
+
+class MultipartWriter(io.BufferedIOBase):
+    """Write-only file object streaming to an S3 object in concurrent parts
+
+    Parameters
+    ----------
+    client: botocore.client.S3
+        Client used for the upload
+    bucket: str
+        Destination bucket
+    key: str
+        Destination key
+    part_size: int, optional
+        Size in bytes of the first parts. It doubles every 1000 parts so
+        that the 10000 parts S3 allows are never exhausted
+    max_in_flight: int, optional
+        Maximum number of parts uploading at once
+    extra_args: dict, optional
+        Arguments of `put_object` applied to the object, e.g. ContentType,
+        Metadata or ServerSideEncryption
+    on_close: callable, optional
+        Called once the object has been written
+
+    Notes
+    -----
+        The object only appears in S3 once the writer is closed. `flush`
+        does not upload a partial part, since every part but the last must
+        be at least 5 MiB.
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        key: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        extra_args: Optional[dict] = None,
+        on_close=None,
+    ) -> None:
+        if part_size < MIN_PART_SIZE:
+            raise ValueError("part_size must be at least {} bytes".format(MIN_PART_SIZE))
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.max_in_flight = max_in_flight
+        self._client = client
+        self._extra_args = dict(extra_args or {})
+        self._on_close = on_close
+        self._buffer = bytearray()
+        self._written = 0
+        self._upload_id: Optional[str] = None
+        self._parts: List[futures.Future] = []
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor: Optional[futures.ThreadPoolExecutor] = None
+        self._failure: Optional[BaseException] = None
+
+    def __repr__(self) -> str:
+        return "MultipartWriter('s3://{}/{}')".format(self.bucket, self.key)
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._written
+
+    def write(self, data) -> int:
+        """Buffer data, uploading every part that fills up
+
+        Blocks while `max_in_flight` parts are uploading
+        """
+        if self.closed:
+            raise ValueError("write to closed file")
+        self._raise_failure()
+        view = memoryview(data).cast("B")
+        written = view.nbytes
+        while view.nbytes:
+            room = self._current_part_size() - len(self._buffer)
+            self._buffer += view[:room]
+            view = view[room:]
+            if len(self._buffer) == self._current_part_size():
+                self._submit()
+        self._written += written
+        return written
+
+    def close(self) -> None:
+        """ Upload the last part and complete the upload """
+        if self.closed:
+            return
+        try:
+            self._raise_failure()
+            if self._upload_id is None:
+                self._client.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), **self._extra_args
+                )
+            else:
+                if self._buffer:
+                    self._submit()
+                parts = [future.result() for future in self._parts]
+                self._client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": parts},
+                    **self._filter_args("COMPLETE_MULTIPART_ARGS")
+                )
+        except BaseException:
+            self._abort()
+            raise
+        finally:
+            self._shutdown()
+            super().close()
+        if self._on_close is not None:
+            self._on_close()
+
+    def abort(self) -> None:
+        """ Discard everything written: the object is not created or changed """
+        if self.closed:
+            return
+        try:
+            self._abort()
+        finally:
+            self._shutdown()
+            super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _current_part_size(self) -> int:
+        growth = len(self._parts) // PART_SIZE_GROWTH
+        return min(self.part_size << growth, MAX_PART_SIZE)
+
+    def _submit(self) -> None:
+        """ Hand the buffer over to an upload thread, once one is free """
+        if len(self._parts) == MAX_PARTS:
+            raise ValueError("objects are limited to {} parts".format(MAX_PARTS))
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                **self._filter_args("CREATE_MULTIPART_BLOCKLIST", exclude=True)
+            )["UploadId"]
+            self._executor = futures.ThreadPoolExecutor(max_workers=self.max_in_flight)
+        self._slots.acquire()
+        # a part may have failed while waiting
+        if self._failure is not None:
+            self._slots.release()
+            self._raise_failure()
+        body, self._buffer = self._buffer, bytearray()
+        future = self._executor.submit(  # type: ignore
+            self._upload_part, len(self._parts) + 1, body
+        )
+        future.add_done_callback(self._part_done)
+        self._parts.append(future)
+
+    def _upload_part(self, number: int, body: bytearray) -> dict:
+        response = self._client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=body,
+            **self._filter_args("UPLOAD_PART_ARGS")
+        )
+        return part_entry(dict(response, PartNumber=number))
+
+    def _part_done(self, future: futures.Future) -> None:
+        self._slots.release()
+        if future.cancelled() or self._failure is not None:
+            return
+        self._failure = future.exception()
+
+    def _raise_failure(self) -> None:
+        if self._failure is not None:
+            raise self._failure
+
+    def _abort(self) -> None:
+        if self._upload_id is None:
+            return
+        for future in self._parts:
+            future.cancel()
+        # parts still uploading would otherwise survive the abort
+        futures.wait(self._parts)
+        self._client.abort_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+        )
+
+    def _shutdown(self) -> None:
+        self._buffer = bytearray()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _filter_args(self, name: str, exclude: bool = False) -> dict:
+        """ Extra arguments accepted by a multipart call, as s3transfer filters them """
+        from s3transfer.upload import UploadSubmissionTask  # type: ignore
+
+        names = getattr(UploadSubmissionTask, name)
+        return {k: v for k, v in self._extra_args.items() if (k in names) != exclude}
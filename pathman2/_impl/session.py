@@ -0,0 +1,339 @@
+""" Process-wide registry of shared clients for remote backends """
+import os
+import weakref
+import threading
+import importlib
+from typing import Any, Callable, Dict, Hashable, List
+
+from pathman._impl.cache import DEFAULT_MAXSIZE, DEFAULT_TTL, StatCache
+
+# keyword arguments of remote paths configuring their stat cache rather than
+# their filesystem
+STAT_CACHE_OPTIONS = ("stat_ttl", "stat_maxsize")
+
+
+def normalize_kwargs(kwargs: Dict[str, Any]) -> Hashable:
+    """Build a hashable key from (possibly nested) client configuration
+
+    Parameters
+    ----------
+    kwargs: dict
+        Keyword arguments used to construct a client
+
+    Returns
+    -------
+    Hashable: key that is equal for equivalent configurations
+    """
+    return tuple(sorted((k, _freeze(v)) for k, v in kwargs.items()))
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return normalize_kwargs(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        frozen = tuple(_freeze(v) for v in value)
+        return tuple(sorted(frozen, key=repr)) if isinstance(value, (set, frozenset)) else frozen
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class SessionRegistry(object):
+    """Thread-safe, fork-aware cache of client objects keyed by configuration
+
+    Every caller asking for a client with an equivalent configuration gets
+    the same instance, so they share a single connection pool.
+
+    Notes
+    -----
+        Clients are never shared across processes. After a fork the child
+        starts with an empty registry and lazily builds its own clients; the
+        parent's instances (and their sockets) are left untouched.
+    """
+
+    def __init__(
+        self, factory: Callable[..., Any], closer: Callable[[Any], None] = None
+    ) -> None:
+        self._factory = factory
+        self._closer = closer
+        self._lock = threading.RLock()
+        self._sessions: Dict[Hashable, Any] = {}
+        self._pid = os.getpid()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def values(self) -> List[Any]:
+        """ Clients currently held by the registry """
+        with self._lock:
+            return list(self._sessions.values())
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._pid = os.getpid()
+
+    def get(self, **kwargs) -> Any:
+        """ Return the shared client for the given configuration, creating it if needed """
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        key = normalize_kwargs(kwargs)
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._factory(**kwargs)
+                self._sessions[key] = session
+        return session
+
+    def evict(self, **kwargs) -> bool:
+        """Close and forget the client for the given configuration
+
+        Returns
+        -------
+        bool: True if a client was evicted
+        """
+        key = normalize_kwargs(kwargs)
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        if session is None:
+            return False
+        self._close(session)
+        return True
+
+    def close(self) -> None:
+        """ Close and forget every client held by the registry """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions = {}
+        for session in sessions:
+            self._close(session)
+
+    def _close(self, session: Any) -> None:
+        if self._closer is not None:
+            self._closer(session)
+
+
+def _create_filesystem(**kwargs):
+    try:
+        importlib.import_module("s3fs")
+    except ImportError:
+        raise ImportError("s3fs is required for S3Path")
+
+    from s3fs import S3FileSystem  # type: ignore
+
+    # the registry owns the instance lifecycle, so bypass fsspec's own
+    # per-thread instance cache
+    return S3FileSystem(skip_instance_cache=True, **kwargs)
+
+
+def _close_filesystem(fs) -> None:
+    # s3fs closes the underlying aiobotocore session in a finalizer once the
+    # instance is garbage collected; drop any cached listings eagerly
+    fs.invalidate_cache()
+
+
+def _create_client(**kwargs):
+    try:
+        importlib.import_module("boto3")
+    except ImportError:
+        raise ImportError("boto3 is required to use copy")
+
+    import boto3  # type: ignore
+
+    if kwargs.pop("anon", False):
+        from botocore import UNSIGNED  # type: ignore
+        from botocore.config import Config  # type: ignore
+
+        kwargs["config"] = Config(signature_version=UNSIGNED)
+
+    # clients are thread-safe, sessions are not; a private session per client
+    # avoids contention on boto3's default session
+    return boto3.session.Session().client("s3", **kwargs)
+
+
+def _close_client(client) -> None:
+    close = getattr(client, "close", None)
+    if close is not None:
+        close()
+
+
+def _create_stat_cache(
+    stat_ttl: float = DEFAULT_TTL, stat_maxsize: int = DEFAULT_MAXSIZE, **kwargs
+) -> StatCache:
+    # the filesystem configuration only keys the registry
+    return StatCache(maxsize=stat_maxsize, ttl=stat_ttl)
+
+
+filesystems = SessionRegistry(_create_filesystem, _close_filesystem)
+clients = SessionRegistry(_create_client, _close_client)
+stat_caches = SessionRegistry(_create_stat_cache, lambda cache: cache.clear())
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        after_in_child=lambda: (
+            filesystems._reset_after_fork(),
+            clients._reset_after_fork(),
+            stat_caches._reset_after_fork(),
+            _async_filesystems.clear(),
+        )
+    )
+
+
+def get_filesystem(**kwargs):
+    """Get the shared `s3fs.S3FileSystem` for the given configuration
+
+    Parameters
+    ----------
+    kwargs:
+        Keyword arguments accepted by `s3fs.S3FileSystem`
+
+    Returns
+    -------
+    s3fs.S3FileSystem
+    """
+    kwargs.setdefault("anon", False)
+    return filesystems.get(**kwargs)
+
+
+def get_stat_cache(**kwargs) -> StatCache:
+    """Get the metadata cache shared by paths with the given configuration
+
+    Parameters
+    ----------
+    kwargs:
+        Keyword arguments accepted by `s3fs.S3FileSystem`, plus `stat_ttl`
+        (seconds an entry stays valid, 0 disables caching) and `stat_maxsize`
+        (maximum number of entries)
+
+    Returns
+    -------
+    StatCache
+    """
+    kwargs.setdefault("anon", False)
+    return stat_caches.get(**kwargs)
+
+
+def get_client(**kwargs):
+    """Get the shared boto3 s3 client for the given configuration
+
+    Parameters
+    ----------
+    kwargs:
+        Keyword arguments accepted by `boto3.client("s3")`, plus `anon` to
+        build an unsigned client
+
+    Returns
+    -------
+    botocore.client.S3
+    """
+    return clients.get(**kwargs)
+
+
+def client_kwargs_from_filesystem_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate `s3fs.S3FileSystem` keyword arguments into `boto3.client` ones
+
+    Parameters
+    ----------
+    kwargs: dict
+        Keyword arguments accepted by `s3fs.S3FileSystem`
+
+    Returns
+    -------
+    dict: Keyword arguments accepted by `get_client`
+    """
+    client_kwargs: Dict[str, Any] = dict(kwargs.get("client_kwargs") or {})
+    for fs_name, client_name in (
+        ("key", "aws_access_key_id"),
+        ("secret", "aws_secret_access_key"),
+        ("token", "aws_session_token"),
+        ("endpoint_url", "endpoint_url"),
+    ):
+        if kwargs.get(fs_name) is not None:
+            client_kwargs[client_name] = kwargs[fs_name]
+    if kwargs.get("anon"):
+        client_kwargs["anon"] = True
+    return client_kwargs
+
+
+_async_filesystems: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_async_lock = threading.Lock()
+
+
+async def get_async_filesystem(**kwargs):
+    """Get the shared asynchronous `s3fs.S3FileSystem` for the running event loop
+
+    aiobotocore sessions are bound to the loop they were created in, so
+    there is one filesystem per configuration and event loop.
+
+    Parameters
+    ----------
+    kwargs:
+        Keyword arguments accepted by `s3fs.S3FileSystem`
+
+    Returns
+    -------
+    s3fs.S3FileSystem
+    """
+    # asyncio is slow to import, and `import pathman` imports this module
+    import asyncio
+
+    kwargs.setdefault("anon", False)
+    key = normalize_kwargs(kwargs)
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        per_loop = _async_filesystems.setdefault(loop, {})
+        pending = per_loop.get(key)
+        if pending is None:
+            # concurrent first callers all await the same creation
+            pending = per_loop[key] = asyncio.ensure_future(
+                _create_async_filesystem(**kwargs)
+            )
+    try:
+        return await asyncio.shield(pending)
+    except BaseException:
+        if pending.done():
+            with _async_lock:
+                if per_loop.get(key) is pending:
+                    del per_loop[key]
+        raise
+
+
+async def _create_async_filesystem(**kwargs):
+    try:
+        importlib.import_module("s3fs")
+    except ImportError:
+        raise ImportError("s3fs is required for S3Path")
+
+    from s3fs import S3FileSystem  # type: ignore
+
+    fs = S3FileSystem(asynchronous=True, skip_instance_cache=True, **kwargs)
+    await fs.set_session()
+    return fs
+
+
+async def close_async_sessions() -> None:
+    """ Close every shared asynchronous filesystem of the running event loop """
+    import asyncio
+
+    with _async_lock:
+        per_loop = _async_filesystems.pop(asyncio.get_running_loop(), {})
+    for pending in per_loop.values():
+        if not pending.done() or pending.cancelled() or pending.exception():
+            continue
+        fs = pending.result()
+        client = getattr(fs, "_s3", None)
+        if client is not None:
+            await client.__aexit__(None, None, None)
+        fs.invalidate_cache()
+
+
+def close_sessions() -> None:
+    """ Close every shared s3fs filesystem and boto3 client and drop cached metadata """
+    filesystems.close()
+    clients.close()
+    stat_caches.close()
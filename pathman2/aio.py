@@ -0,0 +1,178 @@
+""" asyncio interface for local/remote file paths """
+import asyncio
+import functools
+from typing import TYPE_CHECKING, AsyncIterator, List, Union
+
+from pathman.backends import BackendMap, resolve_location
+from pathman.exc import UnsupportedPathTypeException
+from pathman.base import AbstractAsyncPath, StatResult
+from pathman.path import Path
+from pathman._impl.session import close_async_sessions  # noqa: F401
+
+if TYPE_CHECKING:  # pragma: no cover - backends are imported on first use
+    from pathman._impl.local import AsyncLocalPath
+    from pathman._impl.s3 import AsyncS3Path
+
+
+class AsyncPath(AbstractAsyncPath):
+    """Represents a generic path object with awaitable operations
+
+    Notes
+    -----
+        s3 operations use s3fs's native asynchronous API, so many concurrent
+        operations share one event loop rather than one thread each. Local
+        operations are offloaded to the event loop's default executor.
+    """
+
+    __slots__ = ("_original_kwargs", "_pathstr", "_location", "_impl")
+
+    location_class_map = BackendMap("async")
+
+    def __init__(self, path: str, **kwargs) -> None:
+        """Constructor for a new AsyncPath
+
+        Parameters
+        ----------
+        path: str or path-like object
+           A path string
+        """
+        location, path = resolve_location(str(path))
+        self._original_kwargs = dict({}, **kwargs)
+        self._pathstr: str = path
+        self._location: str = location
+        if self._location not in self.location_class_map:
+            raise UnsupportedPathTypeException("inferred location is not supported")
+        self._impl: Union["AsyncLocalPath", "AsyncS3Path"] = self.location_class_map[
+            self._location
+        ](  # type: ignore
+            path, **kwargs
+        )
+
+    def _wrap(self, impl) -> "AsyncPath":
+        wrapped = AsyncPath.__new__(AsyncPath)
+        wrapped._original_kwargs = self._original_kwargs
+        wrapped._pathstr = impl._pathstr
+        wrapped._location = self._location
+        wrapped._impl = impl
+        return wrapped
+
+    def __fspath__(self) -> str:
+        return self._pathstr
+
+    def __str__(self) -> str:
+        return self._pathstr
+
+    def __repr__(self) -> str:
+        return "AsyncPath({!r})".format(self._pathstr)
+
+    def __eq__(self, other) -> bool:
+        return self._pathstr == other._pathstr
+
+    def __truediv__(self, key) -> "AsyncPath":
+        return self.join(key)
+
+    def join(self, *pathsegments) -> "AsyncPath":
+        """ Combine the current path with the given segments """
+        return self._wrap(self._impl.join(*pathsegments))
+
+    def to_path(self) -> Path:
+        """ Get the synchronous `Path` for the same location """
+        return Path(self._pathstr, **self._original_kwargs)
+
+    async def exists(self, refresh: bool = False) -> bool:
+        """ Checks if the path exists. refresh skips cached metadata """
+        return await self._impl.exists(refresh)
+
+    async def stat(self, refresh: bool = False) -> StatResult:
+        """Get size, modification time, ETag (remote only) and type of the path
+
+        Parameters
+        ----------
+        refresh: bool, optional
+            If True, skip cached metadata (see `pathman._impl.cache`)
+
+        Raises
+        ------
+        FileNotFoundError
+            If nothing exists at the path
+        """
+        return await self._impl.stat(refresh)
+
+    async def is_dir(self, refresh: bool = False) -> bool:
+        """ Checks if the path is a directory. refresh skips cached metadata """
+        return await self._impl.is_dir(refresh)
+
+    async def is_file(self, refresh: bool = False) -> bool:
+        """ Checks if the path is a file. refresh skips cached metadata """
+        return await self._impl.is_file(refresh)
+
+    async def read_bytes(self) -> bytes:
+        """ Read the whole file """
+        return await self._impl.read_bytes()
+
+    async def write_bytes(self, contents) -> int:
+        """Write bytes to the file, replacing its contents
+
+        Returns
+        -------
+        int: number of bytes written
+        """
+        return await self._impl.write_bytes(contents)
+
+    async def remove(self) -> None:
+        """ Remove this file """
+        await self._impl.remove()
+
+    async def ls(self) -> List["AsyncPath"]:
+        return [self._wrap(p) for p in await self._impl.ls()]
+
+    async def walk(self, **kwargs) -> AsyncIterator["AsyncPath"]:
+        """Iterate over the files below the current path
+
+        Parameters
+        ----------
+        include: str or list of str, optional
+            Only yield files whose path relative to this one matches a pattern
+        exclude: str or list of str, optional
+            Skip files, and do not descend into directories, whose relative
+            path matches a pattern
+        max_depth: int, optional
+            Maximum depth of yielded files; 1 only yields direct children
+        prune: callable, optional
+            Called with each directory as an `AsyncPath`; if it returns True
+            the directory is not descended into
+        """
+        prune = kwargs.get("prune")
+        if prune is not None:
+            kwargs["prune"] = lambda impl: prune(self._wrap(impl))
+        async for p in self._impl.walk(**kwargs):
+            yield self._wrap(p)
+
+    async def copy(self, dest: "AsyncPath", **kwargs):
+        """Copy this file or directory to dest
+
+        s3 -> s3 copies without options are awaited natively, with the same
+        key layout as `pathman.copy.copy_s3_s3`. Every other copy, including
+        s3 -> s3 copies with options, runs `pathman.copy.copy` in the event
+        loop's default executor.
+
+        Parameters
+        ----------
+        dest: AsyncPath
+            Destination
+        kwargs:
+            Passed to `pathman.copy.copy`
+
+        Returns
+        -------
+        list of TransferResult: One entry per copied file
+        """
+        from pathman.copy import TransferResult, copy
+
+        if self._location == "s3" and dest._location == "s3" and not kwargs:
+            return [TransferResult(*copied) for copied in await self._impl.copy(dest._impl)]
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(copy, self.to_path(), dest.to_path(), **kwargs)
+        )
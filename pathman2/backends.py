@@ -0,0 +1,243 @@
+"""Registry of the backends implementing `Path` and `AsyncPath`
+
+A backend is registered under a location name (e.g. "s3") together with the
+URL schemes it serves (e.g. "s3://"). Its classes are given as
+"module:Class" strings and only imported when a path of that location is
+first built, so that e.g. local-only programs never import botocore.
+
+Third-party packages register backends through the "pathman2.backends"
+entry point group, named after the scheme::
+
+    [options.entry_points]
+    pathman2.backends =
+        gs = pathman_gcs:GCSPath
+
+or at runtime with `register_backend`. Entry points are only read when a
+path has a scheme no registered backend serves.
+"""
+import re
+import importlib
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Sequence, Tuple, Union
+
+ENTRY_POINT_GROUP = "pathman2.backends"
+
+# location used for paths without a registered scheme
+DEFAULT_LOCATION = "local"
+
+_SCHEME = re.compile(r"^([A-Za-z][A-Za-z0-9+.-]*)://")
+
+Target = Union[str, type]
+
+
+class _Backend(object):
+    """ Classes of a registered backend, imported on first use """
+
+    __slots__ = ("targets", "resolved")
+
+    def __init__(self, path_class: Target, async_class: Optional[Target]) -> None:
+        self.targets = {"sync": path_class, "async": async_class}
+        self.resolved: Dict[str, type] = {}
+
+    def resolve(self, kind: str) -> Optional[type]:
+        cls = self.resolved.get(kind)
+        if cls is None:
+            target = self.targets[kind]
+            if target is None:
+                return None
+            cls = self.resolved[kind] = _load(target)
+        return cls
+
+
+_backends: Dict[str, _Backend] = {}
+_schemes: Dict[str, str] = {}
+_lock = threading.RLock()
+_entry_points_loaded = False
+
+
+def register_backend(
+    location: str,
+    path_class: Target,
+    schemes: Optional[Sequence[str]] = None,
+    async_class: Optional[Target] = None,
+) -> None:
+    """Register the classes implementing a location
+
+    Parameters
+    ----------
+    location: str
+        Name of the location, e.g. "s3"
+    path_class: str or type
+        `AbstractPath` subclass, or its "module:Class" import path
+    schemes: sequence of str, optional
+        URL schemes of paths served by the backend, e.g. ("s3",) for
+        "s3://bucket/key". Defaults to the location name; pass an empty
+        sequence for a backend that serves no scheme
+    async_class: str or type, optional
+        `AbstractAsyncPath` subclass, or its import path, used by `AsyncPath`
+
+    Notes
+    -----
+        Registering an existing location or scheme replaces it.
+    """
+    with _lock:
+        _backends[location] = _Backend(path_class, async_class)
+        for scheme in (location,) if schemes is None else schemes:
+            _schemes[scheme.lower()] = location
+
+
+def location_for(path: str) -> str:
+    """Get the location of the backend serving a path
+
+    Parameters
+    ----------
+    path: str
+        Path to inspect
+
+    Returns
+    -------
+    str: location name. Paths without a "<scheme>://" prefix, or with a
+    scheme no backend serves, are local
+    """
+    return resolve_location(path)[0]
+
+
+def resolve_location(path: str) -> Tuple[str, str]:
+    """Get the location of the backend serving a path, and the path it serves
+
+    Schemes are case-insensitive, but backends parse paths by their
+    lower-case prefix (e.g. "s3://"), so the scheme of a path served by a
+    registered backend is lower-cased. Paths left to the local backend are
+    returned unchanged, since their case is significant.
+
+    Returns
+    -------
+    tuple: (location name, path)
+    """
+    match = _SCHEME.match(path)
+    if match is None:
+        return DEFAULT_LOCATION, path
+    scheme = match.group(1)
+    location = _schemes.get(scheme.lower())
+    if location is None and not _entry_points_loaded:
+        _load_entry_points()
+        location = _schemes.get(scheme.lower())
+    if location is None:
+        return DEFAULT_LOCATION, path
+    if not scheme.islower():
+        path = scheme.lower() + path[match.end(1) :]
+    return location, path
+
+
+def backend_class(location: str, kind: str = "sync") -> type:
+    """Get the class implementing a location, importing it if needed
+
+    Parameters
+    ----------
+    location: str
+        Name of the location
+    kind: str, optional
+        "sync" for the `Path` backend, "async" for the `AsyncPath` one
+
+    Raises
+    ------
+    KeyError: if no backend of that kind is registered for the location
+    """
+    backend = _backends.get(location)
+    cls = None if backend is None else backend.resolve(kind)
+    if cls is None:
+        raise KeyError(location)
+    return cls
+
+
+class BackendMap(MutableMapping):
+    """Live, lazily importing view of the registry as {location: class}
+
+    Setting an item registers a backend for the location (served by the
+    scheme of the same name); deleting one unregisters it.
+    """
+
+    def __init__(self, kind: str = "sync") -> None:
+        self.kind = kind
+
+    def __getitem__(self, location: str) -> type:
+        return backend_class(location, self.kind)
+
+    def __setitem__(self, location: str, cls: Target) -> None:
+        with _lock:
+            backend = _backends.get(location)
+            if backend is None:
+                backend = _backends[location] = _Backend(None, None)  # type: ignore
+                _schemes.setdefault(location.lower(), location)
+            backend.targets[self.kind] = cls
+            backend.resolved.pop(self.kind, None)
+
+    def __delitem__(self, location: str) -> None:
+        with _lock:
+            if location not in self:
+                raise KeyError(location)
+            backend = _backends[location]
+            backend.targets[self.kind] = None  # type: ignore
+            backend.resolved.pop(self.kind, None)
+            if all(t is None for t in backend.targets.values()):
+                del _backends[location]
+                for scheme in [s for s, loc in _schemes.items() if loc == location]:
+                    del _schemes[scheme]
+
+    def __contains__(self, location: object) -> bool:
+        backend = _backends.get(location)  # type: ignore
+        return backend is not None and backend.targets[self.kind] is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([location for location in list(_backends) if location in self])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return "BackendMap({!r})".format(self.kind)
+
+
+def _load(target: Target) -> type:
+    if not isinstance(target, str):
+        return target
+    module, _, name = target.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _load_entry_points() -> None:
+    """ Register the backends advertised by installed packages """
+    global _entry_points_loaded
+    with _lock:
+        if _entry_points_loaded:
+            return
+        _entry_points_loaded = True
+        from importlib import metadata
+
+        try:
+            entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:  # python < 3.10
+            entry_points = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+        for entry_point in entry_points:
+            if entry_point.name in _schemes:
+                # explicit registrations win over entry points
+                continue
+            register_backend(entry_point.name, entry_point.value)
+
+
+register_backend(
+    "local",
+    "pathman._impl.local:LocalPath",
+    schemes=(),
+    async_class="pathman._impl.local:AsyncLocalPath",
+)
+register_backend(
+    "s3", "pathman._impl.s3:S3Path", schemes=("s3",), async_class="pathman._impl.s3:AsyncS3Path"
+)
+register_backend(
+    "memory",
+    "pathman._impl.memory:MemoryPath",
+    schemes=("memory",),
+    async_class="pathman._impl.memory:AsyncMemoryPath",
+)
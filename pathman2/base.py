@@ -1,15 +1,39 @@
 from abc import ABC, abstractmethod, abstractproperty
+from typing import NamedTuple, Optional
+
+
+class StatResult(NamedTuple):
+    """ Backend-independent file metadata """
+
+    size: int
+    mtime: Optional[float]
+    etag: Optional[str]
+    type: str  # "file" or "directory"
+
+    @property
+    def is_file(self) -> bool:
+        return self.type == "file"
+
+    @property
+    def is_dir(self) -> bool:
+        return self.type == "directory"
 
 
 class AbstractPath(ABC):
     """ Defines the interface for all Path-like objects """
 
+    __slots__ = ()
+
     @abstractproperty
     def extension(self):
         pass
 
     @abstractmethod
-    def exists(self):
+    def exists(self, refresh=False):
+        pass
+
+    @abstractmethod
+    def stat(self, refresh=False):
         pass
 
     @abstractmethod
@@ -17,11 +41,11 @@ class AbstractPath(ABC):
         pass
 
     @abstractmethod
-    def is_dir(self):
+    def is_dir(self, refresh=False):
         pass
 
     @abstractmethod
-    def is_file(self):
+    def is_file(self, refresh=False):
         pass
 
     @abstractmethod
@@ -56,6 +80,22 @@ class AbstractPath(ABC):
     def read_text(self, **kwargs):
         pass
 
+    @abstractmethod
+    def read_range(self, offset, length=None):
+        pass
+
+    @abstractmethod
+    def iter_bytes(self, chunk_size):
+        pass
+
+    @abstractmethod
+    def readinto(self, buffer, offset=0):
+        pass
+
+    @abstractmethod
+    def memoryview(self):
+        pass
+
     @abstractmethod
     def remove(self):
         pass
@@ -84,6 +124,10 @@ class AbstractPath(ABC):
     def glob(self, _glob):
         pass
 
+    @abstractmethod
+    def iglob(self, _glob):
+        pass
+
     @abstractmethod
     def with_suffix(self, suffix):
         pass
@@ -97,6 +141,55 @@ class AbstractPath(ABC):
         pass
 
 
+class AbstractAsyncPath(ABC):
+    """Defines the asyncio interface for Path-like objects
+
+    Every method is a coroutine except `walk`, which is an async iterator.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    async def exists(self, refresh=False):
+        pass
+
+    @abstractmethod
+    async def stat(self, refresh=False):
+        pass
+
+    @abstractmethod
+    async def is_dir(self, refresh=False):
+        pass
+
+    @abstractmethod
+    async def is_file(self, refresh=False):
+        pass
+
+    @abstractmethod
+    async def read_bytes(self):
+        pass
+
+    @abstractmethod
+    async def write_bytes(self, contents):
+        pass
+
+    @abstractmethod
+    async def remove(self):
+        pass
+
+    @abstractmethod
+    async def ls(self):
+        pass
+
+    @abstractmethod
+    def walk(self):
+        pass
+
+    @abstractmethod
+    def join(self, *pathsegments: str):
+        pass
+
+
 class RemotePath(object):
     """A mixin that represents any non-local path
 
@@ -107,3 +200,5 @@ class RemotePath(object):
         also allow us to unify the API for managing remote resources
         across cloud providers should that be necessary in the future.
     """
+
+    __slots__ = ()
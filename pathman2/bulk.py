@@ -0,0 +1,302 @@
+""" Operations applied to many paths at once """
+import os
+import errno
+import functools
+from concurrent import futures
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from pathman.base import StatResult
+from pathman.diskcache import get_disk_cache
+from pathman.path import Path
+from pathman._impl.s3 import (
+    _DIRECTORY,
+    _MISSING,
+    _cache_key,
+    _cached_stat,
+    _error_code,
+    _stat_from_object,
+)
+from pathman._impl.session import normalize_kwargs
+
+DELETE_BATCH_SIZE = 1000
+
+
+class BulkResult(NamedTuple):
+    """Outcome of a bulk operation for a single path
+
+    Exactly one of `value` and `error` is meaningful: if `error` is None
+    the operation succeeded and returned `value`.
+    """
+
+    path: Path
+    value: Any
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def exists_many(paths: Iterable[Path], parallelism: Optional[int] = None) -> List[BulkResult]:
+    """Check whether each path exists, concurrently
+
+    s3 paths are answered from the stat cache when possible. The others are
+    grouped by bucket, credentials and directory, and every directory holding
+    more than one of them is listed once (from their longest common prefix)
+    instead of sending a HEAD request per path. The answers fill the stat
+    cache.
+
+    Parameters
+    ----------
+    paths: iterable of Path
+        Paths to check, on any backend
+    parallelism: int, optional
+        Maximum number of concurrent checks
+
+    Returns
+    -------
+    list of BulkResult: One per path, in input order, with a bool value
+    """
+    paths = list(paths)
+    results: List[Optional[BulkResult]] = [None] * len(paths)
+
+    def _exists_single(item: Tuple[int, Path]) -> None:
+        i, path = item
+        try:
+            results[i] = BulkResult(path, path.exists(), None)
+        except Exception as e:
+            results[i] = BulkResult(path, None, e)
+
+    def _exists_listed(items: List[Tuple[int, Path]]) -> None:
+        try:
+            found = _list_names(items)
+        except Exception as e:
+            for i, path in items:
+                results[i] = BulkResult(path, None, e)
+            return
+        for i, path in items:
+            stat = found.get(path._impl.key.rstrip("/"))
+            path._impl._stat_cache.set(_cache_key(str(path)), stat)
+            results[i] = BulkResult(path, stat is not None, None)
+
+    tasks: List[Tuple[Callable[[Any], None], Any]] = []
+    for (location, _, _), group in _groups(enumerate(paths)).items():
+        if location != "s3":
+            tasks.extend((_exists_single, item) for item in group)
+            continue
+        by_directory: Dict[str, List[Tuple[int, Path]]] = {}
+        for i, path in group:
+            try:
+                cached = _cached_stat(path._impl._stat_cache, str(path))
+            except FileNotFoundError:
+                results[i] = BulkResult(path, False, None)
+                continue
+            if cached is not _MISSING:
+                results[i] = BulkResult(path, True, None)
+                continue
+            key = path._impl.key.rstrip("/")
+            if not key:
+                # a bucket: nothing to list it from
+                tasks.append((_exists_single, (i, path)))
+                continue
+            by_directory.setdefault(key.rpartition("/")[0], []).append((i, path))
+        for items in by_directory.values():
+            if len(items) == 1:
+                tasks.append((_exists_single, items[0]))
+            else:
+                tasks.append((_exists_listed, items))
+    _run(tasks, parallelism)
+    return results  # type: ignore
+
+
+def read_many(
+    paths: Iterable[Path], parallelism: Optional[int] = None, **kwargs
+) -> List[BulkResult]:
+    """Read each file, concurrently
+
+    Unless a disk cache is enabled or kwargs are given, s3 objects are read
+    with a single GetObject request each, through one client per bucket and
+    credentials, instead of looking each object up before downloading it.
+
+    Parameters
+    ----------
+    paths: iterable of Path
+        Files to read, on any backend
+    parallelism: int, optional
+        Maximum number of concurrent reads
+    kwargs:
+        Passed to `Path.read_bytes`
+
+    Returns
+    -------
+    list of BulkResult: One per path, in input order, with the file contents
+    as value
+    """
+    paths = list(paths)
+    results: List[Optional[BulkResult]] = [None] * len(paths)
+    direct = not kwargs and get_disk_cache() is None
+
+    def _read_single(item: Tuple[int, Path]) -> None:
+        i, path = item
+        try:
+            results[i] = BulkResult(path, path.read_bytes(**kwargs), None)
+        except Exception as e:
+            results[i] = BulkResult(path, None, e)
+
+    def _read_object(client, item: Tuple[int, Path]) -> None:
+        i, path = item
+        try:
+            response = client.get_object(Bucket=path._impl.bucket, Key=path._impl.key)
+            results[i] = BulkResult(path, response["Body"].read(), None)
+        except Exception as e:
+            if _error_code(e) in ("NoSuchKey", "404"):
+                e = FileNotFoundError(errno.ENOENT, "No such file or directory", str(path))
+            results[i] = BulkResult(path, None, e)
+
+    tasks: List[Tuple[Callable[[Any], None], Any]] = []
+    for (location, _, _), group in _groups(enumerate(paths)).items():
+        if location == "s3" and direct:
+            read = functools.partial(_read_object, group[0][1]._impl.client)
+            tasks.extend((read, item) for item in group)
+        else:
+            tasks.extend((_read_single, item) for item in group)
+    _run(tasks, parallelism)
+    return results  # type: ignore
+
+
+def remove_many(paths: Iterable[Path], parallelism: Optional[int] = None) -> List[BulkResult]:
+    """Remove each file, concurrently
+
+    s3 objects are grouped by bucket and credentials and removed with
+    DeleteObjects requests of up to 1000 keys each; other paths are removed
+    one by one.
+
+    Objects are not looked up first: like DeleteObjects, removing an s3 key
+    that does not exist succeeds, unless the stat cache already knows it is
+    missing (FileNotFoundError) or a directory (IsADirectoryError), as
+    `Path.remove` reports.
+
+    Parameters
+    ----------
+    paths: iterable of Path
+        Files to remove, on any backend
+    parallelism: int, optional
+        Maximum number of concurrent requests
+
+    Returns
+    -------
+    list of BulkResult: One per path, in input order, with a None value
+    """
+    paths = list(paths)
+    results: List[Optional[BulkResult]] = [None] * len(paths)
+
+    def _remove_batch(batch: List[Tuple[int, Path]]) -> None:
+        first = batch[0][1]._impl
+        by_key = {path._impl.key: i for i, path in batch}
+        for _, path in batch:
+            path._impl._invalidate()
+        try:
+            response = first.client.delete_objects(
+                Bucket=first.bucket,
+                Delete={"Objects": [{"Key": k} for k in by_key], "Quiet": True},
+            )
+        except Exception as e:
+            for i, path in batch:
+                results[i] = BulkResult(path, None, e)
+            return
+        failed = {}
+        for error in response.get("Errors", []):
+            failed[error["Key"]] = OSError(
+                "{}: {}".format(error.get("Code"), error.get("Message"))
+            )
+        for i, path in batch:
+            results[i] = BulkResult(path, None, failed.get(path._impl.key))
+
+    def _remove_single(item: Tuple[int, Path]) -> None:
+        i, path = item
+        try:
+            path.remove()
+        except Exception as e:
+            results[i] = BulkResult(path, None, e)
+        else:
+            results[i] = BulkResult(path, None, None)
+
+    tasks: List[Tuple[Callable[[Any], None], Any]] = []
+    for (location, _, _), group in _groups(enumerate(paths)).items():
+        if location != "s3":
+            tasks.extend((_remove_single, item) for item in group)
+            continue
+        batch = []
+        for i, path in group:
+            try:
+                cached = _cached_stat(path._impl._stat_cache, str(path))
+                if cached is not _MISSING and cached.is_dir:
+                    raise IsADirectoryError(errno.EISDIR, "Is a directory", str(path))
+            except OSError as e:
+                results[i] = BulkResult(path, None, e)
+            else:
+                batch.append((i, path))
+        tasks.extend(
+            (_remove_batch, batch[start : start + DELETE_BATCH_SIZE])
+            for start in range(0, len(batch), DELETE_BATCH_SIZE)
+        )
+    _run(tasks, parallelism)
+    return results  # type: ignore
+
+
+def _groups(indexed: Iterable[Tuple[int, Path]]) -> Dict[Hashable, List[Tuple[int, Path]]]:
+    """Group indexed paths by backend, bucket and client configuration
+
+    The paths of an s3 group share a client and can be batched together;
+    other backends form one group each
+    """
+    groups: Dict[Hashable, List[Tuple[int, Path]]] = {}
+    for i, path in indexed:
+        if path._location == "s3":
+            key = ("s3", path._impl.bucket, normalize_kwargs(path._impl.client_kwargs))
+        else:
+            key = (path._location, None, None)
+        groups.setdefault(key, []).append((i, path))
+    return groups
+
+
+def _list_names(items: List[Tuple[int, Path]]) -> Dict[str, StatResult]:
+    """List the objects and prefixes a group of s3 paths of one directory can be
+
+    Returns
+    -------
+    dict: StatResult of every listed key and (directory) prefix, without
+    trailing slashes
+    """
+    first = items[0][1]._impl
+    keys = [path._impl.key.rstrip("/") for _, path in items]
+    # keys and prefixes are listed in order: anything from last + "/" on is
+    # past every path of the group, including a prefix equal to the last one
+    stop = max(keys) + "/"
+    found: Dict[str, StatResult] = {}
+    paginator = first.client.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=first.bucket, Prefix=os.path.commonprefix(keys), Delimiter="/"
+    )
+    for page in pages:
+        names = []
+        for prefix in page.get("CommonPrefixes", []):
+            names.append(prefix["Prefix"])
+            found.setdefault(prefix["Prefix"].rstrip("/"), _DIRECTORY)
+        for obj in page.get("Contents", []):
+            names.append(obj["Key"])
+            found[obj["Key"].rstrip("/")] = _stat_from_object(obj)
+        if names and max(names) >= stop:
+            break
+    return found
+
+
+def _run(tasks: List[Tuple[Callable[[Any], None], Any]], parallelism: Optional[int]) -> None:
+    """ Run (function, argument) tasks on a thread pool """
+    with futures.ThreadPoolExecutor(max_workers=_max_workers(parallelism)) as executor:
+        for _ in executor.map(lambda task: task[0](task[1]), tasks):
+            pass
+
+
+def _max_workers(parallelism: Optional[int]) -> int:
+    return parallelism or min(32, (os.cpu_count() or 1) + 4)
@@ -0,0 +1,237 @@
+""" Checksums compatible with remote object metadata """
+import os
+import zlib
+import base64
+import hashlib
+import importlib
+from typing import Any, Callable, List, Optional
+
+from pathman._impl.cache import StatCache
+
+CHUNK_SIZE = 1024 ** 2
+
+ALGORITHMS = ("etag", "crc32", "crc32c", "xxhash")
+
+# S3 "additional checksum" algorithm of each checksum other than the ETag
+S3_CHECKSUM_ALGORITHMS = {"crc32": "CRC32", "crc32c": "CRC32C", "xxhash": "XXHASH64"}
+
+# checksums of local files, keyed by (device, inode, mtime, size, algorithm,
+# part size): an unchanged file is never read twice
+_file_checksums = StatCache(maxsize=100000, ttl=float("inf"))
+
+
+class Checksum(object):
+    """Incremental checksum of a stream, formatted the way S3 reports it
+
+    The ETag is hex-encoded; the other checksums are base64-encoded
+    big-endian digests, as in S3's `Checksum<ALGORITHM>` fields
+
+    Parameters
+    ----------
+    algorithm: str, optional
+        One of "etag", "crc32", "crc32c" or "xxhash"
+    part_size: int, optional
+        Part size of a multipart upload. If given, the composite checksum
+        S3 computes for multipart uploads ("<checksum of part checksums>-N")
+        is produced instead of a checksum of the whole stream
+
+    Notes
+    -----
+        Data can be fed in chunks of any size; part boundaries are tracked
+        internally. crc32c requires one of the `crc32c`, `google-crc32c` or
+        `awscrt` packages and xxhash the `xxhash` package.
+    """
+
+    def __init__(self, algorithm: str = "etag", part_size: Optional[int] = None) -> None:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(
+                "algorithm must be one of {}, not {!r}".format(", ".join(ALGORITHMS), algorithm)
+            )
+        self.algorithm = algorithm
+        self.part_size = part_size
+        self._new = _hasher_factory(algorithm)
+        self._current = self._new()
+        self._current_size = 0
+        self._parts: List[bytes] = []
+
+    def update(self, data) -> None:
+        """ Feed the next chunk of the stream """
+        if self.part_size is None:
+            self._current.update(data)
+            return
+        view = memoryview(data)
+        while view.nbytes:
+            take = min(view.nbytes, self.part_size - self._current_size)
+            self._current.update(view[:take])
+            self._current_size += take
+            view = view[take:]
+            if self._current_size == self.part_size:
+                self._parts.append(self._current.digest())
+                self._current = self._new()
+                self._current_size = 0
+
+    def value(self) -> str:
+        """ Checksum of the data fed so far, as S3 would report it """
+        if self.part_size is None:
+            return _format(self.algorithm, self._current.digest())
+        parts = list(self._parts)
+        if self._current_size or not parts:
+            parts.append(self._current.digest())
+        combined = self._new()
+        combined.update(b"".join(parts))
+        return "{}-{}".format(_format(self.algorithm, combined.digest()), len(parts))
+
+
+def file_checksum(filename: str, algorithm: str = "etag", part_size: Optional[int] = None) -> str:
+    """Checksum a local file, reusing the result while the file is unchanged
+
+    Parameters
+    ----------
+    filename: str
+        File to checksum
+    algorithm: str, optional
+        One of "etag", "crc32", "crc32c" or "xxhash"
+    part_size: int, optional
+        Part size of a multipart upload (see `Checksum`)
+
+    Returns
+    -------
+    str: the checksum, formatted as S3 reports it
+
+    Notes
+    -----
+        Results are cached in memory by inode, modification time and size.
+    """
+    key = _file_key(os.stat(filename), algorithm, part_size)
+    cached = _file_checksums.get(key)
+    if cached is not None:
+        return cached
+    checksum = Checksum(algorithm, part_size)
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            checksum.update(chunk)
+    value = checksum.value()
+    # the file may have changed while it was read
+    if _file_key(os.stat(filename), algorithm, part_size) == key:
+        _file_checksums.set(key, value)
+    return value
+
+
+def remember_checksum(filename: str, st: os.stat_result, checksum: Checksum) -> None:
+    """Cache the checksum of a file computed elsewhere (e.g. while uploading it)
+
+    Parameters
+    ----------
+    filename: str
+        File the checksum was computed for
+    st: os.stat_result
+        Stat of the file taken before it was read. Nothing is cached if the
+        file has changed since
+    checksum: Checksum
+        Checksum fed with the whole file
+    """
+    key = _file_key(st, checksum.algorithm, checksum.part_size)
+    if _file_key(os.stat(filename), checksum.algorithm, checksum.part_size) == key:
+        _file_checksums.set(key, checksum.value())
+
+
+def _file_key(st: os.stat_result, algorithm: str, part_size: Optional[int]) -> tuple:
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size, algorithm, part_size)
+
+
+def compute_etag(filename: str, part_size: Optional[int] = None) -> str:
+    """Compute the S3 ETag a local file would have once uploaded
+
+    Parameters
+    ----------
+    filename: str
+        File to checksum
+    part_size: int, optional
+        Part size of a multipart upload. If None, the ETag of a single-part
+        upload (the hex MD5 of the contents) is computed
+
+    Returns
+    -------
+    str: ETag without surrounding quotes
+
+    Notes
+    -----
+        The ETag of a multipart upload is the MD5 of the concatenated binary
+        MD5 digests of every part, followed by "-" and the number of parts.
+        It is only reproducible if `part_size` matches the one used for the
+        upload.
+    """
+    return file_checksum(filename, "etag", part_size)
+
+
+def etag_matches(filename: str, etag: str, part_size: int) -> bool:
+    """Check whether a local file has the contents described by an S3 ETag
+
+    Parameters
+    ----------
+    filename: str
+        File to checksum
+    etag: str
+        ETag of the remote object, with or without surrounding quotes
+    part_size: int
+        Part size to assume if the ETag comes from a multipart upload
+    """
+    etag = etag.strip('"')
+    if "-" in etag:
+        return compute_etag(filename, part_size=part_size) == etag
+    return compute_etag(filename) == etag
+
+
+def _format(algorithm: str, digest: bytes) -> str:
+    if algorithm == "etag":
+        return digest.hex()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def _hasher_factory(algorithm: str) -> Callable[[], Any]:
+    if algorithm == "etag":
+        return hashlib.md5
+    if algorithm == "crc32":
+        return lambda: _CRC(zlib.crc32)
+    if algorithm == "crc32c":
+        crc32c = _crc32c_function()
+        return lambda: _CRC(crc32c)
+    try:
+        xxhash = importlib.import_module("xxhash")
+    except ImportError:
+        raise ImportError("xxhash is required for xxhash checksums")
+    return xxhash.xxh64
+
+
+class _CRC(object):
+    """ hashlib-like wrapper around a `crc(data, value)` function """
+
+    __slots__ = ("_function", "_value")
+
+    def __init__(self, function: Callable[[bytes, int], int]) -> None:
+        self._function = function
+        self._value = 0
+
+    def update(self, data) -> None:
+        self._value = self._function(data, self._value)
+
+    def digest(self) -> bytes:
+        return self._value.to_bytes(4, "big")
+
+
+def _crc32c_function() -> Callable[[bytes, int], int]:
+    """ Find a crc32c implementation among the optional dependencies """
+    try:
+        return importlib.import_module("crc32c").crc32c
+    except ImportError:
+        pass
+    try:
+        google_crc32c = importlib.import_module("google_crc32c")
+        return lambda data, value: google_crc32c.extend(value, bytes(data))
+    except ImportError:
+        pass
+    try:
+        checksums = importlib.import_module("awscrt.checksums")
+        return lambda data, value: checksums.crc32c(bytes(data), value)
+    except ImportError:
+        raise ImportError("crc32c, google-crc32c or awscrt is required for crc32c checksums")
@@ -1,111 +1,1638 @@
-import importlib
+import os
+import queue
+import functools
+import shutil
+import threading
 from concurrent import futures
-from typing import no_type_check, Optional
+from typing import (
+    no_type_check,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from pathman._impl import S3Path, LocalPath
-from pathman.exc import UnsupportedCopyOperation
+from pathman._impl.listing import parallel_list_objects
+from pathman._impl.local import LocalPath
+from pathman._impl.s3 import S3Path, _error_code, fetch_cached
+from pathman._impl.s3upload import part_entry
+from pathman._impl.session import get_client
+from pathman.base import AbstractPath
+from pathman.checksum import (
+    ALGORITHMS,
+    S3_CHECKSUM_ALGORITHMS,
+    Checksum,
+    compute_etag,
+    etag_matches,
+    file_checksum,
+    remember_checksum,
+)
+from pathman.compression import EXTENSIONS, resolve_compression, wrap
+from pathman.diskcache import DiskCache, get_disk_cache
+from pathman.exc import (
+    CopyError,
+    UnsupportedCopyOperation,
+    UnsupportedOperation,
+    VerificationError,
+)
+from pathman.journal import TransferJournal
 from pathman.path import Path
+from pathman.utils import Patterns, matches_patterns
 
 try:
-    s3fs = importlib.import_module("s3fs")
-except ImportError:
-    raise ImportError("s3fs is required to use copy")
+    import fcntl
+except ImportError:  # pragma: no cover - windows
+    fcntl = None  # type: ignore
 
-from s3fs import S3FileSystem  # type: ignore
+T = TypeVar("T")
+R = TypeVar("R")
 
-try:
-    importlib.import_module("boto3")  # type: ignore
-except ImportError:
-    raise ImportError("boto3 is required to use copy")
+MB = 1024 ** 2
+
+
+class TransferResult(NamedTuple):
+    """ Outcome of transferring a single file or object """
+
+    src: str
+    dest: str
+    size: int
+
+
+class TransferConfig(object):
+    """Tuning for multipart transfers, applied to every copy direction
+
+    Parameters
+    ----------
+    multipart_threshold: int, optional
+        Objects of at least this many bytes are transferred in parts
+    part_size: int, optional
+        Size in bytes of each part
+    max_concurrency: int, optional
+        Maximum number of parts of a single object transferred at once
+    max_bandwidth: int, optional
+        Maximum bytes per second for uploads/downloads of a single object.
+        Has no effect on server-side (s3 -> s3) copies
+
+    Notes
+    -----
+        `max_concurrency` is per object, while the `parallelism` argument of
+        the copy functions is the number of objects transferred at once. The
+        total number of connections can reach their product.
+
+        s3 -> s3 copies above `multipart_threshold` use server-side
+        multipart copies (UploadPartCopy), which is also what allows copying
+        objects larger than the 5 GB CopyObject limit.
+    """
+
+    def __init__(
+        self,
+        multipart_threshold: int = 8 * MB,
+        part_size: int = 8 * MB,
+        max_concurrency: int = 10,
+        max_bandwidth: Optional[int] = None,
+    ) -> None:
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.max_bandwidth = max_bandwidth
+
+    def __repr__(self) -> str:
+        return (
+            "TransferConfig(multipart_threshold={}, part_size={}, "
+            "max_concurrency={}, max_bandwidth={})"
+        ).format(
+            self.multipart_threshold,
+            self.part_size,
+            self.max_concurrency,
+            self.max_bandwidth,
+        )
+
+    def to_boto3(self):
+        """ Build the equivalent `boto3.s3.transfer.TransferConfig` """
+        from boto3.s3.transfer import TransferConfig as Boto3TransferConfig  # type: ignore
+
+        return Boto3TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.part_size,
+            max_concurrency=self.max_concurrency,
+            max_bandwidth=self.max_bandwidth,
+            use_threads=self.max_concurrency > 1,
+        )
 
-import boto3  # type: ignore
+
+def _boto3_config(config: Optional[TransferConfig]):
+    return None if config is None else config.to_boto3()
 
 
 @no_type_check
 def copy(src: Path, dest: Path, **kwargs):
+    """Copy a file or directory between locations
+
+    Parameters
+    ----------
+    src: Path
+        File or directory to copy
+    dest: Path
+        Destination
+    kwargs:
+        Passed to the direction-specific copy function. Every direction
+        supports `parallelism`, `config` (a `TransferConfig`) and `verify`
+        (a checksum algorithm). Depending on the direction:
+            - `executor` ("thread" or "process"): every direction between
+              local and s3 paths
+            - `include`/`exclude`: copies from local paths, and from any
+              path to or from other backends
+            - `resume`/`journal`: local -> s3 and s3 -> local
+            - `list_parallelism`: s3 -> s3 and s3 -> local
+            - `compression` ("gzip", "zstd", "lz4" or "infer"): any
+              direction; files are compressed as they are written to dest
+              (see `copy_generic`)
+            - any other keyword: `ExtraArgs` of boto3 for copies involving s3
 
-    if src._location == "local" and dest._location == "s3":
-        return copy_local_s3(src._impl, dest._impl, **kwargs)
-    elif src._location == "s3" and dest._location == "s3":
-        return copy_s3_s3(src._impl, dest._impl, **kwargs)
-    elif src._location == "s3" and dest._location == "local":
-        return copy_s3_local(src._impl, dest._impl, **kwargs)
+    Raises
+    ------
+    UnsupportedOperation
+        If an option is not supported for this direction
+    """
+    if kwargs.get("compression") is not None:
+        function: Callable = copy_generic
     else:
-        raise UnsupportedCopyOperation(
-            "Only local -> s3, s3 -> s3, and s3 -> local are currently supported"
+        kwargs.pop("compression", None)
+        function = _copy_function(src._location, dest._location)
+    _check_options(function, kwargs)
+    return function(src._impl, dest._impl, **kwargs)
+
+
+def _copy_function(src_location: str, dest_location: str) -> Callable:
+    """Get the copy implementation for a pair of locations
+
+    Pairs without a dedicated implementation stream files through the
+    generic path API (see `copy_generic`)
+    """
+    if src_location == "local" and dest_location == "s3":
+        return copy_local_s3
+    elif src_location == "s3" and dest_location == "s3":
+        return copy_s3_s3
+    elif src_location == "s3" and dest_location == "local":
+        return copy_s3_local
+    elif src_location == "local" and dest_location == "local":
+        return copy_local_local
+    else:
+        return copy_generic
+
+
+# options of the copy functions, as opposed to boto3 `ExtraArgs`
+_OPTIONS = frozenset(
+    (
+        "parallelism",
+        "include",
+        "exclude",
+        "config",
+        "executor",
+        "verify",
+        "resume",
+        "journal",
+        "compression",
+        "list_parallelism",
+    )
+)
+
+
+def _check_options(function: Callable, options: dict) -> None:
+    """ Raise UnsupportedOperation for options a copy function does not take """
+    import inspect
+
+    parameters = inspect.signature(function).parameters
+    unsupported = set(options) - set(parameters)
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+        # the rest are passed to boto3
+        unsupported &= _OPTIONS
+    if unsupported:
+        raise UnsupportedOperation(
+            "{} does not support {}".format(function.__name__, ", ".join(sorted(unsupported)))
         )
-    pass
 
 
-def copy_local_s3(src: LocalPath, dest: S3Path, **kwargs):
-    s3 = boto3.client("s3")
+class SyncAction(NamedTuple):
+    """ A single step of a sync plan """
+
+    action: str  # "copy" or "delete"
+    src: Optional[str]
+    dest: str
+    reason: str  # "new", "changed" or "extraneous"
+
+
+@no_type_check
+def sync(
+    src: Path,
+    dest: Path,
+    delete: bool = False,
+    dry_run: bool = False,
+    compare: str = "mtime",
+    parallelism: Optional[int] = None,
+    include: Patterns = None,
+    exclude: Patterns = None,
+    config: Optional[TransferConfig] = None,
+    **kwargs
+) -> List[SyncAction]:
+    """Copy only the files that are new or changed from src to dest
+
+    Parameters
+    ----------
+    src: Path
+        File or directory to sync from
+    dest: Path
+        File or directory to sync to
+    delete: bool, optional
+        If True, also delete files in dest that do not exist in src
+    dry_run: bool, optional
+        If True, only plan: nothing is copied or deleted
+    compare: str, optional
+        How a file present on both sides is judged to have changed:
+            - "mtime": sizes differ, or src was modified after dest
+            - "etag": sizes or checksums (S3 ETag / MD5) differ
+            - "size": sizes differ
+    parallelism: int, optional
+        Maximum number of concurrent copies/deletes
+    include: str or list of str, optional
+        Glob pattern(s), relative to src/dest, a file must match to be synced
+    exclude: str or list of str, optional
+        Glob pattern(s), relative to src/dest, of files to ignore on both sides
+    config: TransferConfig, optional
+        Multipart settings for each copy. Its part size is also used to
+        reproduce multipart ETags of local files
+    kwargs:
+        Passed to boto3 as `ExtraArgs` for each copy
+
+    Returns
+    -------
+    list of SyncAction: The planned (dry_run=True) or performed actions
+
+    Raises
+    ------
+    CopyError
+        If any copy or delete failed. Every other action is still attempted
+    """
+    if compare not in ("mtime", "etag", "size"):
+        raise ValueError("compare must be one of 'mtime', 'etag' or 'size'")
+    copy_function = _copy_function(src._location, dest._location)
+    _check_options(copy_function, dict(kwargs, config=config))
+    part_size = (config or TransferConfig()).part_size
+
+    if src.is_file():
+        dest_file = dest / src.basename() if dest.is_dir() else dest
+        src_files = {"": src._impl}
+        dest_files = {"": dest_file._impl} if dest_file.is_file() else {}
+    else:
+        dest_file = dest
+        src_files = _inventory(src._impl, include, exclude)
+        dest_files = _inventory(dest._impl, include, exclude) if dest.is_dir() else {}
+
+    def _target(relative: str):
+        return dest_file._impl.join(*relative.split("/")) if relative else dest_file._impl
+
+    plan = []
+    for relative, src_file in src_files.items():
+        dest_file_impl = dest_files.get(relative)
+        if dest_file_impl is None:
+            plan.append(SyncAction("copy", str(src_file), str(_target(relative)), "new"))
+        elif _changed(src_file, dest_file_impl, compare, part_size):
+            plan.append(SyncAction("copy", str(src_file), str(dest_file_impl), "changed"))
+    if delete:
+        plan.extend(
+            SyncAction("delete", None, str(dest_file_impl), "extraneous")
+            for relative, dest_file_impl in dest_files.items()
+            if relative not in src_files
+        )
+    if dry_run or not plan:
+        return plan
+
+    directories = _DirectoryCache()
+    location_class_map = Path.location_class_map
+
+    def _apply(action: SyncAction) -> SyncAction:
+        target = location_class_map[dest._location](action.dest, **dest._original_kwargs)
+        if action.action == "delete":
+            target.remove()
+            return action
+        if dest._location == "local":
+            directories.makedirs(os.path.dirname(action.dest))
+        source = location_class_map[src._location](action.src, **src._original_kwargs)
+        copy_function(source, target, config=config, **kwargs)
+        return action
+
+    _run_pipeline(plan, _apply, parallelism)
+    return plan
+
+
+def _inventory(root, include: Patterns = None, exclude: Patterns = None) -> dict:
+    """ Map the relative path of every file below root to its backend object """
+    prefix = str(root).rstrip("/") + "/"
+    files = {}
+    for path in root.walk():
+        relative = str(path)[len(prefix) :].replace(os.sep, "/")
+        if matches_patterns(relative, include, exclude):
+            files[relative] = path
+    return files
+
+
+def _changed(src, dest, compare: str, part_size: int) -> bool:
+    """ Decide whether dest is out of date with respect to src """
+    src_stat = src.stat()
+    dest_stat = dest.stat()
+    if src_stat.size != dest_stat.size:
+        return True
+    if compare == "size":
+        return False
+    if compare == "mtime":
+        # S3 only keeps whole seconds
+        return int(src_stat.mtime or 0) > int(dest_stat.mtime or 0)
+    if src_stat.etag is not None and dest_stat.etag is not None:
+        return src_stat.etag != dest_stat.etag
+    if src_stat.etag is not None:
+        size = _part_size(src, src_stat.etag, part_size)
+        return not etag_matches(str(dest), src_stat.etag, size)
+    if dest_stat.etag is not None:
+        size = _part_size(dest, dest_stat.etag, part_size)
+        return not etag_matches(str(src), dest_stat.etag, size)
+    return compute_etag(str(src)) != compute_etag(str(dest))
+
+
+def _part_size(path, etag: str, default: int) -> int:
+    """Part size of the multipart upload an ETag comes from
+
+    The upload may not have used the current part size, so it is read from
+    the object (see `_remote_checksum`). default is returned for ETags of
+    single part uploads, where it does not matter
+    """
+    if "-" not in etag or not isinstance(path, S3Path):
+        return default
+    _, part_size = _remote_checksum(path.client, path.bucket, path.key, "etag", etag)
+    return part_size or default
+
+
+def copy_local_s3(
+    src: LocalPath,
+    dest: S3Path,
+    parallelism: Optional[int] = None,
+    include: Patterns = None,
+    exclude: Patterns = None,
+    config: Optional[TransferConfig] = None,
+    executor: str = "thread",
+    verify: Union[bool, str] = False,
+    resume: bool = False,
+    journal: Optional[str] = None,
+    **kwargs
+) -> List[TransferResult]:
+    """Upload a local file, or every file below a local directory
+
+    Parameters
+    ----------
+    src: LocalPath
+        File or directory to upload
+    dest: S3Path
+        Destination key, or key prefix when src is a directory
+    parallelism: int, optional
+        Maximum number of concurrent uploads when src is a directory
+    include: str or list of str, optional
+        Glob pattern(s), relative to src, a file must match to be uploaded
+    exclude: str or list of str, optional
+        Glob pattern(s), relative to src, of files to skip
+    config: TransferConfig, optional
+        Multipart settings for each file
+    executor: str, optional
+        "thread" or "process": the kind of pool uploading files when src is
+        a directory
+    verify: bool or str, optional
+        Checksum every transferred file and raise `VerificationError` on a
+        mismatch: "etag" (True), "crc32", "crc32c" or "xxhash". Checksums are
+        computed while the file is read for the upload, and compared with
+        the ETag or additional checksum S3 stores for the new object
+    resume: bool, optional
+        Record finished work in a transfer journal, and skip the work a
+        previous interrupted run with the same journal finished. Multipart
+        uploads are continued from their last uploaded part. The journal is
+        deleted once every file is uploaded
+    journal: str, optional
+        Journal file. Defaults to "<src>.pathman-journal". Giving one
+        without `resume` starts a new journal
+    kwargs:
+        Passed to boto3 as `ExtraArgs`
+
+    Returns
+    -------
+    list of TransferResult: One entry per file uploaded by this call
+
+    Raises
+    ------
+    CopyError
+        If any file below a directory failed to upload. Every other file is
+        still attempted
+    """
     bucket = dest.bucket
     key = dest.key
-    s3.upload_file(str(src), bucket, key, ExtraArgs=kwargs)
+    verify = _verify_algorithm(verify)
+    transfers = _journal(journal, resume, str(src))
+    if transfers is None:
+        upload = functools.partial(_upload_file, dest.client_kwargs, bucket, kwargs, config, verify)
+    else:
+        state = transfers.load()
+        upload = functools.partial(
+            _upload_resumable, dest.client_kwargs, bucket, kwargs, config, verify, transfers
+        )
 
+    def _tasks(items: Iterable[Tuple[str, str]]) -> Iterator[tuple]:
+        if transfers is None:
+            yield from items
+            return
+        for filename, object_key in items:
+            st = os.stat(filename)
+            target = "s3://{}/{}".format(bucket, object_key)
+            if not state.is_done(filename, target, size=st.st_size, mtime=st.st_mtime_ns):
+                yield filename, object_key, state.uploads.get((filename, target))
 
-def copy_s3_s3(src: S3Path, dest: S3Path, **kwargs):
-    s3fs = S3FileSystem(anon=False)
-    s3fs.copy(str(src), str(dest), **kwargs)
+    is_dir = src.is_dir()
+    try:
+        if is_dir:
+            root = str(src)
+            prefix = key.rstrip("/")
+
+            def _uploads():
+                for path in src.walk():
+                    relative = os.path.relpath(str(path), root).replace(os.sep, "/")
+                    if matches_patterns(relative, include, exclude):
+                        yield str(path), "/".join(p for p in (prefix, relative) if p)
+
+            results = _run_pipeline(_tasks(_uploads()), upload, parallelism, executor)
+        else:
+            results = [upload(task) for task in _tasks([(str(src), key)])]
+    finally:
+        dest._invalidate(recursive=is_dir)
+        if transfers is not None:
+            transfers.close()
+    if transfers is not None:
+        transfers.remove()
+    return results
+
+
+def _upload_file(
+    client_kwargs: dict,
+    bucket: str,
+    extra_args: dict,
+    config: Optional[TransferConfig],
+    verify: Optional[str],
+    item: Tuple[str, str],
+) -> TransferResult:
+    filename, key = item
+    client = get_client(**client_kwargs)
+    dest = "s3://{}/{}".format(bucket, key)
+    if verify is None:
+        client.upload_file(
+            filename, bucket, key, ExtraArgs=extra_args, Config=_boto3_config(config)
+        )
+        return TransferResult(filename, dest, os.path.getsize(filename))
+
+    st = os.stat(filename)
+    checksums = _upload_checksums(verify, st.st_size, config)
+    with open(filename, "rb") as f:
+        reader = _HashingReader(f, checksums)
+        client.upload_fileobj(
+            reader,
+            bucket,
+            key,
+            ExtraArgs=_with_checksum_algorithm(extra_args, verify),
+            Config=_boto3_config(config),
+        )
+    complete = reader.hashed == st.st_size
+    if complete:
+        for checksum in checksums:
+            remember_checksum(filename, st, checksum)
+    remote, part_size = _remote_checksum(client, bucket, key, verify)
+    forms = [c.part_size for c in _checksums_for(verify, part_size)]
+    if complete and set(forms) <= {c.part_size for c in checksums}:
+        local = [c.value() for c in checksums]
+    else:
+        # the upload was split differently than predicted
+        local = [file_checksum(filename, verify, form) for form in forms]
+    result = TransferResult(filename, dest, st.st_size)
+    _check(result, remote, local)
+    return result
+
+
+def _upload_resumable(
+    client_kwargs: dict,
+    bucket: str,
+    extra_args: dict,
+    config: Optional[TransferConfig],
+    verify: Optional[str],
+    journal: TransferJournal,
+    item: Tuple[str, str, Optional[dict]],
+) -> TransferResult:
+    """ Upload a file, continuing the multipart upload journaled for it, if any """
+    filename, key, previous = item
+    client = get_client(**client_kwargs)
+    config = config or TransferConfig()
+    extra_args = _with_checksum_algorithm(extra_args, verify)
+    st = os.stat(filename)
+    result = TransferResult(filename, "s3://{}/{}".format(bucket, key), st.st_size)
+    if st.st_size < config.multipart_threshold:
+        client.upload_file(filename, bucket, key, ExtraArgs=extra_args, Config=config.to_boto3())
+    else:
+        _multipart_upload(client, bucket, key, filename, st, extra_args, config, journal, previous)
+    if verify is not None:
+        # parts may come from an earlier run: checksum the whole file
+        remote, part_size = _remote_checksum(client, bucket, key, verify)
+        forms = _checksums_for(verify, part_size)
+        _check(result, remote, [file_checksum(filename, verify, c.part_size) for c in forms])
+    journal.record("done", result.src, result.dest, size=st.st_size, mtime=st.st_mtime_ns)
+    return result
+
+
+def _multipart_upload(
+    client,
+    bucket: str,
+    key: str,
+    filename: str,
+    st: os.stat_result,
+    extra_args: dict,
+    config: TransferConfig,
+    journal: TransferJournal,
+    previous: Optional[dict],
+) -> None:
+    """Upload a file in parts, reusing a previous upload if the file is unchanged
+
+    Parts S3 already holds for the previous upload are not uploaded again
+    """
+    from s3transfer.upload import UploadSubmissionTask  # type: ignore
+    from s3transfer.utils import ChunksizeAdjuster  # type: ignore
+
+    dest = "s3://{}/{}".format(bucket, key)
+    part_size = ChunksizeAdjuster().adjust_chunksize(config.part_size, st.st_size)
+    upload_id = None
+    parts: Dict[int, dict] = {}
+    if previous is not None and (previous["size"], previous["mtime"], previous["part_size"]) == (
+        st.st_size,
+        st.st_mtime_ns,
+        part_size,
+    ):
+        upload_id = previous["upload_id"]
+        try:
+            parts = _uploaded_parts(client, bucket, key, upload_id)
+        except Exception as e:
+            # aborted, or expired by a lifecycle rule
+            if _error_code(e) != "NoSuchUpload":
+                raise
+            upload_id = None
+    if upload_id is None:
+        upload_id = client.create_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            **{
+                k: v
+                for k, v in extra_args.items()
+                if k not in UploadSubmissionTask.CREATE_MULTIPART_BLOCKLIST
+            }
+        )["UploadId"]
+        journal.record(
+            "upload",
+            filename,
+            dest,
+            size=st.st_size,
+            mtime=st.st_mtime_ns,
+            part_size=part_size,
+            upload_id=upload_id,
+        )
+    part_args = {k: v for k, v in extra_args.items() if k in UploadSubmissionTask.UPLOAD_PART_ARGS}
+
+    def _upload_part(number: int) -> dict:
+        with open(filename, "rb") as f:
+            f.seek((number - 1) * part_size)
+            body = f.read(part_size)
+        response = client.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body, **part_args
+        )
+        journal.record("part", filename, dest, upload_id=upload_id, part=number)
+        return part_entry(dict(response, PartNumber=number))
+
+    count = max(1, -(-st.st_size // part_size))
+    missing = [n for n in range(1, count + 1) if n not in parts]
+    with futures.ThreadPoolExecutor(max_workers=max(1, config.max_concurrency)) as pool:
+        for entry in pool.map(_upload_part, missing):
+            parts[entry["PartNumber"]] = entry
+    client.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={"Parts": [parts[n] for n in sorted(parts)]},
+        **{
+            k: v
+            for k, v in extra_args.items()
+            if k in UploadSubmissionTask.COMPLETE_MULTIPART_ARGS
+        }
+    )
+
+
+def _uploaded_parts(client, bucket: str, key: str, upload_id: str) -> Dict[int, dict]:
+    """ Parts S3 holds for a multipart upload, by part number """
+    paginator = client.get_paginator("list_parts")
+    return {
+        part["PartNumber"]: part_entry(part)
+        for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id)
+        for part in page.get("Parts", [])
+    }
+
+
+def copy_s3_s3(
+    src: S3Path,
+    dest: S3Path,
+    parallelism: Optional[int] = None,
+    config: Optional[TransferConfig] = None,
+    executor: str = "thread",
+    verify: Union[bool, str] = False,
+    list_parallelism: int = 1,
+    **kwargs
+) -> List[TransferResult]:
+    """Server-side copy of an s3 object, or every object below an s3 prefix
+
+    Parameters
+    ----------
+    src: S3Path
+        Object or prefix to copy
+    dest: S3Path
+        Destination key, or key prefix when src is a prefix
+    parallelism: int, optional
+        Maximum number of concurrent object copies when src is a prefix
+    config: TransferConfig, optional
+        Multipart settings for each object. Objects above the multipart
+        threshold are copied in parts, which is required above 5 GB
+    executor: str, optional
+        "thread" or "process": the kind of pool copying objects when src is
+        a prefix
+    verify: bool or str, optional
+        Checksum every transferred object and raise `VerificationError` on a
+        mismatch: "etag" (True), "crc32", "crc32c" or "xxhash". The data of a
+        server-side copy never leaves S3, so sizes are compared, and
+        checksums too whenever source and copy both have a whole-object one
+    list_parallelism: int, optional
+        Number of shards of the key space listed at once when src is a
+        prefix (see `parallel_list_objects`). Defaults to a single listing,
+        which is enough unless the prefix holds millions of keys
+    kwargs:
+        Passed to boto3 as `ExtraArgs`
+
+    Returns
+    -------
+    list of TransferResult: One entry per copied object
+
+    Raises
+    ------
+    CopyError
+        If any object below a prefix failed to copy. Every other object is
+        still attempted
+    """
+    src_bucket = src.bucket
+    copy_object = functools.partial(
+        _copy_object,
+        src.client_kwargs,
+        dest.client_kwargs,
+        src_bucket,
+        dest.bucket,
+        kwargs,
+        config,
+        _verify_algorithm(verify),
+    )
+
+    try:
+        if src.is_dir():
+            src_prefix = src.key.rstrip("/")
+            list_prefix = src_prefix + "/" if src_prefix else ""
+            dest_prefix = dest.key.rstrip("/")
+            objects = parallel_list_objects(
+                src.client, src_bucket, list_prefix, list_parallelism
+            )
+            copies = (
+                (
+                    obj["Key"],
+                    "/".join(p for p in (dest_prefix, obj["Key"][len(list_prefix) :]) if p),
+                    obj["Size"],
+                )
+                for obj in objects
+                if not obj["Key"].endswith("/")
+            )
+            return _run_pipeline(_prefetch(copies), copy_object, parallelism, executor)
+        elif src.is_file():
+            return [copy_object((src.key, dest.key, src.stat().size))]
+        else:
+            raise UnsupportedCopyOperation(
+                "src was not a directory or a file: {}".format(src)
+            )
+    finally:
+        dest._invalidate(recursive=True)
+
+
+def _copy_object(
+    src_client_kwargs: dict,
+    dest_client_kwargs: dict,
+    src_bucket: str,
+    bucket: str,
+    extra_args: dict,
+    config: Optional[TransferConfig],
+    verify: Optional[str],
+    item: Tuple[str, str, int],
+) -> TransferResult:
+    src_key, dest_key, size = item
+    source_client = get_client(**src_client_kwargs)
+    client = get_client(**dest_client_kwargs)
+    client.copy(
+        {"Bucket": src_bucket, "Key": src_key},
+        bucket,
+        dest_key,
+        ExtraArgs=_with_checksum_algorithm(extra_args, verify),
+        Config=_boto3_config(config),
+        SourceClient=source_client,
+    )
+    result = TransferResult(
+        "s3://{}/{}".format(src_bucket, src_key), "s3://{}/{}".format(bucket, dest_key), size
+    )
+    if verify is None:
+        return result
+
+    copied = client.head_object(Bucket=bucket, Key=dest_key, ChecksumMode="ENABLED")
+    if copied["ContentLength"] != size:
+        raise VerificationError(result.src, result.dest, size, copied["ContentLength"])
+    original = source_client.head_object(Bucket=src_bucket, Key=src_key, ChecksumMode="ENABLED")
+    field = _checksum_field(verify)
+    expected = (original.get(field) or "").strip('"')
+    actual = (copied.get(field) or "").strip('"')
+    # multipart copies are re-chunked, so only whole-object checksums compare
+    if expected and actual and "-" not in expected and "-" not in actual:
+        if expected != actual:
+            raise VerificationError(result.src, result.dest, expected, actual)
+    return result
 
 
 def copy_s3_local(
-    src: S3Path, dest: LocalPath, parallelism: Optional[int] = None, **kwargs
-):
-    s3 = boto3.client("s3")
+    src: S3Path,
+    dest: LocalPath,
+    parallelism: Optional[int] = None,
+    config: Optional[TransferConfig] = None,
+    executor: str = "thread",
+    verify: Union[bool, str] = False,
+    resume: bool = False,
+    journal: Optional[str] = None,
+    list_parallelism: int = 1,
+    **kwargs
+) -> List[TransferResult]:
+    """Download an s3 object, or every object below an s3 prefix
 
-    bucket = src.bucket
-    prefix = src.key
-    prefix_parts = prefix.split("/")
+    If a disk cache is enabled (see `pathman.diskcache`), objects are
+    downloaded into it and copied from there.
 
-    def _download_key(key: str):
-        key_parts = key.split("/")[len(prefix_parts) :]
+    Parameters
+    ----------
+    src: S3Path
+        Object or prefix to download
+    dest: LocalPath
+        Destination file or directory
+    parallelism: int, optional
+        Maximum number of concurrent downloads when src is a prefix
+    config: TransferConfig, optional
+        Multipart settings for each object
+    executor: str, optional
+        "thread" or "process": the kind of pool downloading objects when src
+        is a prefix
+    verify: bool or str, optional
+        Checksum every transferred object and raise `VerificationError` on a
+        mismatch: "etag" (True), "crc32", "crc32c" or "xxhash". Checksums are
+        computed while the object is written, and compared with the ETag or
+        additional checksum S3 stores for it
+    resume: bool, optional
+        Record finished work in a transfer journal, and skip the work a
+        previous interrupted run with the same journal finished. Objects
+        above the multipart threshold are downloaded in ranges of
+        `config.part_size` into "<dest>.pathman-partial", and continued from
+        their last downloaded range. The journal is deleted once every
+        object is downloaded
+    journal: str, optional
+        Journal file. Defaults to "<dest>.pathman-journal". Giving one
+        without `resume` starts a new journal
+    list_parallelism: int, optional
+        Number of shards of the key space listed at once when src is a
+        prefix (see `parallel_list_objects`). Defaults to a single listing,
+        which is enough unless the prefix holds millions of keys
+    kwargs:
+        Passed to boto3 as `ExtraArgs`
 
-        # create local directories
-        destination = Path(str(dest.join(*key_parts)))
-        destination.dirname().mkdir(parents=True, exist_ok=True)
-        s3.download_file(
-            Bucket=bucket, Key=key, Filename=str(destination), ExtraArgs=kwargs
+    Returns
+    -------
+    list of TransferResult: One entry per object downloaded by this call
+
+    Raises
+    ------
+    CopyError
+        If any object below a prefix failed to download. Every other object
+        is still attempted
+    """
+    bucket = src.bucket
+    prefix = src.key
+    verify = _verify_algorithm(verify)
+    transfers = _journal(journal, resume, str(dest))
+    if transfers is None:
+        download = functools.partial(
+            _download_object,
+            src.client_kwargs,
+            bucket,
+            kwargs,
+            config,
+            get_disk_cache(),
+            verify,
+        )
+    else:
+        state = transfers.load()
+        download = functools.partial(
+            _download_resumable, src.client_kwargs, bucket, kwargs, config, verify, transfers
         )
 
+    def _tasks(items: Iterable[Tuple[str, Optional[str], int, str]]) -> Iterator[tuple]:
+        if transfers is None:
+            yield from items
+            return
+        for key, etag, size, filename in items:
+            source = "s3://{}/{}".format(bucket, key)
+            etag = (etag or "").strip('"')
+            if state.is_done(source, filename, etag=etag, size=size) and _has_size(filename, size):
+                continue
+            yield key, etag, size, filename, state.parts.get((source, filename), [])
+
     # copy will be recursive automatically if the src is a directory
     if src.is_dir():
-        continuation_token = None
-        while True:
-            if continuation_token is not None:
-                batch = s3.list_objects_v2(
-                    Bucket=bucket, Prefix=prefix, ContinuationToken=continuation_token
-                )
-            else:
-                batch = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-
-            with futures.ThreadPoolExecutor(max_workers=parallelism) as executor:
-                futures.wait(
-                    [
-                        executor.submit(_download_key, key["Key"])
-                        for key in batch["Contents"]
-                    ],
-                    return_when=futures.FIRST_EXCEPTION,
-                )
+        prefix = prefix.rstrip("/")
+        list_prefix = prefix + "/" if prefix else ""
+        directories = _DirectoryCache()
 
-            if "NextContinuationToken" in batch:
-                continuation_token = batch["NextContinuationToken"]
-            else:
-                break
+        def _downloads():
+            # directories are created here, so workers only transfer
+            for obj in parallel_list_objects(src.client, bucket, list_prefix, list_parallelism):
+                relative = obj["Key"][len(list_prefix) :]
+                destination = os.path.join(str(dest), *relative.split("/"))
+                if obj["Key"].endswith("/"):
+                    # "directory marker" object
+                    directories.makedirs(destination)
+                    continue
+                directories.makedirs(os.path.dirname(destination))
+                yield obj["Key"], obj["ETag"], obj["Size"], destination
+
+        def _run() -> List[TransferResult]:
+            return _run_pipeline(_prefetch(_tasks(_downloads())), download, parallelism, executor)
 
     elif src.is_file():
         if dest.is_dir():
-            s3.download_file(
-                Bucket=bucket,
-                Key=prefix,
-                Filename=str(dest / src.parts[-1]),
-                ExtraArgs=kwargs,
-            )
+            filename = str(dest / src.parts[-1])
         else:
-            s3.download_file(
-                Bucket=bucket, Key=prefix, Filename=str(dest), ExtraArgs=kwargs
-            )
+            filename = str(dest)
+        stat = src.stat()
+
+        def _run() -> List[TransferResult]:
+            return [download(task) for task in _tasks([(prefix, stat.etag, stat.size, filename)])]
+
     else:
         raise UnsupportedCopyOperation(
             "src was not a directory or a file: {}".format(src)
         )
+
+    try:
+        results = _run()
+    finally:
+        if transfers is not None:
+            transfers.close()
+    if transfers is not None:
+        transfers.remove()
+    return results
+
+
+def _download_object(
+    client_kwargs: dict,
+    bucket: str,
+    extra_args: dict,
+    config: Optional[TransferConfig],
+    cache: Optional[DiskCache],
+    verify: Optional[str],
+    item: Tuple[str, Optional[str], int, str],
+) -> TransferResult:
+    """ Download an object, through the disk cache if one is given """
+    key, etag, size, filename = item
+    client = get_client(**client_kwargs)
+    result = TransferResult("s3://{}/{}".format(bucket, key), filename, size)
+    if verify is not None:
+        expected, part_size = _remote_checksum(client, bucket, key, verify, etag)
+        checksums = _checksums_for(verify, part_size)
+
+    if cache is not None and etag is not None:
+        cached = fetch_cached(cache, client, bucket, key, etag, **extra_args)
+        if verify is not None:
+            local = [file_checksum(cached, verify, c.part_size) for c in checksums]
+            _check(result, expected, local)
+        shutil.copyfile(cached, filename)
+    elif verify is None:
+        client.download_file(
+            Bucket=bucket,
+            Key=key,
+            Filename=filename,
+            ExtraArgs=extra_args,
+            Config=_boto3_config(config),
+        )
+    else:
+        with open(filename, "wb") as f:
+            # a non-seekable target makes s3transfer write parts in order
+            client.download_fileobj(
+                bucket,
+                key,
+                _HashingWriter(f, checksums),
+                ExtraArgs=extra_args,
+                Config=_boto3_config(config),
+            )
+        _check(result, expected, [c.value() for c in checksums])
+    return result
+
+
+def _download_resumable(
+    client_kwargs: dict,
+    bucket: str,
+    extra_args: dict,
+    config: Optional[TransferConfig],
+    verify: Optional[str],
+    journal: TransferJournal,
+    item: Tuple[str, str, int, str, List[dict]],
+) -> TransferResult:
+    """ Download an object, continuing the ranged download journaled for it, if any """
+    key, etag, size, filename, previous = item
+    client = get_client(**client_kwargs)
+    config = config or TransferConfig()
+    result = TransferResult("s3://{}/{}".format(bucket, key), filename, size)
+    if size < config.multipart_threshold:
+        client.download_file(
+            Bucket=bucket,
+            Key=key,
+            Filename=filename,
+            ExtraArgs=extra_args,
+            Config=config.to_boto3(),
+        )
+    else:
+        _ranged_download(
+            client, bucket, key, etag, size, filename, extra_args, config, journal, previous
+        )
+    if verify is not None:
+        remote, part_size = _remote_checksum(client, bucket, key, verify, etag)
+        forms = _checksums_for(verify, part_size)
+        _check(result, remote, [file_checksum(filename, verify, c.part_size) for c in forms])
+    journal.record("done", result.src, filename, etag=etag, size=size)
+    return result
+
+
+def _ranged_download(
+    client,
+    bucket: str,
+    key: str,
+    etag: str,
+    size: int,
+    filename: str,
+    extra_args: dict,
+    config: TransferConfig,
+    journal: TransferJournal,
+    previous: List[dict],
+) -> None:
+    """Download an object in ranges into a partial file, skipping journaled ranges
+
+    Ranges are requested with If-Match, so a partial file never mixes two
+    versions of an object. Each range is flushed to disk before it is
+    journaled.
+    """
+    source = "s3://{}/{}".format(bucket, key)
+    partial = filename + ".pathman-partial"
+    part_size = config.part_size
+    done = {
+        entry["part"]
+        for entry in previous
+        if entry.get("etag") == etag and entry.get("part_size") == part_size
+    }
+    if not (done and _has_size(partial, size)):
+        done = set()
+        with open(partial, "wb") as f:
+            f.truncate(size)
+
+    fd = os.open(partial, os.O_WRONLY)
+
+    def _download_range(number: int) -> None:
+        start = (number - 1) * part_size
+        end = min(start + part_size, size) - 1
+        response = client.get_object(
+            Bucket=bucket,
+            Key=key,
+            Range="bytes={}-{}".format(start, end),
+            IfMatch='"{}"'.format(etag),
+            **extra_args
+        )
+        offset = start
+        for chunk in response["Body"].iter_chunks(MB):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+        os.fsync(fd)
+        journal.record("part", source, filename, etag=etag, part_size=part_size, part=number)
+
+    count = -(-size // part_size)
+    missing = [n for n in range(1, count + 1) if n not in done]
+    try:
+        with futures.ThreadPoolExecutor(max_workers=max(1, config.max_concurrency)) as pool:
+            for _ in pool.map(_download_range, missing):
+                pass
+    finally:
+        os.close(fd)
+    os.replace(partial, filename)
+
+
+def _journal(journal: Optional[str], resume: bool, local: str) -> Optional[TransferJournal]:
+    """ Journal for a copy, if it is resumable """
+    if journal is None and not resume:
+        return None
+    transfers = TransferJournal(journal or local.rstrip("/" + os.sep) + ".pathman-journal")
+    if not resume:
+        transfers.remove()
+    return transfers
+
+
+def _has_size(filename: str, size: int) -> bool:
+    try:
+        return os.path.getsize(filename) == size
+    except OSError:
+        return False
+
+
+def _verify_algorithm(verify: Union[bool, str, None]) -> Optional[str]:
+    """ Normalize the `verify` argument of the copy functions """
+    if verify is None or verify is False:
+        return None
+    if verify is True:
+        return "etag"
+    if verify not in ALGORITHMS:
+        raise ValueError(
+            "verify must be a bool or one of {}, not {!r}".format(", ".join(ALGORITHMS), verify)
+        )
+    return verify
+
+
+def _checksum_field(algorithm: str) -> str:
+    """ Field of a HeadObject response holding a checksum """
+    if algorithm == "etag":
+        return "ETag"
+    return "Checksum" + S3_CHECKSUM_ALGORITHMS[algorithm]
+
+
+def _with_checksum_algorithm(extra_args: dict, algorithm: Optional[str]) -> dict:
+    """ Ask S3 to store the checksum being verified with new objects """
+    if algorithm is None or algorithm == "etag":
+        return extra_args
+    return dict(extra_args, ChecksumAlgorithm=S3_CHECKSUM_ALGORITHMS[algorithm])
+
+
+def _remote_checksum(
+    client, bucket: str, key: str, algorithm: str, etag: Optional[str] = None
+) -> Tuple[str, Optional[int]]:
+    """Get the checksum S3 holds for an object
+
+    Returns
+    -------
+    tuple: (checksum, part size of the object's multipart upload, or None if
+    it was uploaded in a single part)
+
+    Raises
+    ------
+    UnsupportedOperation
+        If the object has no checksum of this algorithm
+    """
+    value = etag if algorithm == "etag" else None
+    if value is None:
+        head = client.head_object(Bucket=bucket, Key=key, ChecksumMode="ENABLED")
+        value = head.get(_checksum_field(algorithm))
+        if value is None:
+            raise UnsupportedOperation(
+                "s3://{}/{} has no {} checksum".format(bucket, key, algorithm)
+            )
+        etag = head["ETag"]
+    if "-" not in etag:
+        return value.strip('"'), None
+    # parts of a multipart upload all have the size of the first one
+    first_part = client.head_object(Bucket=bucket, Key=key, PartNumber=1)
+    return value.strip('"'), first_part["ContentLength"]
+
+
+def _checksums_for(algorithm: str, part_size: Optional[int]) -> List[Checksum]:
+    """ Checksums an object uploaded with part_size can have on S3 """
+    if part_size is None:
+        return [Checksum(algorithm)]
+    if algorithm == "etag":
+        return [Checksum(algorithm, part_size)]
+    # additional checksums of multipart uploads are composite or whole-object
+    return [Checksum(algorithm), Checksum(algorithm, part_size)]
+
+
+def _upload_checksums(
+    algorithm: str, size: int, config: Optional[TransferConfig]
+) -> List[Checksum]:
+    """ Checksums an upload of size bytes can end up with on S3 """
+    from s3transfer.utils import ChunksizeAdjuster  # type: ignore
+
+    config = config or TransferConfig()
+    if size < config.multipart_threshold:
+        return _checksums_for(algorithm, None)
+    return _checksums_for(
+        algorithm, ChunksizeAdjuster().adjust_chunksize(config.part_size, size)
+    )
+
+
+def _matches(remote: str, local: str) -> bool:
+    """ Compare checksums; some stores report composite ones without "-N" """
+    return remote == local or ("-" not in remote and local.split("-")[0] == remote)
+
+
+def _check(result: TransferResult, remote: str, local: List[str]) -> None:
+    """ Raise VerificationError unless one of the computed checksums matches """
+    if not any(_matches(remote, value) for value in local):
+        raise VerificationError(result.src, result.dest, remote, local[-1])
+
+
+class _HashingReader(object):
+    """Seekable file wrapper feeding checksums with every byte read from it
+
+    s3transfer and botocore may seek back and read bytes again (retries,
+    request checksums); each byte is only fed once. `hashed` is the number
+    of leading bytes fed so far.
+    """
+
+    def __init__(self, f, checksums: List[Checksum]) -> None:
+        self._file = f
+        self._checksums = checksums
+        self.hashed = 0
+
+    def __getattr__(self, name: str):
+        # anything else (close, fileno, ...) goes to the file; reads that
+        # bypass `read` leave `hashed` short and the file is checksummed again
+        return getattr(self._file, name)
+
+    def read(self, size: int = -1) -> bytes:
+        position = self._file.tell()
+        data = self._file.read(size)
+        end = position + len(data)
+        if position <= self.hashed < end:
+            new = memoryview(data)[self.hashed - position :]
+            for checksum in self._checksums:
+                checksum.update(new)
+            self.hashed = end
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+
+class _HashingWriter(object):
+    """ Non-seekable file wrapper feeding checksums with every byte written """
+
+    def __init__(self, f, checksums: List[Checksum]) -> None:
+        self._file = f
+        self._checksums = checksums
+
+    def __getattr__(self, name: str):
+        return getattr(self._file, name)
+
+    def write(self, data) -> int:
+        for checksum in self._checksums:
+            checksum.update(data)
+        return self._file.write(data)
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+
+def copy_local_local(
+    src: LocalPath,
+    dest: LocalPath,
+    parallelism: Optional[int] = None,
+    include: Patterns = None,
+    exclude: Patterns = None,
+    config: Optional[TransferConfig] = None,
+    executor: str = "thread",
+    verify: Union[bool, str] = False,
+) -> List[TransferResult]:
+    """Copy a local file, or every file below a local directory
+
+    Each file is cloned (reflink) where the filesystem supports it, and
+    otherwise copied inside the kernel with `os.copy_file_range` or
+    `os.sendfile`, falling back to a buffered copy. Permission bits are
+    copied along.
+
+    Parameters
+    ----------
+    src: LocalPath
+        File or directory to copy
+    dest: LocalPath
+        Destination file or directory
+    parallelism: int, optional
+        Maximum number of concurrent file copies when src is a directory
+    include: str or list of str, optional
+        Glob pattern(s), relative to src, a file must match to be copied
+    exclude: str or list of str, optional
+        Glob pattern(s), relative to src, of files to skip
+    config: TransferConfig, optional
+        Unused; accepted for symmetry with the other copy functions
+    executor: str, optional
+        "thread" or "process": the kind of pool copying files when src is a
+        directory
+    verify: bool or str, optional
+        Checksum every copy against its source and raise `VerificationError`
+        on a mismatch: "etag" (True, an MD5), "crc32", "crc32c" or "xxhash"
+
+    Returns
+    -------
+    list of TransferResult: One entry per copied file
+
+    Raises
+    ------
+    CopyError
+        If any file below a directory failed to copy. Every other file is
+        still attempted
+    """
+    copy_file = functools.partial(_copy_local_file, _verify_algorithm(verify))
+    if src.is_dir():
+        root = str(src)
+        directories = _DirectoryCache()
+
+        def _copies():
+            for path in src.walk():
+                relative = os.path.relpath(str(path), root)
+                # filtered like every other direction: exclude="build" does
+                # not skip build/x.txt
+                if not matches_patterns(relative.replace(os.sep, "/"), include, exclude):
+                    continue
+                destination = os.path.join(str(dest), relative)
+                directories.makedirs(os.path.dirname(destination))
+                yield str(path), destination
+
+        return _run_pipeline(_copies(), copy_file, parallelism, executor)
+    elif src.is_file():
+        filename = str(dest / src.parts[-1]) if dest.is_dir() else str(dest)
+        return [copy_file((str(src), filename))]
+    else:
+        raise UnsupportedCopyOperation("src was not a directory or a file: {}".format(src))
+
+
+def _copy_local_file(verify: Optional[str], item: Tuple[str, str]) -> TransferResult:
+    src, dest = item
+    # opening dest truncates it, which would empty src
+    if _same_file(src, dest):
+        raise shutil.SameFileError("{!r} and {!r} are the same file".format(src, dest))
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        size = os.fstat(fsrc.fileno()).st_size
+        if not _reflink(fsrc.fileno(), fdest.fileno()):
+            _copy_in_kernel(fsrc, fdest, size)
+    shutil.copymode(src, dest)
+    result = TransferResult(src, dest, size)
+    if verify is not None:
+        expected, actual = file_checksum(src, verify), file_checksum(dest, verify)
+        if expected != actual:
+            raise VerificationError(src, dest, expected, actual)
+    return result
+
+
+def _same_file(src: str, dest: str) -> bool:
+    """ Whether both names are the same file, e.g. through a symlink or hardlink """
+    try:
+        return os.path.samefile(src, dest)
+    except OSError:
+        return False
+
+
+# ioctl request cloning a whole file (linux/fs.h)
+_FICLONE = 0x40049409
+
+
+def _reflink(src_fd: int, dest_fd: int) -> bool:
+    """ Share the extents of src with dest (btrfs, xfs, ...) """
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dest_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _copy_in_kernel(fsrc, fdest, size: int) -> None:
+    """ Copy without moving the data through user space where possible """
+    src_fd, dest_fd = fsrc.fileno(), fdest.fileno()
+    for primitive in ("copy_file_range", "sendfile"):
+        function = getattr(os, primitive, None)
+        if function is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if primitive == "copy_file_range":
+                    copied = function(src_fd, dest_fd, size - offset, offset, offset)
+                else:
+                    os.lseek(dest_fd, offset, os.SEEK_SET)
+                    copied = function(dest_fd, src_fd, offset, size - offset)
+                if not copied:
+                    break
+                offset += copied
+        except OSError:
+            # unsupported for this pair of files; nothing is lost since
+            # every primitive copies at explicit offsets
+            continue
+        if offset >= size:
+            return
+    fsrc.seek(0)
+    fdest.seek(0)
+    fdest.truncate()
+    shutil.copyfileobj(fsrc, fdest, MB)
+
+
+def copy_generic(
+    src: AbstractPath,
+    dest: AbstractPath,
+    parallelism: Optional[int] = None,
+    include: Patterns = None,
+    exclude: Patterns = None,
+    config: Optional[TransferConfig] = None,
+    executor: str = "thread",
+    verify: Union[bool, str] = False,
+    compression: Optional[str] = None,
+) -> List[TransferResult]:
+    """Copy a file or directory between any two backends
+
+    Files are copied server-side when both paths use the same backend and
+    it provides a `copy_file(dest)` method, and otherwise streamed: read
+    with `iter_bytes` and written to `dest.open_stream()` (concurrent
+    multipart uploads on s3) or `dest.open("wb")` chunk by chunk, so they
+    are never held in memory whole.
+
+    Parameters
+    ----------
+    src: AbstractPath
+        File or directory to copy
+    dest: AbstractPath
+        Destination file or directory
+    parallelism: int, optional
+        Maximum number of concurrent file copies when src is a directory
+    include: str or list of str, optional
+        Glob pattern(s), relative to src, a file must match to be copied
+    exclude: str or list of str, optional
+        Glob pattern(s), relative to src, of files to skip
+    config: TransferConfig, optional
+        Its part size is the size of the streamed chunks
+    executor: str, optional
+        Only "thread": files are copied through path objects, which cannot
+        be handed to worker processes
+    verify: bool or str, optional
+        Checksum every file as it is read, read the copy back and raise
+        `VerificationError` if its checksum differs: "etag" (True, an MD5),
+        "crc32", "crc32c" or "xxhash". Compressed copies are decompressed
+        to be checked
+    compression: str, optional
+        "gzip", "zstd" or "lz4" to compress files as they are written, in
+        which case the codec's extension (e.g. ".gz") is appended to the
+        name of every file copied into a directory. "infer" compresses a
+        single file according to the extension of the file written, and
+        cannot be used to copy a directory
+
+    Returns
+    -------
+    list of TransferResult: One entry per copied file, with the size of the
+    source file
+
+    Raises
+    ------
+    CopyError
+        If any file below a directory failed to copy. Every other file is
+        still attempted
+    """
+    if executor != "thread":
+        raise UnsupportedOperation(
+            "copies between these locations only support executor='thread'"
+        )
+    verify = _verify_algorithm(verify)
+    chunk_size = (config or TransferConfig()).part_size
+    server_side = type(src) is type(dest) and hasattr(src, "copy_file")
+    local_dest = isinstance(dest, LocalPath)
+    directories = _DirectoryCache()
+    codec = None if compression == "infer" else resolve_compression(compression, str(dest))
+    extension = EXTENSIONS[codec] if codec is not None else ""
+
+    def _copy(item: tuple) -> TransferResult:
+        source, target, file_codec = item
+        if local_dest:
+            directories.makedirs(os.path.dirname(str(target)))
+        checksum = None if verify is None else Checksum(verify)
+        if server_side and file_codec is None:
+            source.copy_file(target)
+            if checksum is not None:
+                for chunk in source.iter_bytes(chunk_size):
+                    checksum.update(chunk)
+        else:
+            f = target.open_stream() if hasattr(target, "open_stream") else target.open("wb")
+            if file_codec is not None:
+                f = wrap(f, "wb", file_codec)
+            with f:
+                for chunk in source.iter_bytes(chunk_size):
+                    if checksum is not None:
+                        checksum.update(chunk)
+                    f.write(chunk)
+        result = TransferResult(str(source), str(target), source.stat().size)
+        if checksum is not None:
+            copied = Checksum(checksum.algorithm)
+            for chunk in _read_back(target, file_codec, chunk_size):
+                copied.update(chunk)
+            if copied.value() != checksum.value():
+                raise VerificationError(result.src, result.dest, checksum.value(), copied.value())
+        return result
+
+    if src.is_dir():
+        if compression == "infer":
+            raise ValueError("compression cannot be inferred when copying a directory")
+        prefix = str(src).rstrip("/" + os.sep) + "/"
+
+        def _copies():
+            for path in src.walk():
+                relative = str(path)[len(prefix) :].replace(os.sep, "/")
+                if matches_patterns(relative, include, exclude):
+                    yield path, dest.join(*(relative + extension).split("/")), codec
+
+        return _run_pipeline(_copies(), _copy, parallelism)
+    elif src.is_file():
+        if dest.is_dir():
+            target = dest.join(src.parts[-1] + extension)
+        else:
+            target = dest
+        if compression == "infer":
+            codec = resolve_compression(compression, str(target))
+        return [_copy((src, target, codec))]
+    else:
+        raise UnsupportedCopyOperation("src was not a directory or a file: {}".format(src))
+
+
+def _read_back(path: AbstractPath, compression: Optional[str], chunk_size: int) -> Iterator[bytes]:
+    """ Stream the contents of a copy, decompressed """
+    if compression is None:
+        yield from path.iter_bytes(chunk_size)
+        return
+    with wrap(path.open("rb"), "rb", compression) as f:
+        yield from iter(lambda: f.read(chunk_size), b"")
+
+
+class _DirectoryCache(object):
+    """ Creates each local directory at most once across worker threads """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._created: Set[str] = set()
+
+    def makedirs(self, path: str) -> None:
+        if path in self._created:
+            return
+        with self._lock:
+            if path in self._created:
+                return
+            if path:
+                os.makedirs(path, exist_ok=True)
+            self._created.add(path)
+
+
+_DONE = object()
+
+
+def _prefetch(iterable: Iterable[T], maxsize: int = 10000) -> Iterator[T]:
+    """Consume an iterable in a background thread, buffering up to maxsize items
+
+    Lets slow producers (e.g. paginated listings) run ahead of the consumer.
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def _put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+        except BaseException as e:
+            _put((_DONE, e))
+        else:
+            _put((_DONE, None))
+
+    producer = threading.Thread(target=_produce, name="pathman-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def _run_pipeline(
+    tasks: Iterable[T],
+    func: Callable[[T], R],
+    parallelism: Optional[int] = None,
+    executor: str = "thread",
+) -> List[R]:
+    """Apply func to every task on one bounded worker pool
+
+    At most `2 * parallelism` tasks are in flight at a time, so tasks are
+    pulled from the iterable only as fast as workers free up. Failures do not
+    stop the remaining tasks; they are collected and raised together.
+
+    Parameters
+    ----------
+    tasks: iterable
+        Arguments of func, one per call
+    func: callable
+        Work applied to each task. With a process pool, func and the tasks
+        must be picklable (e.g. a `functools.partial` of a module-level
+        function)
+    parallelism: int, optional
+        Number of workers. Defaults to `min(32, cpu_count + 4)` threads or
+        `cpu_count` processes
+    executor: str, optional
+        "thread" or "process". Processes sidestep the GIL for CPU-bound
+        work (checksums, compression, very many small objects); each one
+        lazily builds its own clients
+
+    Returns
+    -------
+    list: Results of func, in completion order
+
+    Raises
+    ------
+    CopyError
+        If func raised for any task
+    """
+    if executor == "thread":
+        max_workers = parallelism or min(32, (os.cpu_count() or 1) + 4)
+        pool: futures.Executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    elif executor == "process":
+        max_workers = parallelism or os.cpu_count() or 1
+        pool = futures.ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        raise ValueError("executor must be 'thread' or 'process', not {!r}".format(executor))
+    slots = threading.BoundedSemaphore(2 * max_workers)
+    lock = threading.Lock()
+    results: List[R] = []
+    errors: List[Tuple[T, BaseException]] = []
+
+    def _done(task: T, future: futures.Future) -> None:
+        try:
+            error = future.exception()
+            with lock:
+                if error is None:
+                    results.append(future.result())
+                else:
+                    errors.append((task, error))
+        finally:
+            slots.release()
+
+    with pool:
+        for task in tasks:
+            slots.acquire()
+            pool.submit(func, task).add_done_callback(functools.partial(_done, task))
+
+    if errors:
+        raise CopyError(
+            "{} of {} transfers failed".format(len(errors), len(errors) + len(results)),
+            errors,
+        )
+    return results
+
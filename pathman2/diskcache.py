@@ -0,0 +1,283 @@
+"""Persistent, node-local read-through cache for remote objects
+
+Objects are stored under a cache directory keyed by bucket, key and ETag, so
+a changed object is never served from the cache. The cache is safe to share
+between threads and processes: downloads go to a temporary file that is
+atomically renamed into place, and concurrent fetches of the same object
+wait for a single download through a per-entry file lock.
+
+The cache is opt-in::
+
+    from pathman2.diskcache import enable_disk_cache
+    enable_disk_cache("/mnt/scratch/pathman-cache", max_size=50 * 1024 ** 3)
+
+after which `S3Path.open` in read mode, `read_bytes`/`read_text` and
+`copy_s3_local` read through it.
+"""
+import os
+import errno
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - windows
+    fcntl = None  # type: ignore
+
+DEFAULT_MAX_SIZE = 10 * 1024 ** 3
+
+
+class DiskCache(object):
+    """Size-capped, LRU-evicted cache of remote objects in a local directory
+
+    Parameters
+    ----------
+    directory: str
+        Directory holding the cache. Created if missing
+    max_size: int, optional
+        Maximum total size in bytes of cached objects. The least recently
+        used objects are evicted once it is exceeded
+
+    Notes
+    -----
+        Recency is tracked with the modification time of the cached files,
+        which is bumped on every hit. The total size is tracked in memory
+        (it starts from a scan of the directory) and the directory is only
+        scanned again to evict once the total exceeds max_size, so objects
+        other processes add to a shared cache are only accounted for at the
+        next eviction. On platforms without `fcntl`, file locks are not
+        taken and only atomic renames protect the cache.
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_size = max_size
+        self._objects = os.path.join(self.directory, "objects")
+        self._locks = os.path.join(self.directory, "locks")
+        self._tmp = os.path.join(self.directory, "tmp")
+        for d in (self._objects, self._locks, self._tmp):
+            os.makedirs(d, exist_ok=True)
+        self._size_lock = threading.Lock()
+        self._tracked_size: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return "DiskCache({!r}, max_size={})".format(self.directory, self.max_size)
+
+    def __getstate__(self) -> dict:
+        # sent to copy worker processes, which track the size on their own
+        return {"directory": self.directory, "max_size": self.max_size}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["directory"], state["max_size"])
+
+    def _entry(self, bucket: str, key: str, etag: str) -> str:
+        digest = hashlib.sha256(
+            "\0".join((bucket, key, etag.strip('"'))).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self._objects, digest[:2], digest)
+
+    def get(self, bucket: str, key: str, etag: str) -> Optional[str]:
+        """Get the cached copy of an object, if any
+
+        Returns
+        -------
+        str or None: path of the cached file
+        """
+        filename = self._entry(bucket, key, etag)
+        try:
+            os.utime(filename)
+        except FileNotFoundError:
+            return None
+        return filename
+
+    def fetch(
+        self, bucket: str, key: str, etag: str, download: Callable[[str], None]
+    ) -> str:
+        """Get the cached copy of an object, downloading it on a miss
+
+        Parameters
+        ----------
+        bucket: str
+            Bucket of the object
+        key: str
+            Key of the object
+        etag: str
+            Current ETag of the object
+        download: callable
+            Called with a temporary filename to download the object to
+
+        Returns
+        -------
+        str: path of the cached file. It remains readable through any file
+        object opened on it, even if it is evicted afterwards
+        """
+        filename = self.get(bucket, key, etag)
+        if filename is not None:
+            return filename
+        filename = self._entry(bucket, key, etag)
+        shard, digest = filename.split(os.sep)[-2:]
+        with self._lock(os.path.join(shard, digest), remove=True):
+            # another thread or process may have finished the download meanwhile
+            if os.path.exists(filename):
+                os.utime(filename)
+                return filename
+            fd, tmp = tempfile.mkstemp(dir=self._tmp)
+            os.close(fd)
+            try:
+                download(tmp)
+                size = os.path.getsize(tmp)
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+                os.replace(tmp, filename)
+            except BaseException:
+                _remove(tmp)
+                raise
+        if self._track(size) > self.max_size:
+            self.evict()
+        return filename
+
+    def size(self) -> int:
+        """ Total size in bytes of the cached objects """
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self, max_size: Optional[int] = None) -> int:
+        """Remove least recently used objects until the cache fits max_size
+
+        Parameters
+        ----------
+        max_size: int, optional
+            Size to shrink to. Defaults to the cache's max_size
+
+        Returns
+        -------
+        int: number of bytes freed
+        """
+        max_size = self.max_size if max_size is None else max_size
+        with self._lock("evict"):
+            entries = []
+            total = 0
+            for entry in self._entries():
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+            freed = 0
+            if total > max_size:
+                entries.sort()
+                for _, size, path in entries:
+                    if total - freed <= max_size:
+                        break
+                    if _remove(path):
+                        freed += size
+            with self._size_lock:
+                self._tracked_size = total - freed
+            return freed
+
+    def clear(self) -> None:
+        """ Remove every cached object """
+        self.evict(max_size=0)
+
+    def _track(self, added: int) -> int:
+        """ Account for a new object, returning the tracked total size """
+        with self._size_lock:
+            if self._tracked_size is not None:
+                self._tracked_size += added
+                return self._tracked_size
+        # the scan already includes the new object
+        total = self.size()
+        with self._size_lock:
+            self._tracked_size = total
+        return total
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        for shard in os.scandir(self._objects):
+            if shard.is_dir():
+                yield from (e for e in os.scandir(shard.path) if e.is_file())
+
+    @contextmanager
+    def _lock(self, name: str, remove: bool = False):
+        """Exclusive lock shared by threads and processes using this directory
+
+        Parameters
+        ----------
+        name: str
+            Name of the lock file, relative to the lock directory
+        remove: bool, optional
+            Remove the lock file on release, so that per-entry locks do not
+            accumulate
+        """
+        if fcntl is None:
+            yield
+            return
+        path = os.path.join(self._locks, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        while True:
+            f = open(path, "a")
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    current = os.stat(path)
+                except FileNotFoundError:
+                    current = None
+                # the holder may have removed the file we waited on: lock the
+                # one now at path instead
+                if current is None or not os.path.samestat(current, os.fstat(f.fileno())):
+                    continue
+                try:
+                    yield
+                finally:
+                    if remove:
+                        _remove(path)
+                return
+            finally:
+                f.close()
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+        return False
+    return True
+
+
+_disk_cache: Optional[DiskCache] = None
+_disk_cache_lock = threading.Lock()
+
+
+def enable_disk_cache(directory: str, max_size: int = DEFAULT_MAX_SIZE) -> DiskCache:
+    """Turn on read-through caching of remote objects in a local directory
+
+    Parameters
+    ----------
+    directory: str
+        Directory holding the cache. Several processes may share it
+    max_size: int, optional
+        Maximum total size in bytes of cached objects
+
+    Returns
+    -------
+    DiskCache: the cache now in use
+    """
+    global _disk_cache
+    with _disk_cache_lock:
+        _disk_cache = DiskCache(directory, max_size=max_size)
+        return _disk_cache
+
+
+def disable_disk_cache() -> None:
+    """ Turn off read-through caching. Cached files are left on disk """
+    global _disk_cache
+    with _disk_cache_lock:
+        _disk_cache = None
+
+
+def get_disk_cache() -> Optional[DiskCache]:
+    """ Get the cache in use, or None if caching is disabled """
+    return _disk_cache
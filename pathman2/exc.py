@@ -9,5 +9,51 @@ class UnsupportedPathTypeException(PathmanException):
     """ Raised when a path type is not supported """
 
 
+class UnsupportedOperation(PathmanException):
+    """ Raised when an operation is not supported by a path's backend """
+
+
 class UnsupportedCopyOperation(PathmanException):
     """ Raised for an unsupported copy operation """
+
+
+class CopyError(PathmanException):
+    """Raised when one or more transfers of a multi-object copy fail
+
+    Attributes
+    ----------
+    errors: list of (item, exception) tuples
+        The item that failed (e.g. a key or path) and the error it raised
+    """
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = list(errors or [])
+
+
+class VerificationError(PathmanException):
+    """Raised when the checksum of a transferred file does not match its source
+
+    Attributes
+    ----------
+    src: str
+        Source of the transfer
+    dest: str
+        Destination of the transfer
+    expected: str
+        Checksum S3 reports for the object (the source's, for s3 -> s3 copies)
+    actual: str
+        Checksum of the data streamed through the transfer (the copy's, for
+        s3 -> s3 copies)
+    """
+
+    def __init__(self, src, dest, expected, actual):
+        super().__init__(
+            "checksum mismatch copying {} to {}: expected {}, got {}".format(
+                src, dest, expected, actual
+            )
+        )
+        self.src = src
+        self.dest = dest
+        self.expected = expected
+        self.actual = actual
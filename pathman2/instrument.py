@@ -0,0 +1,665 @@
+"""Opt-in instrumentation of backend operations
+
+While at least one callback is registered, the filesystem operations of
+`LocalPath`, `S3Path` and `MemoryPath` and the `pathman.copy` functions
+report an `OperationEvent` per call: its duration, the bytes it read or
+wrote, the S3 requests and retries it issued and the metadata cache hits it
+had::
+
+    from pathman.instrument import profile
+
+    with profile() as histogram:
+        run_job()
+    print(histogram.report())
+
+Instrumentation is installed by replacing the instrumented methods and
+functions when the first callback is added, and removed with the last one,
+so it costs nothing while disabled. Functions imported from
+`pathman.copy` before instrumentation was enabled are not instrumented;
+`pathman.copy.copy` always is.
+
+Notes
+-----
+    Only the outermost instrumented call of a thread is reported: e.g. the
+    `stat` behind an `is_file` is part of the `is_file` event. Work done in
+    other threads on the call's behalf (multipart transfers, copy
+    workers) is attributed to it, as requests and cache hits are counted
+    process-wide while it runs; calls that overlap in time share those
+    counts. Requests made by process-pool copy workers are not counted.
+"""
+import math
+import time
+import functools
+import weakref
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# methods of the path backends that touch the filesystem
+PATH_OPERATIONS = (
+    "exists",
+    "stat",
+    "touch",
+    "is_dir",
+    "is_file",
+    "mkdir",
+    "rmdir",
+    "open",
+    "write_bytes",
+    "write_text",
+    "read_bytes",
+    "read_text",
+    "read_range",
+    "iter_bytes",
+    "readinto",
+    "memoryview",
+    "remove",
+    "walk",
+    "ls",
+    "glob",
+    "iglob",
+)
+
+# methods that return lazy iterators: their events cover the whole iteration
+_ITERATOR_OPERATIONS = ("walk", "iglob", "iter_bytes")
+
+PATH_CLASSES = (
+    ("pathman._impl.local", "LocalPath"),
+    ("pathman._impl.s3", "S3Path"),
+    ("pathman._impl.memory", "MemoryPath"),
+)
+
+COPY_OPERATIONS = (
+    "sync",
+    "copy_local_s3",
+    "copy_s3_s3",
+    "copy_s3_local",
+    "copy_local_local",
+    "copy_generic",
+)
+
+
+class OperationEvent(NamedTuple):
+    """ Cost of a single instrumented call """
+
+    operation: str  # e.g. "S3Path.read_bytes" or "copy.copy_local_s3"
+    path: str  # path operated on, "<src> -> <dest>" for copies
+    duration: float  # seconds; for iterators, time spent producing items
+    bytes: int  # bytes read or written (characters for text operations)
+    requests: int  # S3 requests sent, including retries
+    retries: int  # S3 requests that were retries
+    cache_hits: int  # stat cache and disk cache hits
+    error: Optional[str]  # name of the exception raised, if any
+
+
+class _Tally(object):
+    """ Process-wide counters of S3 requests and cache hits """
+
+    __slots__ = ("lock", "requests", "operations", "cache_hits")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.operations = 0
+        self.cache_hits = 0
+
+    def add(self, field: str) -> None:
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> Tuple[int, int, int]:
+        return self.requests, self.operations, self.cache_hits
+
+
+_tally = _Tally()
+_local = threading.local()
+_callbacks: List[Callable[[OperationEvent], Any]] = []
+_lock = threading.Lock()
+_originals: List[Tuple[Any, str, Any]] = []  # (owner, attribute, value before install)
+# event emitters of the botocore clients counting requests, until uninstall
+_hooked_emitters: "weakref.WeakSet" = weakref.WeakSet()
+# id -> weak reference of the s3fs filesystems created by pathman
+_owned_filesystems: Dict[int, Any] = {}
+
+
+def add_callback(callback: Callable[[OperationEvent], Any]) -> None:
+    """Start reporting an event to callback after every instrumented call
+
+    Parameters
+    ----------
+    callback: callable
+        Called with an `OperationEvent`, from the thread that made the
+        call. It should be quick and must not raise
+    """
+    with _lock:
+        if not _callbacks:
+            _install()
+        _callbacks.append(callback)
+
+
+def remove_callback(callback: Callable[[OperationEvent], Any]) -> None:
+    """ Stop reporting events to callback. Raises ValueError if it was not added """
+    with _lock:
+        _callbacks.remove(callback)
+        if not _callbacks:
+            _uninstall()
+
+
+def is_enabled() -> bool:
+    """ Whether instrumentation is installed """
+    return bool(_callbacks)
+
+
+class OperationStats(NamedTuple):
+    """ Summary of the events of one operation """
+
+    operation: str
+    count: int
+    errors: int
+    total: float  # seconds
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    bytes: int
+    requests: int
+    retries: int
+    cache_hits: int
+
+
+class Histogram(object):
+    """Callback aggregating events into a per-operation latency histogram
+
+    Durations are counted in logarithmic buckets (4 per doubling), so
+    memory stays constant and percentiles are accurate to about 10%.
+    """
+
+    _BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._operations: Dict[str, dict] = {}
+
+    def __call__(self, event: OperationEvent) -> None:
+        bucket = self._bucket(event.duration)
+        with self._lock:
+            stats = self._operations.get(event.operation)
+            if stats is None:
+                stats = self._operations[event.operation] = {
+                    "buckets": {},
+                    "count": 0,
+                    "errors": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "bytes": 0,
+                    "requests": 0,
+                    "retries": 0,
+                    "cache_hits": 0,
+                }
+            stats["buckets"][bucket] = stats["buckets"].get(bucket, 0) + 1
+            stats["count"] += 1
+            stats["errors"] += event.error is not None
+            stats["total"] += event.duration
+            stats["max"] = max(stats["max"], event.duration)
+            stats["bytes"] += event.bytes
+            stats["requests"] += event.requests
+            stats["retries"] += event.retries
+            stats["cache_hits"] += event.cache_hits
+
+    def _bucket(self, duration: float) -> int:
+        if duration <= 0:
+            return -(2 ** 31)
+        return math.floor(math.log2(duration) * self._BUCKETS_PER_DOUBLING)
+
+    def _percentile(self, buckets: Dict[int, int], count: int, fraction: float) -> float:
+        rank = fraction * count
+        seen = 0
+        for bucket in sorted(buckets):
+            seen += buckets[bucket]
+            if seen >= rank:
+                # geometric middle of the bucket
+                return 2 ** ((bucket + 0.5) / self._BUCKETS_PER_DOUBLING)
+        return 0.0
+
+    def summary(self) -> List[OperationStats]:
+        """ Statistics of every operation seen, by decreasing total time """
+        with self._lock:
+            operations = {
+                k: dict(v, buckets=dict(v["buckets"])) for k, v in self._operations.items()
+            }
+        summary = []
+        for operation, stats in operations.items():
+            buckets, count = stats["buckets"], stats["count"]
+            summary.append(
+                OperationStats(
+                    operation=operation,
+                    count=count,
+                    errors=stats["errors"],
+                    total=stats["total"],
+                    mean=stats["total"] / count,
+                    p50=min(self._percentile(buckets, count, 0.5), stats["max"]),
+                    p90=min(self._percentile(buckets, count, 0.9), stats["max"]),
+                    p99=min(self._percentile(buckets, count, 0.99), stats["max"]),
+                    max=stats["max"],
+                    bytes=stats["bytes"],
+                    requests=stats["requests"],
+                    retries=stats["retries"],
+                    cache_hits=stats["cache_hits"],
+                )
+            )
+        summary.sort(key=lambda s: s.total, reverse=True)
+        return summary
+
+    def report(self) -> str:
+        """ Summary formatted as a table, times in milliseconds """
+        lines = [
+            "{:<28} {:>8} {:>6} {:>10} {:>8} {:>8} {:>8} {:>12} {:>8} {:>7} {:>8}".format(
+                "operation", "count", "errors", "total ms", "p50", "p90", "p99",
+                "bytes", "requests", "retries", "hits",
+            )
+        ]
+        for s in self.summary():
+            lines.append(
+                "{:<28} {:>8} {:>6} {:>10.1f} {:>8.2f} {:>8.2f} {:>8.2f} {:>12} {:>8} {:>7} {:>8}"
+                .format(
+                    s.operation, s.count, s.errors, s.total * 1000, s.p50 * 1000, s.p90 * 1000,
+                    s.p99 * 1000, s.bytes, s.requests, s.retries, s.cache_hits,
+                )
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """ Forget every event seen """
+        with self._lock:
+            self._operations = {}
+
+
+@contextmanager
+def profile() -> Iterator[Histogram]:
+    """Aggregate the events of a block of code
+
+    Returns
+    -------
+    Histogram: filled with the events reported while the block ran
+    """
+    histogram = Histogram()
+    add_callback(histogram)
+    try:
+        yield histogram
+    finally:
+        remove_callback(histogram)
+
+
+def _emit(event: OperationEvent) -> None:
+    # operations done by callbacks are not reported
+    _local.depth = getattr(_local, "depth", 0) + 1
+    try:
+        for callback in list(_callbacks):
+            callback(event)
+    finally:
+        _local.depth -= 1
+
+
+def _event(
+    operation: str,
+    path: str,
+    duration: float,
+    nbytes: int,
+    before: Tuple[int, int, int],
+    error: Optional[BaseException],
+) -> OperationEvent:
+    requests, operations, cache_hits = _tally.snapshot()
+    requests -= before[0]
+    operations -= before[1]
+    return OperationEvent(
+        operation=operation,
+        path=path,
+        duration=duration,
+        bytes=nbytes,
+        requests=requests,
+        retries=max(requests - operations, 0),
+        cache_hits=cache_hits - before[2],
+        error=None if error is None else type(error).__name__,
+    )
+
+
+def _instrument(
+    operation: str,
+    func: Callable,
+    describe: Callable[..., str],
+    count_bytes: Optional[Callable[[tuple, dict, Any], int]] = None,
+) -> Callable:
+    """Wrap a function to report an event per outermost call
+
+    Parameters
+    ----------
+    describe: callable
+        Called with the call's arguments to get the event's path
+    count_bytes: callable, optional
+        Called with (args, kwargs, result) to get the event's bytes
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_local, "depth", 0)
+        if depth:
+            return func(*args, **kwargs)
+        before = _tally.snapshot()
+        _local.depth = 1
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            duration = time.perf_counter() - start
+            _local.depth = 0
+            _emit(_event(operation, describe(*args, **kwargs), duration, 0, before, e))
+            raise
+        duration = time.perf_counter() - start
+        _local.depth = 0
+        nbytes = 0 if count_bytes is None else count_bytes(args, kwargs, result)
+        _emit(_event(operation, describe(*args, **kwargs), duration, nbytes, before, None))
+        return result
+
+    return wrapper
+
+
+def _instrument_iterator(operation: str, method: Callable, count_bytes: bool) -> Callable:
+    """ Wrap a method returning an iterator to report an event once it is exhausted """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(_local, "depth", 0):
+            return method(self, *args, **kwargs)
+        return _InstrumentedIterator(operation, str(self), method, self, args, kwargs, count_bytes)
+
+    return wrapper
+
+
+class _InstrumentedIterator(object):
+    """Iterator measuring only the time and requests spent producing items
+
+    The event is reported when the iterator is exhausted, fails or is closed
+    """
+
+    def __init__(self, operation, path, method, owner, args, kwargs, count_bytes) -> None:
+        self._operation = operation
+        self._path = path
+        self._count_bytes = count_bytes
+        self._duration = 0.0
+        self._bytes = 0
+        self._counts = [0, 0, 0]
+        self._done = False
+        self._iterator = self._step(method, owner, *args, **kwargs)
+
+    def __iter__(self) -> "_InstrumentedIterator":
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        try:
+            item = self._step(next, self._iterator)
+        except StopIteration:
+            self._finish(None)
+            raise
+        except BaseException as e:
+            self._finish(e)
+            raise
+        if self._count_bytes:
+            self._bytes += len(item)
+        return item
+
+    def close(self) -> None:
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+        self._finish(None)
+
+    def __del__(self) -> None:
+        if not self._done and _callbacks:
+            self._finish(None)
+
+    def _step(self, func: Callable, *args, **kwargs):
+        before = _tally.snapshot()
+        _local.depth = getattr(_local, "depth", 0) + 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._duration += time.perf_counter() - start
+            _local.depth -= 1
+            after = _tally.snapshot()
+            for i in range(3):
+                self._counts[i] += after[i] - before[i]
+
+    def _finish(self, error: Optional[BaseException]) -> None:
+        if self._done:
+            return
+        self._done = True
+        requests, operations, cache_hits = self._counts
+        _emit(
+            OperationEvent(
+                operation=self._operation,
+                path=self._path,
+                duration=self._duration,
+                bytes=self._bytes,
+                requests=requests,
+                retries=max(requests - operations, 0),
+                cache_hits=cache_hits,
+                error=None if error is None else type(error).__name__,
+            )
+        )
+
+
+def _describe_path(self, *args, **kwargs) -> str:
+    return str(self)
+
+
+def _describe_copy(src, dest, *args, **kwargs) -> str:
+    return "{} -> {}".format(src, dest)
+
+
+def _result_length(args: tuple, kwargs: dict, result) -> int:
+    return len(result)
+
+
+def _contents_length(args: tuple, kwargs: dict, result) -> int:
+    contents = args[1] if len(args) > 1 else kwargs.get("contents", b"")
+    if isinstance(contents, str):
+        return len(contents)
+    return memoryview(contents).nbytes
+
+
+def _transferred(args: tuple, kwargs: dict, result) -> int:
+    return sum(getattr(r, "size", 0) for r in result or ())
+
+
+_BYTE_COUNTS: Dict[str, Callable[[tuple, dict, Any], int]] = {
+    "read_bytes": _result_length,
+    "read_text": _result_length,
+    "read_range": _result_length,
+    "readinto": lambda args, kwargs, result: result,
+    "memoryview": lambda args, kwargs, result: result.nbytes,
+    "write_bytes": _contents_length,
+    "write_text": _contents_length,
+}
+
+
+def _patch(owner: Any, attribute: str, value: Any) -> None:
+    """ Replace an attribute, remembering how to restore it """
+    _originals.append((owner, attribute, owner.__dict__.get(attribute)))
+    setattr(owner, attribute, value)
+
+
+def _install() -> None:
+    for module, name in PATH_CLASSES:
+        cls = getattr(importlib.import_module(module), name)
+        for operation in PATH_OPERATIONS:
+            method = getattr(cls, operation)
+            label = "{}.{}".format(name, operation)
+            if operation in _ITERATOR_OPERATIONS:
+                wrapper = _instrument_iterator(label, method, operation == "iter_bytes")
+            else:
+                wrapper = _instrument(label, method, _describe_path, _BYTE_COUNTS.get(operation))
+            _patch(cls, operation, wrapper)
+
+    copy = importlib.import_module("pathman.copy")
+    for operation in COPY_OPERATIONS:
+        label = "copy." + operation
+        wrapper = _instrument(label, getattr(copy, operation), _describe_copy, _transferred)
+        _patch(copy, operation, wrapper)
+
+    # cache hits
+    s3 = importlib.import_module("pathman._impl.s3")
+    _patch(s3, "_cached_stat", _counting_cached_stat(s3._cached_stat, s3._MISSING))
+    diskcache = importlib.import_module("pathman.diskcache")
+    _patch(diskcache.DiskCache, "get", _counting_disk_cache_get(diskcache.DiskCache.get))
+
+    _install_request_hooks()
+
+
+def _uninstall() -> None:
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        if original is None:
+            delattr(owner, attribute)
+        else:
+            setattr(owner, attribute, original)
+    _remove_request_hooks()
+
+
+def _counting_cached_stat(cached_stat: Callable, missing: Any) -> Callable:
+    @functools.wraps(cached_stat)
+    def wrapper(cache, path):
+        try:
+            result = cached_stat(cache, path)
+        except FileNotFoundError:
+            # cached as missing
+            _tally.add("cache_hits")
+            raise
+        if result is not missing:
+            _tally.add("cache_hits")
+        return result
+
+    return wrapper
+
+
+def _counting_disk_cache_get(get: Callable) -> Callable:
+    @functools.wraps(get)
+    def wrapper(self, bucket, key, etag):
+        filename = get(self, bucket, key, etag)
+        if filename is not None:
+            _tally.add("cache_hits")
+        return filename
+
+    return wrapper
+
+
+def _on_request_created(**kwargs) -> None:
+    if _callbacks:
+        _tally.add("operations")
+
+
+def _on_send(**kwargs) -> None:
+    # sent once per attempt; must return None for the request to be sent
+    if _callbacks:
+        _tally.add("requests")
+
+
+_REQUEST_HOOKS = (("request-created.s3", _on_request_created), ("before-send.s3", _on_send))
+
+
+def _install_request_hooks() -> None:
+    """Count the S3 requests of pathman's botocore clients
+
+    Hooks are registered on the clients and filesystems of the session
+    registries (see `pathman._impl.session`), including the ones created,
+    or recreated by s3fs, while instrumentation is enabled. Other botocore
+    clients are left alone, and `_uninstall` unregisters every hook.
+    """
+    try:
+        importlib.import_module("botocore")
+    except ImportError:
+        return
+    session = importlib.import_module("pathman._impl.session")
+    for client in session.clients.values():
+        _hook(client)
+    for fs in session.filesystems.values():
+        _own(fs)
+    for per_loop in list(session._async_filesystems.values()):
+        for pending in list(per_loop.values()):
+            if pending.done() and not pending.cancelled() and pending.exception() is None:
+                _own(pending.result())
+
+    _patch(session.clients, "_factory", _calling(session.clients._factory, _hook))
+    _patch(session.filesystems, "_factory", _calling(session.filesystems._factory, _own))
+    create_async = session._create_async_filesystem
+
+    @functools.wraps(create_async)
+    async def _create_async_filesystem(**kwargs):
+        fs = await create_async(**kwargs)
+        _own(fs)
+        return fs
+
+    _patch(session, "_create_async_filesystem", _create_async_filesystem)
+    try:
+        s3fs = importlib.import_module("s3fs")
+    except ImportError:
+        return
+    set_session = s3fs.S3FileSystem.set_session
+
+    @functools.wraps(set_session)
+    async def _set_session(self, *args, **kwargs):
+        # s3fs replaces its client when the previous one was closed
+        client = await set_session(self, *args, **kwargs)
+        owned = _owned_filesystems.get(id(self))
+        if owned is not None and owned() is self:
+            _hook(client)
+        return client
+
+    _patch(s3fs.S3FileSystem, "set_session", _set_session)
+
+
+def _calling(factory: Callable, callback: Callable[[Any], None]) -> Callable:
+    """ Wrap a session factory to call callback with every object it creates """
+
+    @functools.wraps(factory)
+    def wrapper(**kwargs):
+        created = factory(**kwargs)
+        callback(created)
+        return created
+
+    return wrapper
+
+
+def _own(fs) -> None:
+    """ Count the requests of a filesystem created by pathman """
+    key = id(fs)
+
+    def _forget(ref):
+        if _owned_filesystems.get(key) is ref:
+            del _owned_filesystems[key]
+
+    _owned_filesystems[key] = weakref.ref(fs, _forget)
+    client = getattr(fs, "_s3", None)
+    if client is not None:
+        _hook(client)
+
+
+def _hook(client) -> None:
+    events = client.meta.events
+    if events in _hooked_emitters:
+        return
+    for event_name, handler in _REQUEST_HOOKS:
+        events.register(event_name, handler)
+    _hooked_emitters.add(events)
+
+
+def _remove_request_hooks() -> None:
+    for events in list(_hooked_emitters):
+        for event_name, handler in _REQUEST_HOOKS:
+            events.unregister(event_name, handler)
+    _hooked_emitters.clear()
+    _owned_filesystems.clear()
@@ -0,0 +1,134 @@
+"""Transfer journals, used to resume interrupted copies
+
+A journal is an append-only file of JSON lines, one per finished piece of
+work:
+
+- ``{"op": "upload", "src", "dest", "size", "mtime", "part_size", "upload_id"}``
+  when a multipart upload is started,
+- ``{"op": "part", "src", "dest", "part", ...}`` when a part of a multipart
+  upload or of a ranged download is finished,
+- ``{"op": "done", "src", "dest", ...}`` when a whole file or object is.
+
+Entries are written with a single `write` on a file opened in append mode,
+so threads and worker processes can share a journal. A line cut short by
+an interruption is ignored when the journal is read back, and is ended
+before anything is appended after it.
+"""
+import os
+import json
+import threading
+from typing import Dict, List, NamedTuple, Tuple
+
+Transfer = Tuple[str, str]  # (src, dest)
+
+
+class JournalState(NamedTuple):
+    """ Contents of a journal, indexed by transfer """
+
+    completed: Dict[Transfer, dict]  # last "done" entry
+    uploads: Dict[Transfer, dict]  # last "upload" entry
+    parts: Dict[Transfer, List[dict]]  # every "part" entry
+
+    def is_done(self, src: str, dest: str, **attributes) -> bool:
+        """ Whether a transfer finished, with the source in the given state """
+        entry = self.completed.get((src, dest))
+        return entry is not None and all(entry.get(k) == v for k, v in attributes.items())
+
+
+class TransferJournal(object):
+    """Append-only record of finished transfer work
+
+    Parameters
+    ----------
+    path: str
+        File holding the journal. Created on the first record
+
+    Notes
+    -----
+        Journals pickle as their path, so they can be handed to worker
+        processes; each process opens the file on its first record.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return "TransferJournal({!r})".format(self.path)
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+
+    def record(self, op: str, src: str, dest: str, **attributes) -> None:
+        """ Append an entry """
+        line = json.dumps(dict(attributes, op=op, src=src, dest=dest), sort_keys=True) + "\n"
+        os.write(self._descriptor(), line.encode("utf-8"))
+
+    def load(self) -> JournalState:
+        """ Read the journal back. A missing journal is empty """
+        state = JournalState({}, {}, {})
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return state
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # cut short by an interruption
+                    continue
+                transfer = (entry["src"], entry["dest"])
+                if entry["op"] == "done":
+                    state.completed[transfer] = entry
+                elif entry["op"] == "upload":
+                    state.uploads[transfer] = entry
+                elif entry["op"] == "part":
+                    state.parts.setdefault(transfer, []).append(entry)
+        return state
+
+    def remove(self) -> None:
+        """ Delete the journal, e.g. once every transfer finished """
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None and self._pid == os.getpid():
+                os.close(self._fd)
+            self._fd = None
+
+    def _descriptor(self) -> int:
+        if self._fd is None or self._pid != os.getpid():
+            with self._lock:
+                if self._fd is None or self._pid != os.getpid():
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+                    _end_last_line(fd)
+                    self._fd = fd
+                    self._pid = os.getpid()
+        return self._fd  # type: ignore
+
+
+def _end_last_line(fd: int) -> None:
+    """Terminate a last line cut short by an interruption
+
+    Otherwise the next entry would be appended to it, and both would be
+    unreadable
+    """
+    size = os.lseek(fd, 0, os.SEEK_END)
+    if size == 0:
+        return
+    os.lseek(fd, size - 1, os.SEEK_SET)
+    if os.read(fd, 1) != b"\n":
+        os.write(fd, b"\n")
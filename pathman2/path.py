@@ -1,17 +1,34 @@
 """ Module for abstracting over local/remote file paths """
 import os
-from typing import List, Union, Generator
+import mmap
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Union, Generator
 
-from pathman.exc import UnsupportedPathTypeException
-from pathman.base import AbstractPath
+from pathman.backends import BackendMap, location_for, resolve_location
+from pathman.compression import open_compressed, resolve_compression, wrap
+from pathman.exc import UnsupportedOperation, UnsupportedPathTypeException
+from pathman.base import AbstractPath, StatResult
 from pathman.utils import is_file
-from pathman._impl import S3Path, LocalPath
 
+if TYPE_CHECKING:  # pragma: no cover - backends are imported on first use
+    from pathman._impl import S3Path, LocalPath
 
-class Path(AbstractPath, os.PathLike):
-    """ Represents a generic path object """
 
-    location_class_map = {"local": LocalPath, "s3": S3Path}
+class Path(AbstractPath):
+    """Represents a generic path object
+
+    Notes
+    -----
+        `Path` does not inherit from `os.PathLike` so that it can use
+        `__slots__`; `isinstance(path, os.PathLike)` still holds since it
+        implements `__fspath__`.
+
+        Backends are looked up in `pathman.backends` and only imported when
+        a path of their location is first built.
+    """
+
+    __slots__ = ("_original_kwargs", "_pathstr", "_location", "_impl")
+
+    location_class_map = BackendMap("sync")
 
     def __init__(self, path: str, **kwargs) -> None:
         """Constructor for a new Path
@@ -21,19 +38,53 @@ class Path(AbstractPath, os.PathLike):
         path: str or path-like object
            A path string
         """
-        path = str(path)
+        if isinstance(path, Path) and not kwargs:
+            self._adopt(path._impl, path._location, path._original_kwargs)
+            return
+        location, path = resolve_location(str(path))
         self._original_kwargs = dict({}, **kwargs)
         self._pathstr: str = path
-        self._isfile: bool = is_file(path)
-        self._location: str = determine_output_location(path)
+        self._location: str = location
         if self._location not in self.location_class_map:
             raise UnsupportedPathTypeException("inferred location is not supported")
-        self._impl: Union[AbstractPath, LocalPath, S3Path] = self.location_class_map[
+        self._impl: Union[AbstractPath, "LocalPath", "S3Path"] = self.location_class_map[
             self._location
         ](  # type: ignore
             path, **kwargs
         )
 
+    @classmethod
+    def _from_impl(cls, impl, location: str, original_kwargs: dict) -> "Path":
+        """Build a Path around an existing backend object without re-parsing
+
+        Parameters
+        ----------
+        impl: AbstractPath
+            Backend object to wrap
+        location: str
+            Location key of the backend in `location_class_map`
+        original_kwargs: dict
+            Keyword arguments the backend was built with. The dict is shared,
+            not copied, and must not be mutated
+        """
+        self = cls.__new__(cls)
+        self._adopt(impl, location, original_kwargs)
+        return self
+
+    def _adopt(self, impl, location: str, original_kwargs: dict) -> None:
+        self._original_kwargs = original_kwargs
+        self._pathstr = impl._pathstr
+        self._location = location
+        self._impl = impl
+
+    def _wrap(self, impl) -> "Path":
+        """ Wrap a backend object derived from this path """
+        return Path._from_impl(impl, self._location, self._original_kwargs)
+
+    @property
+    def _isfile(self) -> bool:
+        return is_file(self._pathstr)
+
     def __fspath__(self) -> str:
         return self._pathstr
 
@@ -47,29 +98,53 @@ class Path(AbstractPath, os.PathLike):
         return self._pathstr == other._pathstr
 
     def __truediv__(self, key) -> "Path":
-        return Path(self._impl.__truediv__(key)._pathstr, **self._original_kwargs)
+        return self._wrap(self._impl.__truediv__(key))
 
     @property
     def extension(self) -> str:
         """ Get the extension if the path is a file """
         return self._impl.extension
 
-    def exists(self) -> bool:
-        """ Checks if the path exists """
-        return self._impl.exists()
+    def exists(self, refresh: bool = False) -> bool:
+        """Checks if the path exists
+
+        Parameters
+        ----------
+        refresh: bool, optional
+            If True, skip cached metadata (see `pathman._impl.cache`)
+        """
+        return self._impl.exists(refresh)
+
+    def stat(self, refresh: bool = False) -> StatResult:
+        """Get size, modification time, ETag (remote only) and type of the path
+
+        Remote metadata, including "does not exist", is cached for a short
+        time; pass refresh=True after changes made outside this process.
+
+        Parameters
+        ----------
+        refresh: bool, optional
+            If True, skip cached metadata (see `pathman._impl.cache`)
+
+        Raises
+        ------
+        FileNotFoundError
+            If nothing exists at the path
+        """
+        return self._impl.stat(refresh)
 
     def touch(self) -> None:
         """ Create a file at the current path """
         self._impl.touch()
         return
 
-    def is_dir(self) -> bool:
-        """ Checks if the path is a directory """
-        return self._impl.is_dir()
+    def is_dir(self, refresh: bool = False) -> bool:
+        """ Checks if the path is a directory. refresh skips cached metadata """
+        return self._impl.is_dir(refresh)
 
-    def is_file(self) -> bool:
-        """ Checks if the path is a file """
-        return self._impl.is_file()
+    def is_file(self, refresh: bool = False) -> bool:
+        """ Checks if the path is a file. refresh skips cached metadata """
+        return self._impl.is_file(refresh)
 
     def mkdir(self, **kwargs) -> None:
         """ Make a new directory """
@@ -91,7 +166,7 @@ class Path(AbstractPath, os.PathLike):
 
     def join(self, *pathsegments) -> "Path":
         """ Combine the current path with the given segments """
-        return Path(self._impl.join(*pathsegments)._pathstr, **self._original_kwargs)
+        return self._wrap(self._impl.join(*pathsegments))
 
     def basename(self) -> str:
         """Return the base name of the current path
@@ -105,58 +180,210 @@ class Path(AbstractPath, os.PathLike):
         # s3 and local files work as expected
         return os.path.basename(self._pathstr)
 
-    def open(self, mode: str = "r", **kwargs):
+    def open(self, mode: str = "r", compression: Optional[str] = None, **kwargs):
         """Open a file similar to built-in open() function
 
         Parameters
         ----------
         mode: str, optional
             Mode to use when opening the file
+        compression: str, optional
+            "gzip", "zstd" or "lz4" to compress what is written and
+            decompress what is read, as a stream, or "infer" to use the
+            compression given by the path's extension, if any
 
         Returns
         -------
         file object
 
         """
-        return self._impl.open(mode=mode, **kwargs)
+        codec = self._compression(compression)
+        if codec is None:
+            return self._impl.open(mode=mode, **kwargs)
+        text_kwargs = {k: kwargs.pop(k) for k in ("encoding", "errors", "newline") if k in kwargs}
+        return open_compressed(
+            lambda binary_mode: self._impl.open(mode=binary_mode, **kwargs),
+            mode,
+            codec,
+            **text_kwargs
+        )
 
-    def write_bytes(self, contents, **kwargs) -> int:
+    def write_bytes(self, contents, compression: Optional[str] = None, **kwargs) -> int:
         """Open file, write bytes, and close the file
 
         Parameters
         ----------
         contents: bytes
             Content to write to the file
+        compression: str, optional
+            As for `open`
 
         Returns
         -------
-        int: number of bytes written
+        int: number of bytes written, before compression
 
         """
-        return self._impl.write_bytes(contents, **kwargs)
+        if self._compression(compression) is None:
+            return self._impl.write_bytes(contents, **kwargs)
+        with self.open("wb", compression=compression, **kwargs) as f:
+            return f.write(contents)
 
-    def write_text(self, contents, **kwargs) -> int:
+    def write_text(self, contents, compression: Optional[str] = None, **kwargs) -> int:
         """Open file, write text, and close file
 
         Parameters
         ----------
         contents: str
             Content to write to the file
+        compression: str, optional
+            As for `open`
 
         Returns
         -------
         int: number of characters written
 
         """
-        return self._impl.write_text(contents, **kwargs)
+        if self._compression(compression) is None:
+            return self._impl.write_text(contents, **kwargs)
+        with self.open("w", compression=compression, **kwargs) as f:
+            return f.write(contents)
 
-    def read_bytes(self, **kwargs) -> bytes:
-        """ Open file, read bytes, and close file """
-        return self._impl.read_bytes(**kwargs)
+    def write_stream(
+        self, chunks: Iterable[bytes], compression: Optional[str] = None, **kwargs
+    ) -> int:
+        """Write a file from an iterable of byte chunks, never holding it whole in memory
 
-    def read_text(self, **kwargs) -> str:
-        """ Open file, read text, and close file """
-        return self._impl.read_text(**kwargs)
+        Parameters
+        ----------
+        chunks: iterable of bytes-like objects
+            Contents of the file, in order
+        compression: str, optional
+            As for `open`
+        kwargs:
+            s3 only: `part_size`, `max_in_flight` and `put_object` arguments
+            (see `open_stream`)
+
+        Returns
+        -------
+        int: number of bytes written, before compression
+        """
+        if self._compression(compression) is None and hasattr(self._impl, "write_stream"):
+            return self._impl.write_stream(chunks, **kwargs)
+        written = 0
+        with self.open_stream(compression=compression, **kwargs) as f:
+            for chunk in chunks:
+                written += f.write(chunk)
+        return written
+
+    def open_stream(self, compression: Optional[str] = None, **kwargs):
+        """Open a file for sequential writing of arbitrarily large contents
+
+        s3 objects are uploaded in parts from background threads as the
+        buffer fills, with at most `max_in_flight` parts (4 by default) of
+        `part_size` bytes (8 MiB by default) in memory at once. The object
+        is only created once the file is closed, and nothing is created if
+        the `with` block the file is used in raises. Other backends return
+        `open("wb")`, ignoring kwargs.
+
+        Parameters
+        ----------
+        compression: str, optional
+            As for `open`: data is compressed as it is written
+
+        Returns
+        -------
+        file object
+        """
+        if hasattr(self._impl, "open_stream"):
+            f = self._impl.open_stream(**kwargs)
+        else:
+            f = self._impl.open("wb")
+        codec = self._compression(compression)
+        if codec is None:
+            return f
+        return wrap(f, "wb", codec)
+
+    def read_bytes(self, compression: Optional[str] = None, **kwargs) -> bytes:
+        """ Open file, read bytes (decompressed as for `open`), and close file """
+        if self._compression(compression) is None:
+            return self._impl.read_bytes(**kwargs)
+        with self.open("rb", compression=compression, **kwargs) as f:
+            return f.read()
+
+    def read_text(self, compression: Optional[str] = None, **kwargs) -> str:
+        """ Open file, read text (decompressed as for `open`), and close file """
+        if self._compression(compression) is None:
+            return self._impl.read_text(**kwargs)
+        with self.open("r", compression=compression, **kwargs) as f:
+            return f.read()
+
+    def _compression(self, compression: Optional[str]) -> Optional[str]:
+        return resolve_compression(compression, self._pathstr)
+
+    def read_range(self, offset: int, length: Optional[int] = None) -> bytes:
+        """Read part of a file without loading the rest
+
+        Parameters
+        ----------
+        offset: int
+            Position of the first byte to read. Negative values count from
+            the end of the file. As with slicing, offsets before the start
+            of the file read from its start, and offsets past its end read
+            nothing
+        length: int, optional
+            Maximum number of bytes to read. If None, read to the end
+
+        Returns
+        -------
+        bytes
+        """
+        return self._impl.read_range(offset, length)
+
+    def iter_bytes(self, chunk_size: int = 8 * 1024 ** 2) -> Iterator[bytes]:
+        """Stream the file in chunks of at most chunk_size bytes
+
+        Only one chunk is held in memory at a time
+        """
+        return self._impl.iter_bytes(chunk_size)
+
+    def readinto(self, buffer, offset: int = 0) -> int:
+        """Read bytes of the file into a pre-allocated, writable buffer
+
+        Parameters
+        ----------
+        buffer: bytearray, memoryview, numpy array or other writable buffer
+            Destination. Up to its size in bytes are read
+        offset: int, optional
+            Position in the file of the first byte to read
+
+        Returns
+        -------
+        int: number of bytes read, less than the buffer size at end of file
+        """
+        return self._impl.readinto(buffer, offset)
+
+    def memoryview(self) -> memoryview:
+        """Get the contents of the file as a read-only memoryview
+
+        Local files are memory-mapped, so no copy is made and pages are only
+        read when accessed. Remote files are downloaded into one buffer.
+        Release the view (or use it as a context manager) when done.
+        """
+        return self._impl.memoryview()
+
+    def mmap(self) -> mmap.mmap:
+        """Memory-map a local file read-only
+
+        Raises
+        ------
+        UnsupportedOperation
+            If the path is not local
+        """
+        if not hasattr(self._impl, "mmap"):
+            raise UnsupportedOperation(
+                "mmap is only supported for local paths, not {}".format(self._location)
+            )
+        return self._impl.mmap()
 
     def remove(self) -> None:
         """
@@ -168,7 +395,7 @@ class Path(AbstractPath, os.PathLike):
 
     def expanduser(self) -> "Path":
         """ Return a new path with ~ expanded """
-        return Path(self._impl.expanduser()._pathstr, **self._original_kwargs)
+        return self._wrap(self._impl.expanduser())
 
     def dirname(self) -> "Path":
         """Return the directory name of the current path. Mimics the behavior
@@ -178,30 +405,53 @@ class Path(AbstractPath, os.PathLike):
 
     def abspath(self) -> "Path":
         """ Make the current path absolute """
-        return Path(self._impl.abspath()._pathstr, **self._original_kwargs)
+        return self._wrap(self._impl.abspath())
 
     def walk(self, **kwargs) -> Generator["Path", None, None]:
-        """Get a list of files below the current path
+        """Lazily yield the files below the current path
+
+        Parameters
+        ----------
+        include: str or list of str, optional
+            Only yield files whose path relative to this one matches a pattern
+        exclude: str or list of str, optional
+            Skip files, and do not descend into directories, whose relative
+            path matches a pattern
+        max_depth: int, optional
+            Maximum depth of yielded files; 1 only yields direct children
+        prune: callable, optional
+            Called with each directory as a `Path`; if it returns True the
+            directory is not descended into
 
         Note
         ----
-        This does not mirror the behavior of `os.walk`. A list of absolute
-        paths are returned
+        This does not mirror the behavior of `os.walk`: only files are
+        yielded. Their type and size are cached from the listing, so
+        `is_file`/`stat` on them are cheap.
         """
-        return (
-            Path(p._pathstr, **self._original_kwargs) for p in self._impl.walk(**kwargs)
-        )
+        prune = kwargs.get("prune")
+        if prune is not None:
+            kwargs["prune"] = lambda impl: prune(self._wrap(impl))
+        wrap = self._wrap
+        return (wrap(p) for p in self._impl.walk(**kwargs))
 
     def ls(self) -> List["Path"]:
-        return [Path(p._pathstr, **self._original_kwargs) for p in self._impl.ls()]
+        return [self._wrap(p) for p in self._impl.ls()]
 
     def glob(self, path) -> List["Path"]:
-        return [
-            Path(p._pathstr, **self._original_kwargs) for p in self._impl.glob(path)
-        ]
+        return list(self.iglob(path))
+
+    def iglob(self, path) -> Generator["Path", None, None]:
+        """Lazily yield the paths matching a glob pattern relative to this path
+
+        Results are streamed as they are found instead of collected in a list.
+        On s3 only the prefixes that can match the pattern are listed.
+        """
+        wrap = self._wrap
+        return (wrap(p) for p in self._impl.iglob(path))
 
     def with_suffix(self, suffix) -> "Path":
-        return Path(self._impl.with_suffix(suffix)._pathstr, **self._original_kwargs)
+        return self._wrap(self._impl.with_suffix(suffix))
 
     @property
     def stem(self) -> str:
@@ -227,11 +477,8 @@ def determine_output_location(abspath: str) -> str:
 
     Notes
     -----
-    Possible output locations include:
-        - s3
-        - blackfynn
-        - local
+    The location is the backend registered for the path's "<scheme>://"
+    prefix (see `pathman.backends.register_backend`), e.g. "s3" for
+    "s3://bucket/key". Paths without a registered scheme are local.
     """
-    if abspath.startswith("s3"):
-        return "s3"
-    return "local"
+    return location_for(abspath)
@@ -1,4 +1,8 @@
 import os
+import fnmatch
+from typing import Iterable, Optional, Union
+
+Patterns = Optional[Union[str, Iterable[str]]]
 
 
 def is_file(abspath: str) -> bool:
@@ -18,3 +22,30 @@ def is_file(abspath: str) -> bool:
     if path_segments[-1] == "":
         return False
     return True
+
+
+def matches_patterns(relative: str, include: Patterns = None, exclude: Patterns = None) -> bool:
+    """Check a relative path against include/exclude glob patterns
+
+    Parameters
+    ----------
+    relative: str
+        "/"-separated path relative to the root being traversed
+    include: str or list of str, optional
+        A path is only selected if it matches one of these patterns
+    exclude: str or list of str, optional
+        A path is never selected if it matches one of these patterns
+
+    Returns
+    -------
+    bool: True if the path is selected
+    """
+    if isinstance(include, str):
+        include = [include]
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    if include and not any(fnmatch.fnmatchcase(relative, p) for p in include):
+        return False
+    if exclude and any(fnmatch.fnmatchcase(relative, p) for p in exclude):
+        return False
+    return True
@@ -11,12 +11,15 @@ setup(
     description=(
         "Pathlib-style interface for local, remote, and cloud-based file systems"
     ),
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     package_dir={"pathman2": "pathman2"},
     package_data={"pathman2": ["py.typed"]},
     install_requires=[],
     extras_require={
-        "s3": ["s3fs"]
+        "s3": ["s3fs"],
+        "zstd": ["zstandard"],
+        "lz4": ["lz4"],
+        "benchmarks": ["s3fs", "boto3", "moto[server]"],
     },
     license="MIT",
     classifiers=["Development Status :: 3 - Alpha", "Topic :: Utilities"],
@@ -0,0 +1,76 @@
+import os
+import logging
+import socket
+import uuid
+
+import pytest
+
+from pathman._impl.memory import MemoryStore
+from pathman._impl.session import close_sessions, get_client
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def s3_endpoint():
+    """ In-process moto S3 server, used by every boto3 client and s3fs filesystem """
+    moto_server = pytest.importorskip("moto.server")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = _free_port()
+    endpoint = "http://127.0.0.1:{}".format(port)
+    environ = {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ENDPOINT_URL": endpoint,
+    }
+    saved = {k: os.environ.get(k) for k in environ}
+    os.environ.update(environ)
+    server = moto_server.ThreadedMotoServer(port=port, verbose=False)
+    server.start()
+    try:
+        yield endpoint
+    finally:
+        close_sessions()
+        server.stop()
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+@pytest.fixture
+def bucket(s3_endpoint):
+    """ Empty bucket, private to the test """
+    name = "test-{}".format(uuid.uuid4().hex[:12])
+    get_client().create_bucket(Bucket=name)
+    yield name
+    # cached metadata of one test must not leak into the next
+    close_sessions()
+
+
+@pytest.fixture
+def s3_client(bucket):
+    return get_client()
+
+
+@pytest.fixture
+def memory_store():
+    return MemoryStore()
+
+
+@pytest.fixture(params=["local", "memory", "s3"])
+def root(request, tmp_path, memory_store):
+    """ Empty directory on each backend, as a Path """
+    from pathman import Path
+
+    if request.param == "local":
+        return Path(str(tmp_path))
+    if request.param == "memory":
+        return Path("memory://root", store=memory_store)
+    return Path("s3://{}/root".format(request.getfixturevalue("bucket")))
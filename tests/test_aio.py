@@ -0,0 +1,119 @@
+import os
+import asyncio
+
+from pathman import Path
+from pathman.aio import AsyncPath, close_async_sessions
+from pathman.copy import TransferConfig, TransferResult, copy
+
+
+def run(coroutine):
+    async def _main():
+        try:
+            return await coroutine
+        finally:
+            await close_async_sessions()
+
+    return asyncio.run(_main())
+
+
+def _make_tree(root: Path) -> None:
+    (root / "a.txt").write_bytes(b"a")
+    (root / "sub" / "b.txt").write_bytes(b"bb")
+
+
+def test_local_round_trip(tmp_path):
+    async def _main():
+        path = AsyncPath(str(tmp_path / "f.bin"))
+        assert not await path.exists()
+        assert await path.write_bytes(b"data") == 4
+        assert await path.is_file()
+        assert (await path.stat()).size == 4
+        assert await path.read_bytes() == b"data"
+        listed = [str(p) async for p in AsyncPath(str(tmp_path)).walk()]
+        await path.remove()
+        return listed
+
+    assert run(_main()) == [str(tmp_path / "f.bin")]
+
+
+def test_s3_round_trip(bucket):
+    async def _main():
+        path = AsyncPath("s3://{}/dir/f.bin".format(bucket))
+        await path.write_bytes(b"data")
+        contents = await path.read_bytes()
+        is_dir = await AsyncPath("s3://{}/dir".format(bucket)).is_dir()
+        await path.remove()
+        return contents, is_dir, await path.exists()
+
+    assert run(_main()) == (b"data", True, False)
+
+
+def test_s3_copy_into_existing_prefix_matches_sync_layout(bucket):
+    root = "s3://{}".format(bucket)
+    _make_tree(Path(root + "/src"))
+    Path(root + "/async/existing.txt").write_bytes(b"x")
+    Path(root + "/sync/existing.txt").write_bytes(b"x")
+
+    results = run(AsyncPath(root + "/src").copy(AsyncPath(root + "/async")))
+    copy(Path(root + "/src"), Path(root + "/sync"))
+
+    def _relative(prefix):
+        return sorted(str(p)[len(prefix) :] for p in Path(prefix).walk())
+
+    assert _relative(root + "/async") == _relative(root + "/sync")
+    assert _relative(root + "/async") == ["/a.txt", "/existing.txt", "/sub/b.txt"]
+    assert sorted(results) == [
+        TransferResult(root + "/src/a.txt", root + "/async/a.txt", 1),
+        TransferResult(root + "/src/sub/b.txt", root + "/async/sub/b.txt", 2),
+    ]
+
+
+def test_s3_copy_passes_options_through(bucket, s3_client):
+    root = "s3://{}".format(bucket)
+    _make_tree(Path(root + "/src"))
+
+    results = run(
+        AsyncPath(root + "/src").copy(
+            AsyncPath(root + "/dest"),
+            parallelism=1,
+            config=TransferConfig(),
+            verify=True,
+            ContentType="text/plain",
+            MetadataDirective="REPLACE",
+        )
+    )
+    assert sorted(r.dest for r in results) == [root + "/dest/a.txt", root + "/dest/sub/b.txt"]
+    copied = s3_client.head_object(Bucket=bucket, Key="dest/sub/b.txt")
+    assert copied["ContentType"] == "text/plain"
+
+
+def test_walk_filters_on_every_backend(root):
+    for relative in ("a.txt", "b.log", "skip/c.txt", "x/d.txt", "x/y/e.txt"):
+        path = root.join(*relative.split("/"))
+        if root._location == "local":
+            os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+        path.write_bytes(b"x")
+    seen = []
+
+    def _prune(directory):
+        seen.append(directory)
+        return str(directory).rstrip("/").endswith("/y")
+
+    async def _main():
+        path = AsyncPath(str(root), **root._original_kwargs)
+        prefix = str(path).rstrip("/") + "/"
+
+        async def _walk(**kwargs):
+            return sorted([str(p)[len(prefix) :] async for p in path.walk(**kwargs)])
+
+        return (
+            await _walk(include="*.txt", exclude="skip"),
+            await _walk(max_depth=1),
+            await _walk(prune=_prune),
+        )
+
+    filtered, shallow, pruned = run(_main())
+    assert filtered == ["a.txt", "x/d.txt", "x/y/e.txt"]
+    assert shallow == ["a.txt", "b.log"]
+    assert pruned == ["a.txt", "b.log", "skip/c.txt", "x/d.txt"]
+    assert seen and all(isinstance(p, AsyncPath) for p in seen)
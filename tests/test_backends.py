@@ -0,0 +1,69 @@
+import pytest
+
+from pathman import Path, register_backend
+from pathman import backends
+from pathman.aio import AsyncPath
+from pathman.backends import location_for, resolve_location
+from pathman._impl.memory import MemoryPath
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """ Registrations made by the test are undone afterwards """
+    monkeypatch.setattr(backends, "_backends", dict(backends._backends))
+    monkeypatch.setattr(backends, "_schemes", dict(backends._schemes))
+
+
+@pytest.mark.parametrize(
+    "path, location",
+    [
+        ("/tmp/x", "local"),
+        ("relative/x", "local"),
+        ("s3://bucket/key", "s3"),
+        ("S3://bucket/key", "s3"),
+        ("memory://x", "memory"),
+        ("unknown://x", "local"),
+    ],
+)
+def test_location_for(path, location):
+    assert location_for(path) == location
+
+
+def test_scheme_case_is_normalized_for_backends_only():
+    assert resolve_location("S3://Bucket/Key") == ("s3", "s3://Bucket/Key")
+    assert resolve_location("s3://bucket/key") == ("s3", "s3://bucket/key")
+    assert resolve_location("Unknown://Dir/File") == ("local", "Unknown://Dir/File")
+    assert resolve_location("/Tmp/File") == ("local", "/Tmp/File")
+
+
+def test_upper_case_s3_scheme_parses_bucket_and_key(bucket):
+    path = Path("S3://{}/dir/key".format(bucket))
+    assert str(path) == "s3://{}/dir/key".format(bucket)
+    assert path._impl.bucket == bucket
+    assert path._impl.key == "dir/key"
+    path.write_bytes(b"x")
+    assert Path("s3://{}/dir/key".format(bucket)).read_bytes() == b"x"
+    assert str(AsyncPath("S3://{}/k".format(bucket))) == "s3://{}/k".format(bucket)
+
+
+def test_register_backend_by_class_and_import_path(registry):
+    class ScratchPath(MemoryPath):
+        pass
+
+    register_backend("scratch", ScratchPath, schemes=("scratch", "tmpfs"))
+    assert isinstance(Path("scratch://a")._impl, ScratchPath)
+    assert isinstance(Path("TMPFS://a")._impl, ScratchPath)
+
+    register_backend("scratch", "pathman._impl.memory:MemoryPath")
+    assert type(Path("scratch://a")._impl) is MemoryPath
+
+
+def test_location_class_map_is_a_live_view(registry):
+    register_backend("scratch", "pathman._impl.memory:MemoryPath")
+    assert "scratch" in Path.location_class_map
+    assert "scratch" not in AsyncPath.location_class_map
+    assert Path.location_class_map["scratch"] is MemoryPath
+
+    del Path.location_class_map["scratch"]
+    assert "scratch" not in Path.location_class_map
+    assert location_for("scratch://a") == "local"
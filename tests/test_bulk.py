@@ -0,0 +1,112 @@
+import pytest
+
+from pathman import Path
+from pathman.bulk import exists_many, read_many, remove_many
+from pathman._impl.s3 import S3Path
+
+
+@pytest.fixture
+def paths(tmp_path, bucket):
+    local = Path(str(tmp_path / "local.txt"))
+    s3 = Path("s3://{}/dir/remote.txt".format(bucket))
+    local.write_bytes(b"local")
+    s3.write_bytes(b"remote")
+    missing = [
+        Path(str(tmp_path / "missing.txt")),
+        Path("s3://{}/dir/missing.txt".format(bucket)),
+    ]
+    return [local, s3], missing
+
+
+def test_exists_and_read_many_keep_input_order(paths):
+    present, missing = paths
+    everything = [present[0], missing[0], present[1], missing[1]]
+
+    assert [r.value for r in exists_many(everything)] == [True, False, True, False]
+
+    results = read_many(everything, parallelism=2)
+    assert [r.path for r in results] == everything
+    assert [r.value for r in results] == [b"local", None, b"remote", None]
+    assert [r.ok for r in results] == [True, False, True, False]
+    assert isinstance(results[1].error, FileNotFoundError)
+
+
+def test_remove_many_reports_missing_local_files(paths):
+    present, missing = paths
+
+    results = remove_many(present + missing)
+
+    # DeleteObjects succeeds for keys that do not exist
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert isinstance(results[2].error, FileNotFoundError)
+    assert not any(p.exists() for p in present)
+
+
+def test_remove_many_batches_s3_keys_without_looking_them_up(bucket, s3_client, monkeypatch):
+    files = [Path("s3://{}/many/{}".format(bucket, i)) for i in range(25)]
+    for f in files:
+        f.write_bytes(b"x")
+    prefix = Path("s3://{}/many".format(bucket))
+    assert prefix.is_dir()
+    deletes = []
+    s3_client.meta.events.register(
+        "before-parameter-build.s3.DeleteObjects", lambda params, **kwargs: deletes.append(params)
+    )
+
+    def _no_lookups(self, refresh=False):
+        raise AssertionError("looked up " + str(self))
+
+    monkeypatch.setattr(S3Path, "stat", _no_lookups)
+    results = remove_many(files + [prefix])
+    monkeypatch.undo()
+
+    assert all(r.ok for r in results[:-1])
+    # known to be a directory from the stat cache
+    assert isinstance(results[-1].error, IsADirectoryError)
+    assert len(deletes) == 1
+    assert not prefix.exists(refresh=True)
+
+
+def test_exists_many_lists_each_directory_once(bucket, s3_client, monkeypatch):
+    for key in ("d/a.txt", "d/b.txt", "d/sub/c.txt", "d/zz", "other/e.txt"):
+        s3_client.put_object(Bucket=bucket, Key=key, Body=b"x")
+    names = ["d/a.txt", "d/b.txt", "d/missing", "d/sub", "d/zz", "other/e.txt"]
+    paths = [Path("s3://{}/{}".format(bucket, name)) for name in names]
+    paths[1].stat()
+    listings = []
+    s3_client.meta.events.register(
+        "before-parameter-build.s3.ListObjectsV2",
+        lambda params, **kwargs: listings.append(params),
+    )
+    looked_up = []
+    original = S3Path.stat
+
+    def _stat(self, refresh=False):
+        looked_up.append(str(self))
+        return original(self, refresh)
+
+    monkeypatch.setattr(S3Path, "stat", _stat)
+    results = exists_many(paths)
+    monkeypatch.undo()
+
+    assert [r.value for r in results] == [True, True, False, True, True, True]
+    # b.txt was cached, other/e.txt alone in its directory
+    assert [p["Prefix"] for p in listings] == ["d/"]
+    assert looked_up == ["s3://{}/other/e.txt".format(bucket)]
+    # the answers are cached
+    s3_client.delete_object(Bucket=bucket, Key="d/a.txt")
+    assert paths[0].is_file() and paths[3].is_dir() and not paths[2].exists()
+
+
+def test_read_many_sends_one_request_per_object(paths, s3_client):
+    present, missing = paths
+    requests = []
+    s3_client.meta.events.register(
+        "before-parameter-build.s3.*", lambda params, **kwargs: requests.append(params)
+    )
+
+    results = read_many([present[1], missing[1]])
+
+    assert [r.value for r in results] == [b"remote", None]
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert len(requests) == 2
@@ -0,0 +1,114 @@
+import os
+import zlib
+import base64
+import hashlib
+
+import pytest
+
+from pathman import Path
+from pathman import checksum as checksum_module
+from pathman import copy as copy_module
+from pathman.checksum import Checksum, compute_etag, etag_matches, file_checksum
+from pathman.copy import MB, TransferConfig, copy
+from pathman.exc import VerificationError
+
+DATA = os.urandom(3 * 1000 + 17)
+
+
+def test_whole_stream_checksums():
+    assert Checksum().value() == hashlib.md5(b"").hexdigest()
+    etag = Checksum("etag")
+    crc = Checksum("crc32")
+    for i in range(0, len(DATA), 7):
+        etag.update(DATA[i : i + 7])
+        crc.update(DATA[i : i + 7])
+    assert etag.value() == hashlib.md5(DATA).hexdigest()
+    expected = base64.b64encode(zlib.crc32(DATA).to_bytes(4, "big")).decode()
+    assert crc.value() == expected
+
+
+def test_multipart_checksum_ignores_chunk_boundaries():
+    digests = b"".join(hashlib.md5(DATA[i : i + 1000]).digest() for i in range(0, len(DATA), 1000))
+    expected = "{}-4".format(hashlib.md5(digests).hexdigest())
+    for chunk in (1, 999, 1000, 4096):
+        checksum = Checksum("etag", part_size=1000)
+        for i in range(0, len(DATA), chunk):
+            checksum.update(memoryview(DATA)[i : i + chunk])
+        assert checksum.value() == expected
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        Checksum("sha1")
+
+
+def test_file_checksum_is_cached_while_unchanged(tmp_path, monkeypatch):
+    filename = str(tmp_path / "data.bin")
+    with open(filename, "wb") as f:
+        f.write(DATA)
+    value = file_checksum(filename, "crc32")
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("read again")
+
+    monkeypatch.setattr(checksum_module, "Checksum", _fail)
+    assert file_checksum(filename, "crc32") == value
+    monkeypatch.undo()
+
+    with open(filename, "ab") as f:
+        f.write(b"more")
+    os.utime(filename, ns=(0, 0))
+    assert compute_etag(filename) == hashlib.md5(DATA + b"more").hexdigest()
+
+
+def test_etags_match_s3(bucket, s3_client, tmp_path):
+    data = os.urandom(11 * MB)
+    (tmp_path / "big.bin").write_bytes(data)
+    filename = str(tmp_path / "big.bin")
+    config = TransferConfig(multipart_threshold=5 * MB, part_size=5 * MB)
+    copy(Path(filename), Path("s3://{}/big.bin".format(bucket)), config=config)
+    etag = s3_client.head_object(Bucket=bucket, Key="big.bin")["ETag"]
+
+    assert compute_etag(filename, part_size=5 * MB) == etag.strip('"')
+    assert etag_matches(filename, etag, 5 * MB)
+    assert not etag_matches(filename, etag, 8 * MB)
+    assert etag_matches(filename, hashlib.md5(data).hexdigest(), 5 * MB)
+
+
+@pytest.mark.parametrize("verify", [True, "crc32"])
+@pytest.mark.parametrize("size", [1000, 11 * MB], ids=["single", "multipart"])
+def test_verified_round_trip(bucket, tmp_path, verify, size):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "data.bin").write_bytes(os.urandom(size))
+    config = TransferConfig(multipart_threshold=5 * MB, part_size=5 * MB)
+    options = dict(verify=verify, config=config)
+    up = Path("s3://{}/up".format(bucket))
+
+    copy(Path(str(tmp_path / "src")), up, **options)
+    copy(up, Path("s3://{}/moved".format(bucket)), **options)
+    copy(Path("s3://{}/moved".format(bucket)), Path(str(tmp_path / "down")), **options)
+    assert (tmp_path / "down" / "data.bin").read_bytes() == (
+        tmp_path / "src" / "data.bin"
+    ).read_bytes()
+
+
+def test_mismatches_raise(bucket, tmp_path, monkeypatch):
+    (tmp_path / "a.bin").write_bytes(DATA)
+    src = Path("s3://{}/a.bin".format(bucket))
+    copy(Path(str(tmp_path / "a.bin")), src, verify=True)
+
+    monkeypatch.setattr(
+        copy_module, "_remote_checksum", lambda *args, **kwargs: ("0" * 32, None)
+    )
+    with pytest.raises(VerificationError) as info:
+        copy(src, Path(str(tmp_path / "b.bin")), verify=True)
+    assert info.value.expected == "0" * 32
+    assert info.value.actual == hashlib.md5(DATA).hexdigest()
+    with pytest.raises(VerificationError):
+        copy(Path(str(tmp_path / "a.bin")), src, verify=True)
+
+
+def test_invalid_verify(bucket, tmp_path):
+    (tmp_path / "a.bin").write_bytes(DATA)
+    with pytest.raises(ValueError):
+        copy(Path(str(tmp_path / "a.bin")), Path("s3://{}/a.bin".format(bucket)), verify="md4")
@@ -0,0 +1,111 @@
+import io
+import gzip
+import importlib
+
+import pytest
+
+from pathman import Path
+from pathman import compression
+from pathman.compression import infer_compression, resolve_compression, wrap
+from pathman.copy import copy
+
+LINES = "".join("line {}\n".format(i) for i in range(2000))
+
+
+def _codec(name):
+    module = {"gzip": "gzip", "zstd": "zstandard", "lz4": "lz4.frame"}[name]
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        pytest.skip("{} is not installed".format(module))
+    return name
+
+
+@pytest.fixture(params=["gzip", "zstd", "lz4"])
+def codec(request):
+    return _codec(request.param)
+
+
+def test_resolve_compression():
+    assert infer_compression("s3://b/a.JSON.GZ") == "gzip"
+    assert infer_compression("a.zst") == "zstd"
+    assert infer_compression("a.txt") is None
+    assert resolve_compression("infer", "a.lz4") == "lz4"
+    assert resolve_compression(None, "a.gz") is None
+    with pytest.raises(ValueError):
+        resolve_compression("bz2", "a.bz2")
+
+
+def test_round_trip(root, codec):
+    path = root / "data.txt"
+    assert path.write_text(LINES, compression=codec) == len(LINES)
+    assert path.stat().size < len(LINES)
+    assert path.read_text(compression=codec) == LINES
+    assert path.read_bytes(compression=codec) == LINES.encode()
+
+    with path.open("r", compression=codec) as f:
+        assert f.readline() == "line 0\n"
+        assert sum(1 for _ in f) == 1999
+
+
+def test_infer_from_extension(root):
+    path = root / "data.txt.gz"
+    path.write_bytes(LINES.encode(), compression="infer")
+    assert gzip.decompress(path.read_bytes()) == LINES.encode()
+    assert path.read_text(compression="infer") == LINES
+    # nothing to infer: written as is
+    (root / "plain.txt").write_text(LINES, compression="infer")
+    assert (root / "plain.txt").read_text() == LINES
+
+
+def test_streamed_writes(root, codec):
+    path = root / "stream.bin"
+    chunks = [LINES.encode()] * 5
+    assert path.write_stream(chunks, compression=codec) == 5 * len(LINES)
+    assert path.read_bytes(compression=codec) == b"".join(chunks)
+    with path.open_stream(compression=codec) as f:
+        f.write(b"abc")
+    assert path.read_bytes(compression=codec) == b"abc"
+
+
+def test_failed_s3_stream_creates_nothing(bucket):
+    path = Path("s3://{}/a.gz".format(bucket))
+    with pytest.raises(RuntimeError):
+        with path.open_stream(compression="gzip") as f:
+            f.write(b"partial")
+            raise RuntimeError()
+    assert not path._impl.exists()
+
+
+def test_missing_codec(monkeypatch):
+    def _missing(name):
+        raise ImportError(name)
+
+    monkeypatch.setattr(compression.importlib, "import_module", _missing)
+    f = io.BytesIO()
+    with pytest.raises(ImportError, match="zstandard is required for zstd"):
+        wrap(f, "wb", "zstd")
+    assert f.closed
+
+
+def test_updating_modes_are_rejected(root):
+    (root / "a.gz").write_bytes(b"", compression="gzip")
+    with pytest.raises(ValueError):
+        (root / "a.gz").open("r+b", compression="gzip")
+
+
+def test_copy_compresses(root, tmp_path):
+    (tmp_path / "src" / "sub").mkdir(parents=True)
+    (tmp_path / "src" / "sub" / "a.txt").write_text(LINES)
+    src = Path(str(tmp_path / "src"))
+
+    results = copy(src, root / "dest", compression="gzip")
+    [result] = results
+    assert result.dest.endswith("sub/a.txt.gz")
+    assert result.size == len(LINES)
+    assert (root / "dest" / "sub" / "a.txt.gz").read_text(compression="infer") == LINES
+
+    copy(src / "sub" / "a.txt", root / "single.gz", compression="infer")
+    assert gzip.decompress((root / "single.gz").read_bytes()).decode() == LINES
+    with pytest.raises(ValueError):
+        copy(src, root / "other", compression="infer")
@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pytest
+
+from pathman import Path
+from pathman.copy import copy
+from pathman.exc import CopyError
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.txt").write_bytes(b"a")
+    (src / "sub" / "b.txt").write_bytes(b"bb")
+    (src / "run.sh").write_bytes(b"#!/bin/sh")
+    os.chmod(str(src / "run.sh"), 0o755)
+    return src
+
+
+def test_copies_a_directory_with_modes(tree, tmp_path):
+    results = copy(Path(str(tree)), Path(str(tmp_path / "dest")))
+
+    assert sorted((os.path.relpath(r.dest, str(tmp_path / "dest")), r.size) for r in results) == [
+        ("a.txt", 1),
+        ("run.sh", 9),
+        (os.path.join("sub", "b.txt"), 2),
+    ]
+    assert (tmp_path / "dest" / "sub" / "b.txt").read_bytes() == b"bb"
+    assert os.stat(str(tmp_path / "dest" / "run.sh")).st_mode & 0o777 == 0o755
+
+
+def test_copies_a_file_into_a_directory(tree, tmp_path):
+    (tmp_path / "dest").mkdir()
+    copy(Path(str(tree / "a.txt")), Path(str(tmp_path / "dest")))
+    assert (tmp_path / "dest" / "a.txt").read_bytes() == b"a"
+
+
+def test_include_and_exclude(tree, tmp_path):
+    results = copy(Path(str(tree)), Path(str(tmp_path / "dest")), include="*.txt", exclude="sub/*")
+    assert [os.path.basename(r.dest) for r in results] == ["a.txt"]
+
+
+def test_copy_onto_itself_keeps_the_file(tree):
+    with pytest.raises(shutil.SameFileError):
+        copy(Path(str(tree / "a.txt")), Path(str(tree / "a.txt")))
+    assert (tree / "a.txt").read_bytes() == b"a"
+
+
+@pytest.mark.parametrize("link", [os.symlink, os.link])
+def test_copy_onto_a_link_to_itself_keeps_the_file(tree, link):
+    link(str(tree / "a.txt"), str(tree / "link.txt"))
+    with pytest.raises(shutil.SameFileError):
+        copy(Path(str(tree / "a.txt")), Path(str(tree / "link.txt")))
+    assert (tree / "a.txt").read_bytes() == b"a"
+
+
+def test_directory_copy_onto_itself_fails_every_file(tree):
+    with pytest.raises(CopyError) as error:
+        copy(Path(str(tree)), Path(str(tree)))
+    assert all(isinstance(e, shutil.SameFileError) for _, e in error.value.errors)
+    assert (tree / "sub" / "b.txt").read_bytes() == b"bb"
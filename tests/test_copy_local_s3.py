@@ -0,0 +1,72 @@
+import pytest
+
+from pathman import Path
+from pathman.copy import copy
+from pathman.exc import CopyError
+
+
+def _tree(root):
+    (root / "sub" / "deeper").mkdir(parents=True)
+    (root / "a.txt").write_bytes(b"a")
+    (root / "b.log").write_bytes(b"bb")
+    (root / "sub" / "c.txt").write_bytes(b"ccc")
+    (root / "sub" / "deeper" / "d.txt").write_bytes(b"dddd")
+
+
+def _keys(s3_client, bucket, prefix=""):
+    listing = s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
+    return sorted(obj["Key"] for obj in listing.get("Contents", []))
+
+
+def test_upload_directory(bucket, s3_client, tmp_path):
+    _tree(tmp_path)
+    dest = Path("s3://{}/up".format(bucket))
+    assert not dest.exists()
+
+    results = copy(Path(str(tmp_path)), dest, parallelism=3)
+
+    assert _keys(s3_client, bucket) == [
+        "up/a.txt",
+        "up/b.log",
+        "up/sub/c.txt",
+        "up/sub/deeper/d.txt",
+    ]
+    assert sum(r.size for r in results) == 10
+    assert (dest / "sub" / "deeper" / "d.txt").read_bytes() == b"dddd"
+    # the destination's cached "does not exist" was dropped
+    assert dest.is_dir()
+
+
+def test_upload_directory_to_bucket_root(bucket, s3_client, tmp_path):
+    _tree(tmp_path)
+    copy(Path(str(tmp_path)), Path("s3://{}".format(bucket)))
+    assert "sub/c.txt" in _keys(s3_client, bucket)
+
+
+def test_upload_with_filters(bucket, s3_client, tmp_path):
+    _tree(tmp_path)
+    copy(
+        Path(str(tmp_path)),
+        Path("s3://{}/up".format(bucket)),
+        include=["*.txt", "sub/**"],
+        exclude="sub/deeper/*",
+    )
+    assert _keys(s3_client, bucket) == ["up/a.txt", "up/sub/c.txt"]
+
+
+def test_upload_single_file_with_extra_args(bucket, s3_client, tmp_path):
+    (tmp_path / "a.json").write_bytes(b"{}")
+    copy(
+        Path(str(tmp_path / "a.json")),
+        Path("s3://{}/a.json".format(bucket)),
+        ContentType="application/json",
+    )
+    head = s3_client.head_object(Bucket=bucket, Key="a.json")
+    assert head["ContentType"] == "application/json"
+
+
+def test_failed_uploads_are_collected(bucket, tmp_path):
+    _tree(tmp_path)
+    with pytest.raises(CopyError) as info:
+        copy(Path(str(tmp_path)), Path("s3://missing-{}/up".format(bucket)), parallelism=2)
+    assert len(info.value.errors) == 4
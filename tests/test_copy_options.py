@@ -0,0 +1,103 @@
+import pytest
+
+from pathman import Path
+from pathman.copy import copy, sync
+from pathman.exc import UnsupportedOperation, VerificationError
+
+
+@pytest.fixture
+def local_tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.txt").write_bytes(b"a" * 100)
+    (src / "sub" / "b.txt").write_bytes(b"b" * 10)
+    return Path(str(src))
+
+
+def test_local_copies_verify(local_tree, tmp_path):
+    results = copy(local_tree, Path(str(tmp_path / "dest")), verify=True)
+    assert len(results) == 2
+    copy(local_tree / "a.txt", Path(str(tmp_path / "a.txt")), verify="crc32")
+
+
+def test_local_copy_verification_failure(local_tree, tmp_path, monkeypatch):
+    from pathman import copy as copy_module
+
+    real = copy_module.file_checksum
+    monkeypatch.setattr(
+        copy_module,
+        "file_checksum",
+        lambda f, algorithm: real(f, algorithm) + ("x" if "dest" in f else ""),
+    )
+    with pytest.raises(VerificationError):
+        copy(local_tree / "a.txt", Path(str(tmp_path / "dest.txt")), verify=True)
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_generic_copies_verify(local_tree, memory_store, compression):
+    dest = Path("memory://dest", store=memory_store)
+    results = copy(local_tree, dest, verify="crc32", compression=compression)
+    assert len(results) == 2
+    back = Path("memory://dest2", store=memory_store)
+    copy(dest, back, verify=True)
+    assert (back / "sub" / ("b.txt" + (".gz" if compression else ""))).exists()
+
+
+def test_generic_copy_verification_failure(local_tree, memory_store, monkeypatch):
+    from pathman._impl.memory import MemoryPath
+
+    monkeypatch.setattr(MemoryPath, "iter_bytes", lambda self, chunk_size: iter([b"corrupt"]))
+    with pytest.raises(VerificationError):
+        copy(local_tree / "a.txt", Path("memory://a.txt", store=memory_store), verify=True)
+
+
+def test_generic_copy_rejects_process_executor(local_tree, memory_store):
+    with pytest.raises(UnsupportedOperation):
+        copy(local_tree, Path("memory://dest", store=memory_store), executor="process")
+
+
+@pytest.mark.parametrize("option", [{"resume": True}, {"journal": "j"}, {"ContentType": "x"}])
+def test_unsupported_local_options_are_rejected(local_tree, tmp_path, option):
+    with pytest.raises(UnsupportedOperation):
+        copy(local_tree, Path(str(tmp_path / "dest")), **option)
+    with pytest.raises(UnsupportedOperation):
+        sync(local_tree, Path(str(tmp_path / "dest")), **option)
+
+
+def test_s3_options_are_checked_before_extra_args(local_tree, bucket):
+    with pytest.raises(UnsupportedOperation):
+        copy(Path("s3://{}/src".format(bucket)), Path("s3://{}/dest".format(bucket)), include="*")
+
+
+def test_compressed_s3_copy_verifies(local_tree, bucket):
+    results = copy(local_tree, Path("s3://{}/dest".format(bucket)), compression="gzip", verify=True)
+    assert sorted(r.dest for r in results) == [
+        "s3://{}/dest/a.txt.gz".format(bucket),
+        "s3://{}/dest/sub/b.txt.gz".format(bucket),
+    ]
+
+
+@pytest.mark.parametrize("dest_location", ["local", "memory", "s3"])
+def test_filters_are_the_same_in_every_direction(tmp_path, memory_store, bucket, dest_location):
+    src = tmp_path / "tree"
+    (src / "build").mkdir(parents=True)
+    (src / "a.txt").write_bytes(b"a")
+    (src / "b.log").write_bytes(b"b")
+    (src / "build" / "x.txt").write_bytes(b"x")
+    dest = {
+        "local": Path(str(tmp_path / "dest")),
+        "memory": Path("memory://dest", store=memory_store),
+        "s3": Path("s3://{}/dest".format(bucket)),
+    }[dest_location]
+
+    # patterns match whole relative paths: "build" does not prune build/x.txt
+    results = copy(Path(str(src)), dest, include="*.txt", exclude="build")
+    copied = sorted(r.dest[len(str(dest)) + 1 :].replace("\\", "/") for r in results)
+    assert copied == ["a.txt", "build/x.txt"]
+    results = copy(Path(str(src)), dest / "again", exclude="build/*")
+    assert len(results) == 2
+
+    synced = dest / "synced"
+    actions = sync(Path(str(src)), synced, include="*.txt", exclude="build")
+    relative = sorted(a.dest[len(str(synced)) + 1 :].replace("\\", "/") for a in actions)
+    assert relative == ["a.txt", "build/x.txt"]
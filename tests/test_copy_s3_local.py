@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+import pytest
+
+from pathman import Path
+from pathman import copy as copy_module
+from pathman.copy import _prefetch, _run_pipeline, copy
+from pathman.exc import CopyError
+
+
+def _put(s3_client, bucket, keys):
+    for key in keys:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=key.encode())
+
+
+def test_download_prefix(bucket, s3_client, tmp_path):
+    keys = ["data/a.txt", "data/sub/b.txt", "data/sub/deeper/c.txt", "other/d.txt"]
+    _put(s3_client, bucket, keys)
+    s3_client.put_object(Bucket=bucket, Key="data/empty/", Body=b"")
+
+    dest = tmp_path / "out"
+    results = copy(Path("s3://{}/data".format(bucket)), Path(str(dest)), parallelism=2)
+
+    assert sorted(r.src for r in results) == ["s3://{}/{}".format(bucket, k) for k in keys[:3]]
+    assert (dest / "a.txt").read_bytes() == b"data/a.txt"
+    assert (dest / "sub" / "deeper" / "c.txt").read_bytes() == b"data/sub/deeper/c.txt"
+    assert (dest / "empty").is_dir()
+    assert not (dest / "d.txt").exists()
+    assert {r.size for r in results} == {len(k) for k in keys[:3]}
+
+
+def test_listing_parallelism_is_separate_from_transfers(bucket, s3_client, tmp_path, monkeypatch):
+    _put(s3_client, bucket, ["data/a.txt", "data/b.txt"])
+    shards = []
+    original = copy_module.parallel_list_objects
+
+    def _list(client, bucket, prefix, parallelism=None, **kwargs):
+        shards.append(parallelism)
+        return original(client, bucket, prefix, parallelism, **kwargs)
+
+    monkeypatch.setattr(copy_module, "parallel_list_objects", _list)
+    src = Path("s3://{}/data".format(bucket))
+    copy(src, Path(str(tmp_path / "out")), parallelism=16)
+    copy(src, Path("s3://{}/copy".format(bucket)), parallelism=16)
+    copy(src, Path(str(tmp_path / "sharded")), parallelism=16, list_parallelism=4)
+    assert shards == [1, 1, 4]
+    assert sorted(os.listdir(str(tmp_path / "sharded"))) == ["a.txt", "b.txt"]
+
+
+def test_download_single_object_into_directory(bucket, s3_client, tmp_path):
+    _put(s3_client, bucket, ["data/a.txt"])
+    results = copy(Path("s3://{}/data/a.txt".format(bucket)), Path(str(tmp_path)))
+    assert results[0].dest == str(tmp_path / "a.txt")
+    assert (tmp_path / "a.txt").read_bytes() == b"data/a.txt"
+
+
+def test_failures_do_not_stop_other_downloads(bucket, s3_client, tmp_path):
+    _put(s3_client, bucket, ["data/a", "data/b", "data/c"])
+    # "b" cannot be written over a directory
+    os.makedirs(str(tmp_path / "b"))
+    with pytest.raises(CopyError) as info:
+        copy(Path("s3://{}/data".format(bucket)), Path(str(tmp_path)), parallelism=2)
+    assert len(info.value.errors) == 1
+    assert (tmp_path / "a").read_bytes() == b"data/a"
+    assert (tmp_path / "c").read_bytes() == b"data/c"
+
+
+def test_pipeline_bounds_concurrency_and_tasks_in_flight():
+    lock = threading.Lock()
+    running = [0, 0]
+    pulled = []
+
+    def _tasks():
+        for i in range(40):
+            pulled.append(i)
+            yield i
+
+    def _work(i):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+            # tasks are pulled only as workers free up
+            assert len(pulled) - i <= 2 * 3
+        time.sleep(0.005)
+        with lock:
+            running[0] -= 1
+        return i
+
+    assert sorted(_run_pipeline(_tasks(), _work, parallelism=3)) == list(range(40))
+    assert running[1] <= 3
+
+
+def test_pipeline_collects_every_failure():
+    def _work(i):
+        if i % 2:
+            raise ValueError(i)
+        return i
+
+    with pytest.raises(CopyError) as info:
+        _run_pipeline(range(6), _work, parallelism=2)
+    assert sorted(e.args[0] for _, e in info.value.errors) == [1, 3, 5]
+
+
+def test_prefetch_reraises_producer_errors():
+    def _items():
+        yield 1
+        raise RuntimeError("listing failed")
+
+    items = _prefetch(_items())
+    assert next(items) == 1
+    with pytest.raises(RuntimeError):
+        next(items)
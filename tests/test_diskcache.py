@@ -0,0 +1,161 @@
+import hashlib
+import os
+import pickle
+import threading
+
+import pytest
+
+from pathman import Path
+from pathman.copy import copy
+from pathman.diskcache import DiskCache, disable_disk_cache, enable_disk_cache
+
+
+def _writer(contents: bytes, calls: list):
+    def _download(filename: str) -> None:
+        calls.append(filename)
+        with open(filename, "wb") as f:
+            f.write(contents)
+
+    return _download
+
+
+def _same_shard_keys(bucket: str, etag: str):
+    """ Two keys whose cache entries share a shard directory (and its lock, before) """
+    shards = {}
+    for i in range(10000):
+        key = "key-{}".format(i)
+        digest = hashlib.sha256("\0".join((bucket, key, etag)).encode("utf-8")).hexdigest()
+        if digest[:2] in shards:
+            return shards[digest[:2]], key
+        shards[digest[:2]] = key
+    raise AssertionError("no colliding shard")  # pragma: no cover
+
+
+def test_fetch_downloads_once_per_etag(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    calls = []
+
+    first = cache.fetch("b", "k", "e1", _writer(b"one", calls))
+    assert cache.fetch("b", "k", "e1", _writer(b"other", calls)) == first
+    assert open(first, "rb").read() == b"one"
+    assert len(calls) == 1
+    assert cache.get("b", "k", "e1") == first
+
+    assert cache.get("b", "k", "e2") is None
+    second = cache.fetch("b", "k", '"e2"', _writer(b"two", calls))
+    assert second != first and open(second, "rb").read() == b"two"
+
+
+def test_failed_download_leaves_nothing(tmp_path):
+    cache = DiskCache(str(tmp_path))
+
+    def _fail(filename):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.fetch("b", "k", "e", _fail)
+    assert cache.get("b", "k", "e") is None
+    assert os.listdir(os.path.join(str(tmp_path), "tmp")) == []
+
+
+def test_concurrent_fetches_of_one_object_download_once(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    calls = []
+    threads = [
+        threading.Thread(target=cache.fetch, args=("b", "k", "e", _writer(b"x" * 1000, calls)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+
+def test_objects_in_one_shard_download_concurrently(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    both_downloading = threading.Barrier(2, timeout=5)
+    errors = []
+
+    def _download(filename):
+        both_downloading.wait()
+        open(filename, "wb").close()
+
+    def _fetch(key):
+        try:
+            cache.fetch("b", key, "e", _download)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=_fetch, args=(k,)) for k in _same_shard_keys("b", "e")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_lock_files_are_removed(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    for i in range(5):
+        cache.fetch("b", str(i), "e", _writer(b"x", []))
+    locks = [files for _, _, files in os.walk(os.path.join(str(tmp_path), "locks"))]
+    assert sum(len(files) for files in locks) == 0
+
+
+def test_evicts_least_recently_used_only_over_max_size(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), max_size=250)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda **kwargs: scans.append(1) or evict(**kwargs))
+
+    for key in ("a", "b"):
+        cache.fetch("b", key, "e", _writer(b"x" * 100, []))
+    os.utime(cache.get("b", "a", "e"), (1, 1))
+    os.utime(cache.get("b", "b", "e"), (2, 2))
+    assert scans == []
+
+    cache.fetch("b", "c", "e", _writer(b"x" * 100, []))
+    assert scans == [1]
+    assert cache.get("b", "a", "e") is None
+    assert cache.get("b", "b", "e") is not None
+    assert cache.size() == 200
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_s3_reads_go_through_the_cache(tmp_path, bucket):
+    cache = enable_disk_cache(str(tmp_path / "cache"))
+    try:
+        path = Path("s3://{}/cached.bin".format(bucket))
+        path.write_bytes(b"contents")
+        assert path.read_bytes() == b"contents"
+        assert cache.size() == len(b"contents")
+        assert path.read_bytes() == b"contents"
+    finally:
+        disable_disk_cache()
+
+
+def test_pickles_as_its_settings(tmp_path):
+    cache = DiskCache(str(tmp_path), max_size=123)
+    copied = pickle.loads(pickle.dumps(cache))
+    assert (copied.directory, copied.max_size) == (cache.directory, 123)
+
+
+def test_process_downloads_fill_the_cache(tmp_path, bucket, s3_client):
+    for name in "abc":
+        s3_client.put_object(Bucket=bucket, Key="data/" + name, Body=name.encode() * 10)
+    cache = enable_disk_cache(str(tmp_path / "cache"))
+    try:
+        results = copy(
+            Path("s3://{}/data".format(bucket)),
+            Path(str(tmp_path / "out")),
+            parallelism=2,
+            executor="process",
+        )
+        assert len(results) == 3
+        assert (tmp_path / "out" / "b").read_bytes() == b"b" * 10
+        assert cache.size() == 30
+    finally:
+        disable_disk_cache()
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _modules_after(code: str):
+    output = subprocess.check_output(
+        [sys.executable, "-c", code + "\nimport sys\nprint(' '.join(sorted(sys.modules)))"]
+    )
+    return set(output.decode().split())
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import pathman\nfrom pathman import Path\nPath('.').exists()",
+        "import pathman.copy\nimport pathman.bulk",
+    ],
+)
+def test_imports_do_not_load_async_or_remote_dependencies(code):
+    modules = _modules_after(code)
+    for heavy in ("asyncio", "botocore", "boto3", "s3fs"):
+        assert heavy not in modules
+
+
+def test_local_paths_do_not_import_other_backends():
+    modules = _modules_after("from pathman import Path\nPath('.').exists()")
+    assert "pathman._impl.local" in modules
+    assert "pathman._impl.s3" not in modules
+    assert "pathman._impl.memory" not in modules
@@ -0,0 +1,129 @@
+import pytest
+
+from pathman import Path
+from pathman import copy as copy_module
+from pathman import instrument
+from pathman._impl.local import LocalPath
+from pathman.instrument import Histogram, OperationEvent, add_callback, profile, remove_callback
+from pathman._impl.session import close_sessions, get_client
+
+
+@pytest.fixture
+def events():
+    recorded = []
+    add_callback(recorded.append)
+    yield recorded
+    remove_callback(recorded.append)
+    assert not instrument.is_enabled()
+
+
+def _event(operation, duration, **kwargs):
+    fields = dict(bytes=0, requests=0, retries=0, cache_hits=0, error=None)
+    fields.update(kwargs)
+    return OperationEvent(operation, "path", duration, **fields)
+
+
+def test_installed_only_while_enabled():
+    original = LocalPath.stat
+    original_copy = copy_module.copy_local_s3
+    with profile():
+        assert instrument.is_enabled()
+        assert LocalPath.stat is not original
+        assert copy_module.copy_local_s3 is not original_copy
+    assert LocalPath.stat is original
+    assert copy_module.copy_local_s3 is original_copy
+    with pytest.raises(ValueError):
+        remove_callback(print)
+
+
+def test_events_of_each_backend(root, events):
+    path = root / "a.txt"
+    path.write_bytes(b"hello")
+    assert path.read_bytes() == b"hello"
+    assert path.is_file()
+    assert list(root.walk()) == [path]
+    with pytest.raises(FileNotFoundError):
+        (root / "missing").read_bytes()
+
+    name = type(path._impl).__name__
+    by_operation = [(e.operation, e.bytes, e.error) for e in events]
+    assert by_operation == [
+        (name + ".write_bytes", 5, None),
+        (name + ".read_bytes", 5, None),
+        # only the outermost call: not the stat behind is_file
+        (name + ".is_file", 0, None),
+        (name + ".walk", 0, None),
+        (name + ".read_bytes", 0, "FileNotFoundError"),
+    ]
+    assert events[0].path == str(path)
+    assert all(e.duration >= 0 for e in events)
+
+
+def test_s3_requests_and_cache_hits(bucket, events):
+    path = Path("s3://{}/a.txt".format(bucket))
+    path.write_bytes(b"hello")
+    del events[:]
+    path.stat()
+    path.stat()
+    assert [e.requests for e in events] == [1, 0]
+    assert [e.cache_hits for e in events] == [0, 1]
+
+
+def test_copies_report_transferred_bytes(tmp_path, memory_store, events):
+    (tmp_path / "a.txt").write_bytes(b"abc")
+    results = copy_module.copy(Path(str(tmp_path)), Path("memory://dest", store=memory_store))
+    [event] = [e for e in events if e.operation.startswith("copy.")]
+    assert event.operation == "copy.copy_generic"
+    assert event.path == "{} -> memory://dest".format(tmp_path)
+    assert event.bytes == sum(r.size for r in results) == 3
+
+
+def test_iterators_report_once_exhausted(root, events):
+    path = root / "a.txt"
+    path.write_bytes(b"x" * 10)
+    del events[:]
+    chunks = path._impl.iter_bytes(4)
+    assert next(chunks) == b"xxxx"
+    assert events == []
+    assert b"".join(chunks) == b"xxxxxx"
+    assert [(e.operation.split(".")[1], e.bytes) for e in events] == [("iter_bytes", 10)]
+
+
+def test_histogram():
+    histogram = Histogram()
+    for duration in [0.001] * 98 + [0.1, 1.0]:
+        histogram(_event("op", duration, bytes=1, requests=2))
+    histogram(_event("other", 0.5, error="OSError"))
+
+    op, other = histogram.summary()
+    assert (op.operation, op.count, op.bytes, op.requests) == ("op", 100, 100, 200)
+    assert op.max == 1.0
+    assert 0.0009 < op.p50 < 0.0011
+    assert 0.09 < op.p99 < 0.11
+    assert (other.count, other.errors) == (1, 1)
+    assert histogram.report().splitlines()[1].startswith("op ")
+
+    histogram.reset()
+    assert histogram.summary() == []
+
+
+def test_request_hooks_are_removed_with_instrumentation(bucket):
+    from botocore import handlers
+
+    builtin = list(handlers.BUILTIN_HANDLERS)
+    for _ in range(2):
+        recorded = []
+        add_callback(recorded.append)
+        # a filesystem and a client created while enabled are counted too
+        close_sessions()
+        path = Path("s3://{}/a.txt".format(bucket))
+        path.write_bytes(b"hello")
+        del recorded[:]
+        path.stat(refresh=True)
+        path.exists()
+        assert get_client().meta.events in instrument._hooked_emitters
+        remove_callback(recorded.append)
+        # hooks registered twice would count every request twice
+        assert [e.requests for e in recorded] == [1, 0]
+    assert handlers.BUILTIN_HANDLERS == builtin
+    assert len(instrument._hooked_emitters) == 0
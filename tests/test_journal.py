@@ -0,0 +1,47 @@
+import pickle
+
+from pathman.journal import TransferJournal
+
+
+def test_records_are_read_back_by_transfer(tmp_path):
+    journal = TransferJournal(str(tmp_path / "sub" / "journal"))
+    journal.record("upload", "a", "b", upload_id="u", part_size=5)
+    journal.record("part", "a", "b", part=1, etag="e1")
+    journal.record("part", "a", "b", part=2, etag="e2")
+    journal.record("done", "c", "d", size=3)
+
+    state = journal.load()
+    assert state.uploads[("a", "b")]["upload_id"] == "u"
+    assert [p["part"] for p in state.parts[("a", "b")]] == [1, 2]
+    assert state.is_done("c", "d", size=3)
+    assert not state.is_done("c", "d", size=4)
+    assert not state.is_done("a", "b")
+
+
+def test_missing_journal_is_empty(tmp_path):
+    state = TransferJournal(str(tmp_path / "journal")).load()
+    assert state.completed == state.uploads == state.parts == {}
+
+
+def test_truncated_last_line_does_not_swallow_the_next_record(tmp_path):
+    path = tmp_path / "journal"
+    journal = TransferJournal(str(path))
+    journal.record("done", "a", "b")
+    journal.close()
+    with open(str(path), "ab") as f:
+        f.write(b'{"dest": "d", "op": "do')  # interrupted mid-write
+
+    resumed = TransferJournal(str(path))
+    resumed.record("done", "c", "d")
+
+    assert set(resumed.load().completed) == {("a", "b"), ("c", "d")}
+
+
+def test_journal_pickles_as_its_path(tmp_path):
+    journal = TransferJournal(str(tmp_path / "journal"))
+    journal.record("done", "a", "b")
+    copy = pickle.loads(pickle.dumps(journal))
+    copy.record("done", "c", "d")
+    assert set(journal.load().completed) == {("a", "b"), ("c", "d")}
+    journal.remove()
+    assert not (tmp_path / "journal").exists()
@@ -0,0 +1,101 @@
+import pytest
+
+from pathman._impl.listing import _discover, _split, parallel_list_objects
+
+FLAT = ["data/{}{}".format(c, i) for c in "-09AZ_az~é" for i in range(3)]
+NESTED = ["data/x/a", "data/x/b", "data/y/a", "data/y/z/b", "data/top", "data/z/c"]
+
+
+class FakeClient(object):
+    """ Just enough of list_objects_v2 to page through small pages """
+
+    def __init__(self, keys, page_size=3):
+        self.keys = sorted(keys)
+        self.page_size = page_size
+
+    def list_objects_v2(self, Bucket, Prefix="", Delimiter=None, StartAfter="", Marker=None):
+        keys = [k for k in self.keys if k.startswith(Prefix) and k > (Marker or StartAfter)]
+        contents, common = [], []
+        truncated, marker = False, None
+        for key in keys:
+            sub = None
+            if Delimiter and Delimiter in key[len(Prefix) :]:
+                sub = key[: key.index(Delimiter, len(Prefix)) + 1]
+            if sub is None or sub not in common:
+                if len(contents) + len(common) == self.page_size:
+                    truncated = True
+                    break
+                if sub is None:
+                    contents.append({"Key": key})
+                else:
+                    common.append(sub)
+            marker = key
+        page = {"Contents": contents, "CommonPrefixes": [{"Prefix": c} for c in common]}
+        page["IsTruncated"] = truncated
+        page["NextMarker"] = marker
+        return page
+
+    def get_paginator(self, name):
+        client = self
+
+        class Paginator(object):
+            def paginate(self, **kwargs):
+                while True:
+                    page = client.list_objects_v2(**kwargs)
+                    yield page
+                    if not page["IsTruncated"]:
+                        return
+                    kwargs["Marker"] = page["NextMarker"]
+
+        return Paginator()
+
+
+def test_split_covers_the_key_space():
+    shards = _split("data/")
+    covered = sorted(
+        key
+        for key in FLAT
+        for _, lower, upper in shards
+        if (lower is None or key[len("data/") :] >= lower)
+        and (upper is None or key[len("data/") :] < upper)
+    )
+    assert covered == sorted(FLAT)
+
+
+@pytest.mark.parametrize("keys", [FLAT, NESTED], ids=["flat", "nested"])
+@pytest.mark.parametrize("parallelism", [1, 4])
+def test_fake_listing(keys, parallelism):
+    client = FakeClient(keys + ["other/key"])
+    ordered = parallel_list_objects(client, "b", "data/", parallelism, ordered=True)
+    assert [obj["Key"] for obj in ordered] == sorted(keys)
+    unordered = parallel_list_objects(client, "b", "data/", parallelism)
+    assert sorted(obj["Key"] for obj in unordered) == sorted(keys)
+
+
+def test_discover():
+    shards, direct = _discover(FakeClient(NESTED, page_size=10), "b", "data/")
+    assert [s[0] for s in shards] == ["data/x/", "data/y/", "data/z/"]
+    assert [obj["Key"] for obj in direct] == ["data/top"]
+
+    # a lone sub-directory is descended into
+    client = FakeClient(["data/only/a/1", "data/only/b/2"], page_size=10)
+    shards, direct = _discover(client, "b", "data/")
+    assert [s[0] for s in shards] == ["data/only/a/", "data/only/b/"]
+
+    # a truncated level is split lexicographically
+    shards, direct = _discover(FakeClient(FLAT, page_size=10), "b", "data/")
+    assert shards == _split("data/") and direct == []
+
+
+def test_listing_against_s3(bucket, s3_client):
+    keys = FLAT + NESTED
+    for key in keys:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=b"")
+    listed = parallel_list_objects(s3_client, bucket, "data/", parallelism=8, ordered=True)
+    assert [obj["Key"] for obj in listed] == sorted(keys)
+
+
+def test_early_exit_stops_the_shards():
+    listing = parallel_list_objects(FakeClient(FLAT), "b", "data/", parallelism=4)
+    assert next(listing)["Key"].startswith("data/")
+    listing.close()
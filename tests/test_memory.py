@@ -0,0 +1,143 @@
+import asyncio
+import errno
+
+import pytest
+
+from pathman import Path
+from pathman.aio import AsyncPath
+from pathman.copy import copy
+from pathman._impl.memory import MemoryStore
+
+
+@pytest.fixture
+def root(memory_store):
+    return Path("memory://root", store=memory_store)
+
+
+def test_paths_are_normalized(memory_store):
+    Path("memory://a//b/./c/../d.txt", store=memory_store).write_text("d")
+    path = Path("memory://a/b/d.txt", store=memory_store)
+    assert path.read_text() == "d"
+    assert [str(p) for p in Path("memory://", store=memory_store).walk()] == [str(path)]
+    assert path.parts == ["memory:", "a", "b", "d.txt"]
+    assert (path.stem, path.extension) == ("d", ".txt")
+    assert str(path.with_suffix(".csv")) == "memory://a/b/d.csv"
+    assert path.dirname() == Path("memory://a/b", store=memory_store)
+
+
+def test_stores_are_isolated(memory_store):
+    Path("memory://a.txt", store=memory_store).write_text("a")
+    assert not Path("memory://a.txt", store=MemoryStore()).exists()
+    assert memory_store.size() == 1
+    memory_store.clear()
+    assert memory_store.size() == 0
+
+
+def test_writes_create_parents(root):
+    path = root / "x" / "y" / "a.txt"
+    assert path.write_text("hello") == 5
+    assert (root / "x" / "y").is_dir()
+    assert path.stat().size == 5 and path.stat().is_file
+    assert path.read_text() == "hello"
+
+
+def test_files_are_published_when_closed(root):
+    path = root / "a.txt"
+    path.write_bytes(b"old")
+    with path.open("wb") as f:
+        f.write(b"new contents")
+        assert path.read_bytes() == b"old"
+    assert path.read_bytes() == b"new contents"
+
+    with path.open("a") as f:
+        f.write("!")
+    assert path.read_text() == "new contents!"
+
+    with path.open("r+b") as f:
+        f.write(b"NEW")
+    assert path.read_bytes() == b"NEW contents!"
+
+    with pytest.raises(FileExistsError):
+        path.open("xb")
+    with pytest.raises(FileNotFoundError):
+        (root / "missing").open("r+b")
+
+
+def test_directory_errors(root):
+    (root / "dir" / "a.txt").write_text("a")
+    with pytest.raises(IsADirectoryError):
+        (root / "dir").read_bytes()
+    with pytest.raises(IsADirectoryError):
+        (root / "dir").write_bytes(b"")
+    with pytest.raises(IsADirectoryError):
+        (root / "dir").remove()
+    with pytest.raises(NotADirectoryError):
+        (root / "dir" / "a.txt" / "b").write_bytes(b"")
+    with pytest.raises(OSError) as info:
+        (root / "dir").rmdir()
+    assert info.value.errno == errno.ENOTEMPTY
+
+    (root / "dir").rmdir(recursive=True)
+    assert not (root / "dir").exists()
+    with pytest.raises(FileNotFoundError):
+        (root / "dir").remove()
+
+
+def test_mkdir(root):
+    with pytest.raises(FileNotFoundError):
+        (root / "a" / "b").mkdir()
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "a" / "b").mkdir(exist_ok=True)
+    with pytest.raises(FileExistsError):
+        (root / "a").mkdir()
+    (root / "a" / "f").touch()
+    with pytest.raises(FileExistsError):
+        (root / "a" / "f").mkdir(exist_ok=True)
+
+
+def test_ls_walk_and_glob(root):
+    for relative in ("b.txt", "a.log", "d/c.txt", "d/e/f.txt"):
+        root.join(*relative.split("/")).write_text(relative)
+    assert [p.basename() for p in root.ls()] == ["a.log", "b.txt", "d"]
+    assert [str(p) for p in root.walk()] == [
+        "memory://root/a.log",
+        "memory://root/b.txt",
+        "memory://root/d/c.txt",
+        "memory://root/d/e/f.txt",
+    ]
+    assert [p.basename() for p in root.walk(max_depth=2, exclude="*.log")] == ["b.txt", "c.txt"]
+    assert [str(p) for p in root.glob("*/*.txt")] == ["memory://root/d/c.txt"]
+    assert [str(p) for p in root.glob("**/*.txt")] == [
+        "memory://root/b.txt",
+        "memory://root/d/c.txt",
+        "memory://root/d/e/f.txt",
+    ]
+
+
+def test_copies_share_contents(root):
+    (root / "src" / "a.bin").write_bytes(b"x" * 1000)
+    results = copy(root / "src", root / "dest")
+    assert [r.dest for r in results] == ["memory://root/dest/a.bin"]
+    # copied server-side, without duplicating the bytes
+    assert (root / "dest" / "a.bin").memoryview().obj is (root / "src" / "a.bin").memoryview().obj
+
+
+def test_copy_with_local_and_s3(root, tmp_path, bucket):
+    (root / "src" / "sub" / "a.txt").write_text("a")
+    copy(root / "src", Path(str(tmp_path)))
+    assert (tmp_path / "sub" / "a.txt").read_text() == "a"
+    copy(Path(str(tmp_path)), Path("s3://{}/up".format(bucket)))
+    copy(Path("s3://{}/up".format(bucket)), root / "back")
+    assert (root / "back" / "sub" / "a.txt").read_text() == "a"
+
+
+def test_async_memory_paths(memory_store):
+    async def _run():
+        root = AsyncPath("memory://root", store=memory_store)
+        await (root / "a.txt").write_bytes(b"a")
+        assert await (root / "a.txt").exists()
+        assert [str(p) async for p in root.walk()] == ["memory://root/a.txt"]
+        return await (root / "a.txt").read_bytes()
+
+    assert asyncio.run(_run()) == b"a"
+    assert Path("memory://root/a.txt", store=memory_store).read_bytes() == b"a"
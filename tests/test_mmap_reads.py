@@ -0,0 +1,53 @@
+import array
+
+import pytest
+
+from pathman import Path
+from pathman.exc import UnsupportedOperation
+
+DATA = bytes(range(256)) * 64
+
+
+def test_memoryview_is_read_only(root):
+    path = root / "data.bin"
+    path.write_bytes(DATA)
+    with path.memoryview() as view:
+        assert view.readonly
+        assert view.nbytes == len(DATA)
+        assert view[256:260].tobytes() == bytes(range(4))
+        with pytest.raises(TypeError):
+            view[0] = 1
+
+
+def test_memoryview_of_empty_file(root):
+    path = root / "empty.bin"
+    path.write_bytes(b"")
+    assert path.memoryview().tobytes() == b""
+
+
+def test_readinto_typed_buffer(root):
+    path = root / "data.bin"
+    path.write_bytes(DATA)
+    # fills by bytes, whatever the item size of the buffer
+    buffer = array.array("I", [0] * 8)
+    assert path.readinto(buffer, offset=4) == 32
+    assert buffer.tobytes() == DATA[4:36]
+
+
+def test_local_mmap(tmp_path):
+    (tmp_path / "data.bin").write_bytes(DATA)
+    mapping = Path(str(tmp_path / "data.bin")).mmap()
+    try:
+        assert len(mapping) == len(DATA)
+        assert mapping[-3:] == DATA[-3:]
+        with pytest.raises(TypeError):
+            mapping[0] = 0
+    finally:
+        mapping.close()
+
+
+def test_mmap_is_local_only(memory_store):
+    path = Path("memory://root/data.bin", store=memory_store)
+    path.write_bytes(DATA)
+    with pytest.raises(UnsupportedOperation):
+        path.mmap()
@@ -0,0 +1,54 @@
+import os
+
+from pathman import Path
+
+
+def test_path_from_path_shares_the_backend(tmp_path):
+    path = Path(str(tmp_path))
+    copy = Path(path)
+    assert copy == path
+    assert copy._impl is path._impl
+    assert copy._location == "local"
+
+
+def test_path_is_path_like_without_inheriting(tmp_path):
+    path = Path(str(tmp_path / "a.txt"))
+    assert isinstance(path, os.PathLike)
+    assert os.fspath(path) == str(tmp_path / "a.txt")
+    assert not hasattr(path, "__dict__")
+
+
+def test_derived_paths_keep_location_and_kwargs(memory_store):
+    root = Path("memory://root", store=memory_store)
+    child = root / "dir" / "a.txt"
+    assert str(child) == "memory://root/dir/a.txt"
+    assert child._location == "memory"
+    assert child._original_kwargs is root._original_kwargs
+    child.write_text("x")
+    assert root.join("dir", "a.txt").read_text() == "x"
+    assert str(child.with_suffix(".csv")) == "memory://root/dir/a.csv"
+
+
+def test_s3_children_share_filesystem_and_cache(bucket):
+    root = Path("s3://{}/root".format(bucket))
+    child = root / "a.txt"
+    assert child._impl._path is root._impl._path
+    assert child._impl._stat_cache is root._impl._stat_cache
+    assert child._impl.bucket == bucket
+    assert child._impl.key == "root/a.txt"
+
+    child.write_text("abc")
+    listed = root.ls()
+    assert listed == [child]
+    assert listed[0]._impl._stat_cache is root._impl._stat_cache
+
+
+def test_local_answers_match_os(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"abcd")
+    root = Path(str(tmp_path))
+    path = root / "a.txt"
+    assert path.exists() and path.is_file() and not path.is_dir()
+    assert root.is_dir()
+    assert path.stat().size == 4
+    assert not (root / "missing").exists()
+    assert [p.basename() for p in root.ls()] == ["a.txt"]
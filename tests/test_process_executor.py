@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from pathman import Path
+from pathman.copy import _run_pipeline, copy
+from pathman.exc import CopyError
+
+
+def _tree(root):
+    for i in range(6):
+        (root / "sub{}".format(i % 2)).mkdir(parents=True, exist_ok=True)
+        (root / "sub{}".format(i % 2) / "{}.bin".format(i)).write_bytes(os.urandom(1000 + i))
+
+
+def _contents(root):
+    return {str(p.relative_to(root)): p.read_bytes() for p in root.rglob("*") if p.is_file()}
+
+
+def _pid(_):
+    return os.getpid()
+
+
+def _fail_odd(i):
+    if i % 2:
+        raise ValueError(i)
+    return i
+
+
+def test_pipeline_runs_in_worker_processes():
+    pids = _run_pipeline(range(8), _pid, parallelism=2, executor="process")
+    assert len(pids) == 8
+    assert os.getpid() not in pids
+
+
+def test_pipeline_collects_failures_from_processes():
+    with pytest.raises(CopyError) as info:
+        _run_pipeline(range(4), _fail_odd, parallelism=2, executor="process")
+    assert sorted(task for task, _ in info.value.errors) == [1, 3]
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        _run_pipeline(range(2), _pid, executor="fiber")
+
+
+def test_every_direction_on_processes(bucket, tmp_path):
+    _tree(tmp_path / "src")
+    expected = _contents(tmp_path / "src")
+    options = dict(parallelism=2, executor="process")
+
+    local = Path(str(tmp_path / "src"))
+    up = Path("s3://{}/up".format(bucket))
+    assert len(copy(local, up, **options)) == 6
+
+    moved = Path("s3://{}/moved".format(bucket))
+    assert len(copy(up, moved, **options)) == 6
+
+    assert len(copy(moved, Path(str(tmp_path / "down")), **options)) == 6
+    assert _contents(tmp_path / "down") == expected
+
+    assert len(copy(local, Path(str(tmp_path / "local")), **options)) == 6
+    assert _contents(tmp_path / "local") == expected
@@ -0,0 +1,59 @@
+import pytest
+
+DATA = b"0123456789"
+
+
+@pytest.fixture
+def data_file(root):
+    path = root / "data.bin"
+    path.write_bytes(DATA)
+    return path
+
+
+@pytest.mark.parametrize(
+    "offset, length",
+    [
+        (0, None),
+        (3, None),
+        (3, 4),
+        (8, 10),
+        (0, 0),
+        (3, 0),
+        (-3, 0),
+        (-3, None),
+        (-3, 2),
+        (-20, None),
+        (-20, 3),
+        (10, None),
+        (20, 2),
+    ],
+)
+def test_read_range_slices_like_bytes(data_file, offset, length):
+    start = max(len(DATA) + offset, 0) if offset < 0 else offset
+    expected = DATA[start:] if length is None else DATA[start : start + length]
+    assert data_file.read_range(offset, length) == expected
+
+
+def test_read_range_of_empty_file(root):
+    path = root / "empty.bin"
+    path.write_bytes(b"")
+    assert path.read_range(0) == b""
+    assert path.read_range(-4) == b""
+    assert path.read_range(2, 2) == b""
+
+
+def test_read_range_of_missing_file(root):
+    with pytest.raises(FileNotFoundError):
+        (root / "missing.bin").read_range(0, 2)
+
+
+def test_iter_bytes(data_file):
+    assert list(data_file.iter_bytes(4)) == [b"0123", b"4567", b"89"]
+
+
+def test_readinto(data_file):
+    buffer = bytearray(4)
+    assert data_file.readinto(buffer, offset=7) == 3
+    assert bytes(buffer[:3]) == b"789"
+    assert data_file.readinto(buffer) == 4
+    assert bytes(buffer) == b"0123"
@@ -0,0 +1,122 @@
+import os
+import contextlib
+
+import pytest
+
+from pathman import Path
+from pathman.copy import MB, TransferConfig, copy
+from pathman.exc import CopyError
+
+
+class Interrupted(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def calls(client, operation, fail=lambda params, count: False):
+    """Record the parameters of every call to an operation, raising
+    `Interrupted` for the calls fail returns True for
+    """
+    recorded = []
+
+    def _record(params, **kwargs):
+        recorded.append(dict(params))
+        if fail(params, len(recorded)):
+            raise Interrupted(operation)
+
+    event = "before-parameter-build.s3.{}".format(operation)
+    client.meta.events.register(event, _record)
+    try:
+        yield recorded
+    finally:
+        client.meta.events.unregister(event, _record)
+
+
+def test_resume_ranged_download(bucket, s3_client, tmp_path):
+    data = os.urandom(4 * MB + 100)
+    s3_client.put_object(Bucket=bucket, Key="big.bin", Body=data)
+    src = Path("s3://{}/big.bin".format(bucket))
+    dest = tmp_path / "big.bin"
+    config = TransferConfig(multipart_threshold=MB, part_size=MB, max_concurrency=1)
+
+    with calls(s3_client, "GetObject", fail=lambda params, count: count == 3):
+        with pytest.raises(Interrupted):
+            copy(src, Path(str(dest)), config=config, resume=True)
+    assert not dest.exists()
+    assert os.path.exists(str(dest) + ".pathman-journal")
+
+    with calls(s3_client, "GetObject") as ranges:
+        copy(src, Path(str(dest)), config=config, resume=True, verify=True)
+    # ranges queued behind the failed one may or may not have run
+    assert ranges[0]["Range"] == "bytes={}-{}".format(2 * MB, 3 * MB - 1)
+    assert {r["Range"] for r in ranges} <= {
+        "bytes={}-{}".format(start, min(start + MB, len(data)) - 1)
+        for start in range(2 * MB, len(data), MB)
+    }
+    assert dest.read_bytes() == data
+    assert not os.path.exists(str(dest) + ".pathman-partial")
+    assert not os.path.exists(str(dest) + ".pathman-journal")
+
+
+def test_resume_multipart_upload(bucket, s3_client, tmp_path):
+    data = os.urandom(11 * MB)
+    (tmp_path / "big.bin").write_bytes(data)
+    src = Path(str(tmp_path / "big.bin"))
+    dest = Path("s3://{}/big.bin".format(bucket))
+    config = TransferConfig(multipart_threshold=5 * MB, part_size=5 * MB, max_concurrency=1)
+
+    with calls(s3_client, "UploadPart", fail=lambda params, count: count == 2):
+        with pytest.raises(Interrupted):
+            copy(src, dest, config=config, resume=True)
+    assert not dest.exists()
+
+    with calls(s3_client, "UploadPart") as parts:
+        with calls(s3_client, "CreateMultipartUpload") as created:
+            copy(src, dest, config=config, resume=True, verify=True)
+    assert created == []
+    assert [p["PartNumber"] for p in parts][:1] == [2]
+    assert {p["PartNumber"] for p in parts} <= {2, 3}
+    assert dest._impl.stat(refresh=True).size == len(data)
+    assert dest.read_bytes() == data
+    assert not os.path.exists(str(src) + ".pathman-journal")
+
+
+def test_changed_file_restarts_the_upload(bucket, s3_client, tmp_path):
+    (tmp_path / "big.bin").write_bytes(os.urandom(11 * MB))
+    src = Path(str(tmp_path / "big.bin"))
+    dest = Path("s3://{}/big.bin".format(bucket))
+    config = TransferConfig(multipart_threshold=5 * MB, part_size=5 * MB, max_concurrency=1)
+
+    with calls(s3_client, "UploadPart", fail=lambda params, count: count == 2):
+        with pytest.raises(Interrupted):
+            copy(src, dest, config=config, resume=True)
+    data = os.urandom(11 * MB)
+    (tmp_path / "big.bin").write_bytes(data)
+
+    with calls(s3_client, "UploadPart") as parts:
+        copy(src, dest, config=config, resume=True)
+    assert [p["PartNumber"] for p in parts] == [1, 2, 3]
+    assert dest.read_bytes() == data
+
+
+def test_resume_skips_finished_objects(bucket, s3_client, tmp_path):
+    for name in "abc":
+        s3_client.put_object(Bucket=bucket, Key="data/" + name, Body=name.encode())
+    src = Path("s3://{}/data".format(bucket))
+    dest = Path(str(tmp_path / "out"))
+
+    def _fail(params, count):
+        return params["Key"] == "data/c"
+
+    with calls(s3_client, "GetObject", fail=_fail):
+        with pytest.raises(CopyError):
+            copy(src, dest, resume=True, parallelism=1)
+
+    with calls(s3_client, "GetObject") as downloads:
+        results = copy(src, dest, resume=True, parallelism=1)
+    assert [r.src for r in results] == ["s3://{}/data/c".format(bucket)]
+    assert {d["Key"] for d in downloads} == {"data/c"}
+    assert sorted(os.listdir(str(dest))) == ["a", "b", "c"]
+
+    # without resume, everything is transferred again
+    assert len(copy(src, dest)) == 3
@@ -0,0 +1,90 @@
+import pytest
+
+from pathman import Path
+from pathman._impl.s3glob import iglob_keys, literal_prefix, segments_regex
+
+KEYS = [
+    "logs/2026-10-01/part-0.gz",
+    "logs/2026-10-01/part-1.gz",
+    "logs/2026-10-02/part-0.gz",
+    "logs/2026-10-02/extra/part-9.gz",
+    "logs/2026-11-01/part-0.gz",
+    "logs/readme.txt",
+    "other/part-0.gz",
+]
+
+
+@pytest.fixture
+def keys(bucket, s3_client):
+    for key in KEYS:
+        s3_client.put_object(Bucket=bucket, Key=key, Body=b"x")
+    return bucket
+
+
+@pytest.fixture
+def listings(s3_client):
+    """ Prefixes of the ListObjectsV2 requests sent while the test runs """
+    prefixes = []
+
+    def _record(params, **kwargs):
+        prefixes.append(params.get("Prefix", ""))
+
+    event = "before-parameter-build.s3.ListObjectsV2"
+    s3_client.meta.events.register(event, _record)
+    yield prefixes
+    s3_client.meta.events.unregister(event, _record)
+
+
+def test_segments_regex():
+    regex = segments_regex(["a", "*.gz"])
+    assert regex.match("a/b.gz")
+    assert not regex.match("a/b/c.gz")
+    regex = segments_regex(["a", "**", "*.gz"])
+    assert regex.match("a/b.gz")
+    assert regex.match("a/b/c/d.gz")
+    assert segments_regex(["[!a]?"]).match("bc")
+    assert not segments_regex(["[!a]?"]).match("ac")
+    assert literal_prefix("part-*.gz") == "part-"
+
+
+def _glob(root, pattern):
+    return sorted(str(p)[len(str(root)) + 1 :] for p in root.glob(pattern))
+
+
+def test_glob(keys):
+    root = Path("s3://{}".format(keys))
+    assert _glob(root, "logs/2026-10-*/part-*.gz") == KEYS[:3]
+    assert _glob(root, "logs/*") == [
+        "logs/2026-10-01",
+        "logs/2026-10-02",
+        "logs/2026-11-01",
+        "logs/readme.txt",
+    ]
+    assert _glob(root, "logs/**/part-?.gz") == sorted(KEYS[:5])
+    assert _glob(root, "logs/readme.txt") == ["logs/readme.txt"]
+    assert _glob(root, "logs") == ["logs"]
+    assert _glob(root, "logs/missing*") == []
+    # relative to the path globbed from
+    assert _glob(root / "logs", "2026-11-*/*") == ["2026-11-01/part-0.gz"]
+
+
+def test_glob_lists_only_matching_prefixes(keys, s3_client, listings):
+    matches = list(iglob_keys(s3_client, keys, "logs/2026-10-*/part-1*"))
+    assert [m.key for m in matches] == ["logs/2026-10-01/part-1.gz"]
+    assert sorted(listings) == [
+        "logs/2026-10-",
+        "logs/2026-10-01/part-1",
+        "logs/2026-10-02/part-1",
+    ]
+
+
+def test_glob_fills_the_stat_cache(keys, s3_client):
+    root = Path("s3://{}/logs".format(keys))
+    directories = root.glob("2026-1?-01")
+    [part] = root.glob("2026-11-*/part-0.gz")
+    s3_client.delete_object(Bucket=keys, Key="logs/2026-11-01/part-0.gz")
+    # answered from the listings
+    assert len(directories) == 2
+    assert all(p.is_dir() for p in directories)
+    assert part.is_file()
+    assert part.stat().size == 1
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import pytest
+
+from pathman import Path
+from pathman._impl.s3upload import MIN_PART_SIZE, MultipartWriter
+
+
+def _pending_uploads(client, bucket):
+    return client.list_multipart_uploads(Bucket=bucket).get("Uploads", [])
+
+
+def test_small_objects_are_put_in_one_request(bucket, s3_client):
+    path = Path("s3://{}/small".format(bucket))
+    assert path.write_stream([b"ab", bytearray(b"cd"), memoryview(b"ef")]) == 6
+    assert path.read_bytes() == b"abcdef"
+    assert "-" not in s3_client.head_object(Bucket=bucket, Key="small")["ETag"]
+
+
+def test_large_objects_are_uploaded_in_parts(bucket, s3_client):
+    data = os.urandom(2 * MIN_PART_SIZE + 1000)
+    path = Path("s3://{}/large".format(bucket))
+    with path.open_stream(part_size=MIN_PART_SIZE, max_in_flight=2, ContentType="x/y") as f:
+        for start in range(0, len(data), 1000000):
+            f.write(data[start : start + 1000000])
+        assert f.tell() == len(data)
+    head = s3_client.head_object(Bucket=bucket, Key="large")
+    assert head["ETag"].strip('"').endswith("-3")
+    assert head["ContentType"] == "x/y"
+    assert path.read_bytes() == data
+
+
+def test_failure_in_with_block_aborts(bucket, s3_client):
+    path = Path("s3://{}/aborted".format(bucket))
+    with pytest.raises(RuntimeError):
+        with path.open_stream(part_size=MIN_PART_SIZE) as f:
+            f.write(os.urandom(MIN_PART_SIZE + 1))
+            raise RuntimeError
+    assert not path.exists()
+    assert _pending_uploads(s3_client, bucket) == []
+
+
+def test_part_failure_aborts_upload(bucket, s3_client, monkeypatch):
+    writer = MultipartWriter(s3_client, bucket, "failed", part_size=MIN_PART_SIZE)
+    monkeypatch.setattr(writer, "_upload_part", lambda number, body: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        with writer:
+            writer.write(os.urandom(MIN_PART_SIZE))
+            writer.write(os.urandom(MIN_PART_SIZE))
+    assert _pending_uploads(s3_client, bucket) == []
+
+
+def test_in_flight_parts_are_bounded(bucket, s3_client):
+    writer = MultipartWriter(s3_client, bucket, "bounded", part_size=MIN_PART_SIZE, max_in_flight=2)
+    upload_part = writer._upload_part
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, maximum
+
+    def _upload_part(number, body):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        try:
+            return upload_part(number, body)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    writer._upload_part = _upload_part
+    with writer:
+        for _ in range(5):
+            writer.write(bytes(MIN_PART_SIZE))
+    assert 1 <= in_flight[1] <= 2
+
+
+def test_part_size_must_be_allowed_by_s3(s3_client):
+    with pytest.raises(ValueError):
+        MultipartWriter(s3_client, "bucket", "key", part_size=MIN_PART_SIZE - 1)
+    with pytest.raises(ValueError):
+        MultipartWriter(s3_client, "bucket", "key", max_in_flight=0)
+
+
+def test_other_backends_stream_through_open(root):
+    path = root / "streamed"
+    assert path.write_stream(iter([b"a", b"b"])) == 2
+    assert path.read_bytes() == b"ab"
@@ -0,0 +1,53 @@
+import os
+
+from pathman import Path
+from pathman._impl import session
+from pathman._impl.session import SessionRegistry, normalize_kwargs
+
+
+def test_normalize_kwargs_ignores_order_and_freezes_nested_values():
+    a = normalize_kwargs({"anon": False, "client_kwargs": {"region_name": "x", "b": [1, 2]}})
+    b = normalize_kwargs({"client_kwargs": {"b": [1, 2], "region_name": "x"}, "anon": False})
+    assert a == b
+    hash(a)
+    assert normalize_kwargs({"s": {1, 2}}) == normalize_kwargs({"s": {2, 1}})
+    assert normalize_kwargs({"anon": True}) != normalize_kwargs({"anon": False})
+
+
+def test_registry_shares_one_client_per_configuration():
+    closed = []
+    registry = SessionRegistry(lambda **kwargs: object(), closed.append)
+    first = registry.get(anon=False)
+    assert registry.get(anon=False) is first
+    assert registry.get(anon=True) is not first
+    assert len(registry) == 2
+
+    assert registry.evict(anon=False)
+    assert closed == [first]
+    assert not registry.evict(anon=False)
+    assert registry.get(anon=False) is not first
+
+    registry.close()
+    assert len(registry) == 0
+    assert len(closed) == 3
+
+
+def test_registry_starts_empty_after_fork():
+    registry = SessionRegistry(lambda **kwargs: object())
+    parent = registry.get()
+    registry._pid = os.getpid() + 1  # as seen from a forked child
+    assert registry.get() is not parent
+
+
+def test_s3_paths_share_filesystem_and_client(bucket):
+    a = Path("s3://{}/a".format(bucket))
+    b = Path("s3://{}/b/c".format(bucket))
+    assert a._impl._path is b._impl._path
+    assert (a / "d")._impl._path is a._impl._path
+    assert session.get_client() is session.get_client()
+    assert len(session.filesystems) >= 1
+
+    session.close_sessions()
+    assert len(session.filesystems) == 0
+    assert len(session.clients) == 0
+    assert Path("s3://{}/a".format(bucket))._impl._path is not a._impl._path
@@ -0,0 +1,148 @@
+import pytest
+
+from pathman import Path
+from pathman._impl import cache as cache_module
+from pathman._impl.cache import StatCache
+
+
+class _Clock(object):
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = StatCache(ttl=10)
+    cache.set("a", 1)
+    clock.now += 9
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a", "expired") == "expired"
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = StatCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_none_is_cached_and_zero_ttl_disables_caching():
+    cache = StatCache()
+    cache.set("missing", None)
+    assert "missing" in cache
+    assert cache.get("missing", "absent") is None
+
+    disabled = StatCache(ttl=0)
+    disabled.set("a", 1)
+    assert "a" not in disabled
+
+
+def test_invalidate_prefix():
+    cache = StatCache()
+    for key in ("s3://b/dir/a", "s3://b/dir/b", "s3://b/other"):
+        cache.set(key, 1)
+    cache.invalidate_prefix("s3://b/dir/")
+    assert "s3://b/dir/a" not in cache
+    assert "s3://b/dir/b" not in cache
+    assert "s3://b/other" in cache
+
+
+def test_s3_stat_is_cached_until_refresh(bucket, s3_client):
+    path = Path("s3://{}/a.txt".format(bucket))
+    path.write_text("hello")
+    assert path.stat().size == 5
+    assert path.is_file()
+
+    # changed behind pathman's back: the cached metadata is still served
+    s3_client.put_object(Bucket=bucket, Key="a.txt", Body=b"hello world")
+    assert path.stat().size == 5
+    assert path._impl.stat(refresh=True).size == 11
+    assert path.stat().size == 11
+
+
+def test_s3_missing_paths_are_cached(bucket, s3_client):
+    path = Path("s3://{}/late.txt".format(bucket))
+    assert not path.exists()
+    s3_client.put_object(Bucket=bucket, Key="late.txt", Body=b"x")
+    assert not path.exists()
+    with pytest.raises(FileNotFoundError):
+        path.stat()
+
+
+def test_s3_writes_invalidate_the_cache(bucket):
+    path = Path("s3://{}/a.txt".format(bucket))
+    assert not path.exists()
+    path.write_text("abc")
+    assert path.exists()
+    assert path.stat().size == 3
+
+    # another Path object with the same configuration shares the cache
+    Path(str(path)).remove()
+    assert not path.exists()
+
+
+def test_s3_listing_fills_the_cache(bucket, s3_client):
+    root = Path("s3://{}/dir".format(bucket))
+    (root / "a.txt").write_text("aa")
+    (root / "b.txt").write_text("bbb")
+    Path("s3://{}/dir/a.txt".format(bucket))._impl._invalidate()
+
+    assert sorted(p.basename() for p in root.ls()) == ["a.txt", "b.txt"]
+    s3_client.delete_object(Bucket=bucket, Key="dir/a.txt")
+    # answered from the listing, without asking S3 again
+    assert (root / "a.txt").stat().size == 2
+    assert (root / "a.txt").is_file()
+
+
+def test_refresh_bypasses_cached_missing_paths(bucket, s3_client):
+    path = Path("s3://{}/late.txt".format(bucket))
+    assert not path.exists()
+    s3_client.put_object(Bucket=bucket, Key="late.txt", Body=b"xy")
+    assert not path.is_file()
+    assert path.exists(refresh=True)
+    assert path.is_file()
+    s3_client.put_object(Bucket=bucket, Key="late.txt", Body=b"xyz")
+    assert path.stat(refresh=True).size == 3
+
+
+def test_refresh_on_local_and_memory_paths(root):
+    (root / "a.txt").write_text("a")
+    [walked] = root.walk()
+    assert walked.stat().size == 1
+    # written through another path: a local walk entry still has the old stat
+    (root / "a.txt").write_text("abc")
+    assert walked.stat(refresh=True).size == 3
+    assert walked.exists(refresh=True) and walked.is_file(refresh=True)
+
+
+def test_stat_cache_is_configured_per_session(bucket, s3_client):
+    uncached = Path("s3://{}/a.txt".format(bucket), stat_ttl=0)
+    assert not uncached.exists()
+    s3_client.put_object(Bucket=bucket, Key="a.txt", Body=b"a")
+    assert uncached.exists()
+    assert len(uncached._impl._stat_cache) == 0
+
+    small = Path("s3://{}".format(bucket), stat_maxsize=2)
+    assert small._impl._stat_cache is not uncached._impl._stat_cache
+    same = Path("s3://{}/b".format(bucket), stat_maxsize=2)
+    assert small._impl._stat_cache is same._impl._stat_cache
+    for name in "bcd":
+        (small / name).exists()
+    assert len(small._impl._stat_cache) == 2
+    # the options configure the cache, not the filesystem
+    assert small._impl._path is Path("s3://{}".format(bucket))._impl._path
@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+from pathman import Path
+from pathman.copy import MB, SyncAction, TransferConfig, copy, sync
+
+
+def _tree(root):
+    (root / "sub").mkdir(parents=True)
+    (root / "a.txt").write_bytes(b"a")
+    (root / "sub" / "b.txt").write_bytes(b"bb")
+
+
+def _age(path, seconds):
+    st = os.stat(str(path))
+    os.utime(str(path), (st.st_atime - seconds, st.st_mtime - seconds))
+
+
+def test_local_to_s3_copies_only_changes(bucket, s3_client, tmp_path):
+    _tree(tmp_path)
+    src = Path(str(tmp_path))
+    dest = Path("s3://{}/dest".format(bucket))
+
+    plan = sync(src, dest)
+    assert sorted((a.action, a.reason, a.dest) for a in plan) == [
+        ("copy", "new", "s3://{}/dest/a.txt".format(bucket)),
+        ("copy", "new", "s3://{}/dest/sub/b.txt".format(bucket)),
+    ]
+    assert (dest / "sub" / "b.txt").read_bytes() == b"bb"
+
+    # uploaded objects are newer than their sources
+    assert sync(src, dest) == []
+
+    (tmp_path / "sub" / "b.txt").write_bytes(b"BBB")
+    (tmp_path / "c.txt").write_bytes(b"c")
+    plan = sync(src, dest)
+    assert sorted((a.reason, a.src) for a in plan) == [
+        ("changed", str(tmp_path / "sub" / "b.txt")),
+        ("new", str(tmp_path / "c.txt")),
+    ]
+    assert (dest / "sub" / "b.txt").read_bytes() == b"BBB"
+
+
+def test_compare_modes(tmp_path):
+    _tree(tmp_path / "src")
+    src = Path(str(tmp_path / "src"))
+    dest = Path(str(tmp_path / "dest"))
+    sync(src, dest)
+
+    # same size, older copy: only "mtime" notices
+    (tmp_path / "dest" / "a.txt").write_bytes(b"x")
+    _age(tmp_path / "dest" / "a.txt", 60)
+    assert sync(src, dest, compare="size", dry_run=True) == []
+    assert [a.reason for a in sync(src, dest, compare="mtime", dry_run=True)] == ["changed"]
+
+    # same size, newer copy: only "etag" notices
+    (tmp_path / "dest" / "a.txt").write_bytes(b"y")
+    assert sync(src, dest, compare="mtime", dry_run=True) == []
+    assert [a.reason for a in sync(src, dest, compare="etag")] == ["changed"]
+    assert (tmp_path / "dest" / "a.txt").read_bytes() == b"a"
+
+    with pytest.raises(ValueError):
+        sync(src, dest, compare="hash")
+
+
+def test_etag_compare_uses_the_part_size_of_the_upload(bucket, tmp_path):
+    data = os.urandom(11 * MB)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "big.bin").write_bytes(data)
+    src = Path(str(tmp_path / "src"))
+    dest = Path("s3://{}/dest".format(bucket))
+    copy(src, dest, config=TransferConfig(multipart_threshold=5 * MB, part_size=5 * MB))
+    assert "-" in (dest / "big.bin").stat().etag
+
+    # uploaded with 5MB parts: a different configured part size changes nothing
+    other = TransferConfig(part_size=8 * MB)
+    assert sync(src, dest, compare="etag", config=other) == []
+    assert sync(dest, src, compare="etag", config=other) == []
+
+
+def test_delete_and_dry_run(memory_store):
+    src = Path("memory://src", store=memory_store)
+    dest = Path("memory://dest", store=memory_store)
+    (src / "a.txt").write_text("a")
+    (dest / "a.txt").write_text("a")
+    (dest / "old" / "b.txt").write_text("b")
+
+    plan = sync(src, dest, delete=True, dry_run=True, compare="size")
+    assert plan == [SyncAction("delete", None, "memory://dest/old/b.txt", "extraneous")]
+    assert (dest / "old" / "b.txt").exists()
+
+    sync(src, dest, delete=True, compare="size")
+    assert not (dest / "old" / "b.txt").exists()
+    assert (dest / "a.txt").exists()
+
+
+def test_filters_apply_to_both_sides(tmp_path):
+    _tree(tmp_path / "src")
+    (tmp_path / "dest").mkdir()
+    (tmp_path / "dest" / "keep.log").write_bytes(b"log")
+    plan = sync(
+        Path(str(tmp_path / "src")),
+        Path(str(tmp_path / "dest")),
+        delete=True,
+        exclude="*.log",
+        include="sub/*",
+    )
+    assert [a.src for a in plan] == [str(tmp_path / "src" / "sub" / "b.txt")]
+    assert (tmp_path / "dest" / "keep.log").exists()
+    assert not (tmp_path / "dest" / "a.txt").exists()
+
+
+def test_single_file_into_directory(bucket, tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"a")
+    dest = Path("s3://{}/dir".format(bucket))
+    (dest / "other").write_text("x")
+    plan = sync(Path(str(tmp_path / "a.txt")), dest)
+    assert [a.dest for a in plan] == ["s3://{}/dir/a.txt".format(bucket)]
+    assert sync(Path(str(tmp_path / "a.txt")), dest) == []
@@ -0,0 +1,59 @@
+import os
+
+from pathman import Path
+from pathman.copy import MB, TransferConfig, copy
+
+CONFIG = TransferConfig(multipart_threshold=5 * MB, part_size=5 * MB, max_concurrency=2)
+
+
+def test_to_boto3():
+    config = TransferConfig(
+        multipart_threshold=16 * MB, part_size=4 * MB, max_concurrency=1, max_bandwidth=MB
+    ).to_boto3()
+    assert config.multipart_threshold == 16 * MB
+    assert config.multipart_chunksize == 4 * MB
+    assert config.max_concurrency == 1
+    assert config.max_bandwidth == MB
+    assert not config.use_threads
+    assert "part_size=4194304" in repr(TransferConfig(part_size=4 * MB))
+
+
+def _parts(s3_client, bucket, key):
+    etag = s3_client.head_object(Bucket=bucket, Key=key)["ETag"].strip('"')
+    return int(etag.split("-")[1]) if "-" in etag else 1
+
+
+def test_config_applies_to_every_direction(bucket, s3_client, tmp_path):
+    data = os.urandom(11 * MB)
+    (tmp_path / "big.bin").write_bytes(data)
+
+    copy(Path(str(tmp_path / "big.bin")), Path("s3://{}/big.bin".format(bucket)), config=CONFIG)
+    assert _parts(s3_client, bucket, "big.bin") == 3
+
+    results = copy(
+        Path("s3://{}/big.bin".format(bucket)),
+        Path("s3://{}/copy/big.bin".format(bucket)),
+        config=CONFIG,
+    )
+    assert [r.size for r in results] == [11 * MB]
+    assert _parts(s3_client, bucket, "copy/big.bin") == 3
+
+    copy(
+        Path("s3://{}/copy/big.bin".format(bucket)),
+        Path(str(tmp_path / "back.bin")),
+        config=CONFIG,
+    )
+    assert (tmp_path / "back.bin").read_bytes() == data
+
+
+def test_small_objects_are_copied_whole(bucket, s3_client):
+    s3_client.put_object(Bucket=bucket, Key="src/a", Body=b"a" * 100)
+    s3_client.put_object(Bucket=bucket, Key="src/sub/b", Body=b"b" * 200)
+    results = copy(
+        Path("s3://{}/src".format(bucket)), Path("s3://{}/dest".format(bucket)), config=CONFIG
+    )
+    assert sorted((r.dest, r.size) for r in results) == [
+        ("s3://{}/dest/a".format(bucket), 100),
+        ("s3://{}/dest/sub/b".format(bucket), 200),
+    ]
+    assert _parts(s3_client, bucket, "dest/sub/b") == 1
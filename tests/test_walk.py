@@ -0,0 +1,85 @@
+import os
+import types
+
+import pytest
+
+from pathman import Path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for relative in ("a.txt", "b.log", "x/c.txt", "x/y/d.txt", "x/y/z/e.txt", "skip/f.txt"):
+        path = tmp_path.joinpath(*relative.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(relative.encode())
+    return Path(str(tmp_path))
+
+
+def _relative(root, paths):
+    return sorted(os.path.relpath(str(p), str(root)).replace(os.sep, "/") for p in paths)
+
+
+def test_walk_is_lazy_and_yields_files_only(tree):
+    walk = tree.walk()
+    assert isinstance(walk, types.GeneratorType)
+    assert _relative(tree, walk) == [
+        "a.txt",
+        "b.log",
+        "skip/f.txt",
+        "x/c.txt",
+        "x/y/d.txt",
+        "x/y/z/e.txt",
+    ]
+
+
+def test_include_exclude(tree):
+    assert _relative(tree, tree.walk(include="*.txt", exclude=["skip", "x/y/z"])) == [
+        "a.txt",
+        "x/c.txt",
+        "x/y/d.txt",
+    ]
+
+
+def test_max_depth(tree):
+    assert _relative(tree, tree.walk(max_depth=1)) == ["a.txt", "b.log"]
+    assert _relative(tree, tree.walk(max_depth=2)) == ["a.txt", "b.log", "skip/f.txt", "x/c.txt"]
+
+
+def test_prune_gets_paths(tree):
+    seen = []
+
+    def _prune(directory):
+        seen.append(directory)
+        return directory.basename() == "y"
+
+    assert _relative(tree, tree.walk(prune=_prune)) == ["a.txt", "b.log", "skip/f.txt", "x/c.txt"]
+    assert all(isinstance(p, Path) and p.is_dir() for p in seen)
+
+
+def test_yielded_paths_reuse_the_listing(tree):
+    path = next(p for p in tree.walk() if p.basename() == "a.txt")
+    assert path.stat().size == len(b"a.txt")
+    os.remove(str(path))
+    # answered from the directory entry
+    assert path.is_file()
+    assert path.stat().size == len(b"a.txt")
+    # until the path is modified through this object
+    path.write_bytes(b"new")
+    assert path.stat().size == 3
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symbolic links")
+def test_symlinked_directories(tree, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside")
+    (outside / "g.txt").write_bytes(b"g")
+    os.symlink(str(outside), os.path.join(str(tree), "link"))
+    assert "link/g.txt" not in _relative(tree, tree.walk())
+    assert "link/g.txt" in _relative(tree, tree.walk(followlinks=True))
+
+
+def test_onerror(tree):
+    missing = Path(os.path.join(str(tree), "missing"))
+    assert list(missing.walk()) == []
+    errors = []
+    assert list(missing.walk(onerror=errors.append)) == []
+    assert len(errors) == 1 and isinstance(errors[0], FileNotFoundError)